@@ -5,8 +5,11 @@ Admin configuration for the accounts app.
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django.contrib.auth.models import User
+from django.core.paginator import Paginator
+from django.db import connection
+from django.utils.functional import cached_property
 
-from apps.accounts.models import Profile, LoginAttempt
+from apps.accounts.models import Profile, LoginAttempt, LoginAttemptRollup
 
 
 class ProfileInline(admin.StackedInline):
@@ -28,18 +31,62 @@ class UserAdmin(BaseUserAdmin):
     list_filter = ('is_staff', 'is_superuser', 'is_active')
 
 
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator that uses the planner's row estimate for unfiltered querysets
+    instead of COUNT(*) over the whole table.
+    """
+
+    @cached_property
+    def count(self):
+        query = self.object_list.query
+        if connection.vendor == 'postgresql' and not query.where:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    'SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass',
+                    [self.object_list.model._meta.db_table],
+                )
+                row = cursor.fetchone()
+            if row and row[0] > 0:
+                return row[0]
+        return super().count
+
+
 class LoginAttemptAdmin(admin.ModelAdmin):
     """
     Admin for the LoginAttempt model.
+
+    The raw table grows without bound, so there is no date hierarchy and no
+    full result count; use the login attempt rollups for aggregate views.
     """
     list_display = ('username', 'ip_address', 'successful', 'created_at')
     list_filter = ('successful', 'created_at')
     search_fields = ('username', 'ip_address', 'user_agent')
     readonly_fields = ('username', 'ip_address', 'user_agent', 'successful', 'created_at', 'updated_at')
-    date_hierarchy = 'created_at'
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+
+class LoginAttemptRollupAdmin(admin.ModelAdmin):
+    """
+    Admin for the hourly LoginAttemptRollup table.
+    """
+    list_display = ('hour', 'ip_address', 'username', 'successful', 'attempts')
+    list_filter = ('successful',)
+    search_fields = ('username', 'ip_address')
+    readonly_fields = ('hour', 'ip_address', 'username', 'successful', 'attempts')
+    date_hierarchy = 'hour'
+    ordering = ('-hour', '-attempts')
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
 
 
 # Re-register UserAdmin
 admin.site.unregister(User)
 admin.site.register(User, UserAdmin)
-admin.site.register(LoginAttempt, LoginAttemptAdmin) 
\ No newline at end of file
+admin.site.register(LoginAttempt, LoginAttemptAdmin)
+admin.site.register(LoginAttemptRollup, LoginAttemptRollupAdmin) 
\ No newline at end of file
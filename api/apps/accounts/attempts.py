@@ -0,0 +1,183 @@
+"""
+Asynchronous recording of login attempts.
+
+The login path only appends an entry to a Redis stream (one XADD, capped at
+LOGIN_ATTEMPT_STREAM_MAXLEN entries so a credential-stuffing flood cannot
+grow it without bound). The ingest_login_attempts Celery task drains the
+stream through a consumer group and writes LoginAttempt rows in batches of
+LOGIN_ATTEMPT_BATCH_SIZE with a single INSERT each.
+
+Entries are acknowledged only after their batch is committed; entries left
+pending by a worker that died are claimed by the next drain.
+"""
+
+import ipaddress
+import logging
+import os
+import socket
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from apps.core.utils import get_client_ip
+
+logger = logging.getLogger(__name__)
+
+CONSUMER_GROUP = 'ingest'
+# Held by every ingest transaction; see apps.accounts.rollups.
+INGEST_LOCK_KEY = 0x6c6f67696e  # 'login'
+CLAIM_IDLE_MS = 60_000
+USER_AGENT_MAX_LENGTH = 512
+
+
+def _redis():
+    from django_redis import get_redis_connection
+
+    return get_redis_connection('default')
+
+
+def client_ip(request):
+    """
+    Return the client IP of a request if it is a valid address, since one
+    malformed X-Forwarded-For value must not fail a whole batch.
+    """
+    for candidate in (get_client_ip(request), request.META.get('REMOTE_ADDR')):
+        try:
+            return str(ipaddress.ip_address((candidate or '').strip()))
+        except ValueError:
+            continue
+    return '0.0.0.0'
+
+
+def record_login_attempt(request, username, successful, user=None):
+    """
+    Append a login attempt to the stream. Never raises: losing an audit
+    record is preferable to failing the login.
+    """
+    if request is None:
+        return
+    fields = {
+        'username': (username or '')[:150],
+        'ip_address': client_ip(request),
+        'user_agent': request.META.get('HTTP_USER_AGENT', '')[:USER_AGENT_MAX_LENGTH],
+        'successful': '1' if successful else '0',
+        'user_id': str(user.pk) if user is not None else '',
+        'created_at': timezone.now().isoformat(),
+    }
+    try:
+        _redis().xadd(
+            settings.LOGIN_ATTEMPT_STREAM, fields,
+            maxlen=settings.LOGIN_ATTEMPT_STREAM_MAXLEN, approximate=True,
+        )
+    except Exception:
+        logger.warning('Failed to record login attempt', exc_info=True)
+
+
+def _decode(fields):
+    return {
+        (key.decode() if isinstance(key, bytes) else key): (value.decode() if isinstance(value, bytes) else value)
+        for key, value in fields.items()
+    }
+
+
+def store_login_attempts(entries):
+    """
+    Insert decoded stream entries as LoginAttempt rows in one statement.
+
+    Attempts keep the time they were recorded, and a user deleted since is
+    stored as NULL rather than failing the batch on the foreign key.
+    """
+    if not entries:
+        return 0
+    from apps.accounts.models import LoginAttempt
+
+    if connection.vendor != 'postgresql':
+        LoginAttempt.objects.bulk_create(
+            [
+                LoginAttempt(
+                    username=entry['username'],
+                    ip_address=entry['ip_address'],
+                    user_agent=entry['user_agent'],
+                    successful=entry['successful'] == '1',
+                    user_id=int(entry['user_id']) if entry['user_id'] else None,
+                )
+                for entry in entries
+            ]
+        )
+        return len(entries)
+
+    columns = ('username', 'ip_address', 'user_agent', 'successful', 'user_id', 'created_at')
+    values = [
+        [entry['username'] for entry in entries],
+        [entry['ip_address'] for entry in entries],
+        [entry['user_agent'] for entry in entries],
+        [entry['successful'] == '1' for entry in entries],
+        [int(entry['user_id']) if entry['user_id'] else None for entry in entries],
+        [entry['created_at'] for entry in entries],
+    ]
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT pg_advisory_xact_lock(%s)', [INGEST_LOCK_KEY])
+        cursor.execute(
+            f"""
+            INSERT INTO {LoginAttempt._meta.db_table}
+                (username, ip_address, user_agent, successful, user_id, created_at, updated_at)
+            SELECT source.username, source.ip_address, source.user_agent, source.successful,
+                   auth_user.id, source.created_at, source.created_at
+            FROM unnest(%s::varchar[], %s::inet[], %s::text[], %s::boolean[], %s::integer[],
+                        %s::timestamptz[]) AS source({', '.join(columns)})
+            LEFT JOIN {LoginAttempt._meta.get_field('user').related_model._meta.db_table} AS auth_user
+                ON auth_user.id = source.user_id
+            """,
+            values,
+        )
+    return len(entries)
+
+
+def _ensure_group(client, stream):
+    try:
+        client.xgroup_create(stream, CONSUMER_GROUP, id='0', mkstream=True)
+    except Exception as exc:
+        if 'BUSYGROUP' not in str(exc):
+            raise
+
+
+def drain_login_attempts(batch_size=None, max_batches=50):
+    """
+    Move pending login attempts from the stream into the database.
+
+    Returns the number of attempts stored.
+    """
+    stream = settings.LOGIN_ATTEMPT_STREAM
+    batch_size = batch_size or settings.LOGIN_ATTEMPT_BATCH_SIZE
+    consumer = f'{socket.gethostname()}:{os.getpid()}'
+    client = _redis()
+    _ensure_group(client, stream)
+
+    def store(messages):
+        if not messages:
+            return 0
+        ids = [message_id for message_id, _ in messages]
+        with transaction.atomic():
+            stored = store_login_attempts([_decode(fields) for _, fields in messages if fields])
+        pipe = client.pipeline()
+        pipe.xack(stream, CONSUMER_GROUP, *ids)
+        pipe.xdel(stream, *ids)
+        pipe.execute()
+        return stored
+
+    # Entries delivered to a consumer that died before acknowledging them.
+    claimed = client.xautoclaim(
+        stream, CONSUMER_GROUP, consumer, min_idle_time=CLAIM_IDLE_MS, start_id='0-0', count=batch_size,
+    )
+    stored = store(claimed[1])
+
+    for _ in range(max_batches):
+        response = client.xreadgroup(CONSUMER_GROUP, consumer, {stream: '>'}, count=batch_size)
+        if not response:
+            break
+        messages = response[0][1]
+        stored += store(messages)
+        if len(messages) < batch_size:
+            break
+    return stored
@@ -0,0 +1,259 @@
+"""
+JWT authentication with cached token verification and user lookup.
+
+simplejwt's JWTAuthentication decodes the access token, checks its
+signature and SELECTs the user on every request. CachedJWTAuthentication
+keeps both results:
+
+* verified tokens in a bounded per-process LRU keyed by the raw token
+  (signature included) until the token's ``exp``;
+* users in Redis, tagged with the user's modification stamp
+  (apps.core.caching) read before the row was loaded. Saving a user or
+  their profile touches the stamp after the transaction commits, so an
+  entry stored by a reader that raced the save is never served;
+* users in a short-lived per-process LRU in front of Redis, used only while
+  the process is subscribed to the invalidation channel on which every
+  saved or deleted user is announced.
+
+request.user is therefore a cached copy: code that writes the user must
+load it from the database first (see ChangePasswordView).
+"""
+
+import copy
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from apps.core.caching import modified_at, stamp_key
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = 'auth:user'
+CHANNEL = f'{KEY_PREFIX}:forget'
+RECONNECT_DELAY = 1.0
+
+
+def _redis():
+    from django_redis import get_redis_connection
+
+    return get_redis_connection('default')
+
+
+class ExpiringLRU:
+    """
+    Thread-safe LRU mapping whose entries also expire at a given Unix time.
+    """
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.reset()
+
+    def reset(self):
+        self._lock = threading.Lock()
+        self._data = OrderedDict()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            value, expires_at = item
+            if expires_at <= time.time():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, expires_at):
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class UserCacheListener:
+    """
+    Per-process subscriber that drops users announced as changed by any
+    process from local_users.
+
+    ``generation`` changes with every announcement and reconnection; a user
+    looked up from Redis or the database is only kept locally if it did not
+    change during the lookup, so a lookup racing an announcement cannot
+    re-cache the old row.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self._lock = threading.Lock()
+        self._thread = None
+        self.ready = False
+        self.generation = 0
+
+    def ensure_started(self):
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._listen, name='auth-user-cache', daemon=True)
+                    self._thread.start()
+
+    def _listen(self):
+        while True:
+            pubsub = None
+            try:
+                pubsub = _redis().pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(CHANNEL)
+                # Announcements may have been missed while disconnected.
+                self.generation += 1
+                local_users.clear()
+                self.ready = True
+                for message in pubsub.listen():
+                    self.generation += 1
+                    local_users.pop(message['data'].decode())
+            except Exception:
+                logger.warning('User cache listener disconnected', exc_info=True)
+            finally:
+                self.ready = False
+                self.generation += 1
+                if pubsub is not None:
+                    try:
+                        pubsub.close()
+                    except Exception:
+                        pass
+            time.sleep(RECONNECT_DELAY)
+
+
+verified_tokens = ExpiringLRU(settings.JWT_VERIFIED_TOKEN_CACHE_SIZE)
+local_users = ExpiringLRU(settings.AUTH_USER_CACHE_SIZE)
+user_listener = UserCacheListener()
+# A lock held by another thread at fork time would never be released.
+os.register_at_fork(after_in_child=verified_tokens.reset)
+os.register_at_fork(after_in_child=local_users.reset)
+os.register_at_fork(after_in_child=user_listener.reset)
+
+
+def user_cache_key(user_id):
+    return f'{KEY_PREFIX}:{user_id}'
+
+
+def load_user(user_id):
+    """
+    Return the user with the given id from Redis or the database, or None.
+    """
+    User = get_user_model()
+    label, key = User._meta.label_lower, str(user_id)
+    try:
+        # One round trip for both; the stamp is read before the row.
+        values = cache.get_many([stamp_key(label, key), user_cache_key(key)])
+        stamp = values.get(stamp_key(label, key))
+        if stamp is None:
+            stamp = modified_at(label, key)
+        entry = values.get(user_cache_key(key))
+    except Exception:
+        logger.warning('User cache unavailable', exc_info=True)
+        return User.objects.filter(**{api_settings.USER_ID_FIELD: user_id}).first()
+
+    if entry is not None and entry[0] == stamp:
+        return entry[1]
+    user = User.objects.filter(**{api_settings.USER_ID_FIELD: user_id}).first()
+    if user is not None:
+        try:
+            cache.set(user_cache_key(key), (stamp, user), settings.AUTH_USER_CACHE_TIMEOUT)
+        except Exception:
+            logger.warning('User cache unavailable', exc_info=True)
+    return user
+
+
+def get_cached_user(user_id):
+    """
+    Return a private copy of the user with the given id, or None.
+    """
+    key = str(user_id)
+    user_listener.ensure_started()
+    user = local_users.get(key) if user_listener.ready else None
+    if user is None:
+        generation = user_listener.generation
+        user = load_user(user_id)
+        if user is None:
+            return None
+        if user_listener.ready and user_listener.generation == generation:
+            local_users.set(key, user, time.time() + settings.AUTH_USER_CACHE_LOCAL_TTL)
+    # Requests may modify request.user; never hand out the shared one.
+    return copy.copy(user)
+
+
+def forget_user(user_id):
+    """
+    Drop a user from the caches of every process, now and again once the
+    transaction commits.
+    """
+    key = str(user_id)
+
+    def forget():
+        local_users.pop(key)
+        try:
+            cache.delete(user_cache_key(key))
+            _redis().publish(CHANNEL, key)
+        except Exception:
+            logger.warning('Failed to invalidate cached user %s', key, exc_info=True)
+
+    forget()
+    transaction.on_commit(forget)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that remembers verified tokens and resolved users.
+    """
+
+    def get_validated_token(self, raw_token):
+        token = verified_tokens.get(raw_token)
+        if token is None:
+            token = super().get_validated_token(raw_token)
+            if 'exp' in token:
+                verified_tokens.set(raw_token, token, token['exp'])
+        return token
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        user = get_cached_user(user_id)
+        if user is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+
+        if not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+
+        return user
@@ -0,0 +1,203 @@
+"""
+Avatar upload and processing pipeline.
+
+Uploads bypass the web workers: presign_upload() hands the client a
+presigned S3 POST (the bucket enforces the content type and
+AVATAR_MAX_UPLOAD_BYTES), or, for storages without presigning such as the
+local filesystem in development, a signed form for AvatarLocalUploadView.
+Either way the client POSTs the returned ``fields`` plus the file to
+``url`` and then confirms the ``key``, which queues process_avatar.
+
+Processing reads the image header first and rejects unsupported formats
+and images over AVATAR_MAX_PIXELS before anything is decoded; JPEGs are
+then decoded at a reduced scale where possible. Each size in AVATAR_SIZES
+is cropped square and written as WebP and JPEG without metadata, and the
+storage names are stored in Profile.avatar_variants. Names rather than URLs
+are stored because media is private in production, so URLs are signed when
+a profile is serialized.
+"""
+
+import io
+import logging
+import posixpath
+import re
+import uuid
+
+from django.conf import settings
+from django.core import signing
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from PIL import Image, ImageOps
+
+from apps.core import metrics
+
+logger = logging.getLogger(__name__)
+
+UPLOAD_PREFIX = 'avatars/uploads'
+UPLOAD_SIGNING_SALT = 'apps.accounts.avatars.upload'
+# presign_upload() names uploads with a uuid4 hex.
+UPLOAD_NAME_RE = re.compile(r'[0-9a-f]{32}')
+ALLOWED_CONTENT_TYPES = {
+    'image/jpeg': 'JPEG',
+    'image/png': 'PNG',
+    'image/webp': 'WEBP',
+}
+OUTPUT_FORMATS = (
+    ('webp', 'WEBP', {'quality': 80, 'method': 4}),
+    ('jpeg', 'JPEG', {'quality': 85, 'optimize': True, 'progressive': True}),
+)
+
+
+class AvatarRejected(Exception):
+    """
+    Raised for an upload that is not an acceptable image.
+    """
+
+
+def upload_prefix(user_id):
+    return f'{UPLOAD_PREFIX}/{user_id}/'
+
+
+def is_upload_key(user_id, key):
+    """
+    Whether ``key`` is exactly a name presign_upload() gives the user's
+    uploads. A prefix check is not enough: storages resolve ``..``, so
+    ``<prefix>../../<elsewhere>`` would reach other users' files.
+    """
+    prefix = upload_prefix(user_id)
+    return key.startswith(prefix) and UPLOAD_NAME_RE.fullmatch(key[len(prefix):]) is not None
+
+
+def presign_upload(user_id, content_type, local_upload_url):
+    """
+    Return ``{'key', 'url', 'fields', 'expires_in'}`` for a direct upload
+    of one avatar image by the user.
+    """
+    key = f'{upload_prefix(user_id)}{uuid.uuid4().hex}'
+    expires_in = settings.AVATAR_UPLOAD_EXPIRY
+    max_bytes = settings.AVATAR_MAX_UPLOAD_BYTES
+
+    if hasattr(default_storage, 'bucket'):
+        # S3 (or an S3-compatible stand-in such as MinIO).
+        post = default_storage.bucket.meta.client.generate_presigned_post(
+            Bucket=default_storage.bucket_name,
+            Key=default_storage._normalize_name(key),
+            Fields={'Content-Type': content_type},
+            Conditions=[
+                {'Content-Type': content_type},
+                ['content-length-range', 1, max_bytes],
+            ],
+            ExpiresIn=expires_in,
+        )
+        return {'key': key, 'url': post['url'], 'fields': post['fields'], 'expires_in': expires_in}
+
+    token = signing.dumps({'key': key, 'content_type': content_type}, salt=UPLOAD_SIGNING_SALT)
+    return {
+        'key': key,
+        'url': local_upload_url,
+        'fields': {'key': key, 'Content-Type': content_type, 'token': token},
+        'expires_in': expires_in,
+    }
+
+
+def check_upload_token(token):
+    """
+    Return the ``{'key', 'content_type'}`` signed into a local upload token;
+    raises signing.BadSignature if it is invalid or expired.
+    """
+    return signing.loads(token, salt=UPLOAD_SIGNING_SALT, max_age=settings.AVATAR_UPLOAD_EXPIRY)
+
+
+def open_image(data):
+    """
+    Open an uploaded image, rejecting it from its header alone if it is not
+    an allowed format or too large to decode.
+    """
+    try:
+        image = Image.open(io.BytesIO(data))
+    except Exception:
+        raise AvatarRejected('not an image')
+    if image.format not in ALLOWED_CONTENT_TYPES.values():
+        raise AvatarRejected(f'unsupported format {image.format}')
+    if image.width * image.height > settings.AVATAR_MAX_PIXELS:
+        raise AvatarRejected(f'{image.width}x{image.height} exceeds AVATAR_MAX_PIXELS')
+    largest = max(settings.AVATAR_SIZES)
+    # JPEG only: decode at the smallest 1/2^n scale that still covers the
+    # largest variant.
+    image.draft('RGB', (largest, largest))
+    try:
+        return ImageOps.exif_transpose(image)
+    except Exception:
+        raise AvatarRejected('corrupt image')
+
+
+def render_variants(image):
+    """
+    Return ``{size: {extension: bytes}}`` for every size in AVATAR_SIZES.
+    """
+    has_alpha = image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info)
+    image = image.convert('RGBA' if has_alpha else 'RGB')
+    variants = {}
+    # Largest first, each smaller size from the previous one.
+    source = image
+    for size in sorted(settings.AVATAR_SIZES, reverse=True):
+        source = ImageOps.fit(source, (size, size), Image.LANCZOS)
+        flattened = source
+        if has_alpha:
+            flattened = Image.new('RGB', source.size, 'white')
+            flattened.paste(source, mask=source.getchannel('A'))
+        variants[size] = {}
+        for extension, image_format, options in OUTPUT_FORMATS:
+            out = io.BytesIO()
+            # Encoders only write metadata passed to save(), so none is kept.
+            (source if image_format == 'WEBP' else flattened).save(out, image_format, **options)
+            variants[size][extension] = out.getvalue()
+    return variants
+
+
+def process_upload(user_id, key):
+    """
+    Turn an uploaded original into avatar variants and attach them to the
+    user's profile. The original is deleted either way. Returns whether the
+    profile was updated.
+    """
+    from apps.accounts.models import Profile
+
+    if not is_upload_key(user_id, key):
+        raise ValueError(f'{key} is not an avatar upload of user {user_id}')
+    try:
+        if default_storage.size(key) > settings.AVATAR_MAX_UPLOAD_BYTES:
+            raise AvatarRejected('file too large')
+        with default_storage.open(key, 'rb') as f:
+            data = f.read()
+        variants = render_variants(open_image(data))
+    except AvatarRejected as exc:
+        logger.info('Rejected avatar upload %s: %s', key, exc)
+        metrics.inc('avatar_uploads_rejected_total')
+        default_storage.delete(key)
+        return False
+
+    directory = f'avatars/{user_id}/{posixpath.basename(key)}'
+    names = {}
+    for size, encoded in variants.items():
+        names[str(size)] = {
+            extension: default_storage.save(f'{directory}/{size}.{extension}', ContentFile(content))
+            for extension, content in encoded.items()
+        }
+    default_storage.delete(key)
+
+    # Lock the row so that two uploads processed together each see the
+    # other's variants as the previous ones, and write only the avatar
+    # fields so that concurrent profile edits are not overwritten.
+    with transaction.atomic():
+        profile = Profile.objects.select_for_update().get(user_id=user_id)
+        previous = profile.avatar_variants or {}
+        profile.avatar_variants = names
+        profile.avatar = names[str(max(settings.AVATAR_SIZES))]['jpeg']
+        profile.save(update_fields=['avatar', 'avatar_variants', 'updated_at'])
+    for formats in previous.values():
+        for name in formats.values():
+            default_storage.delete(name)
+    metrics.inc('avatar_uploads_processed_total')
+    return True
@@ -0,0 +1,87 @@
+"""
+Authentication backends for the accounts app.
+"""
+
+import logging
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.hashers import check_password, get_hasher, identify_hasher, make_password
+from django.db import connection
+
+from apps.accounts.authentication import forget_user
+from apps.accounts.hashing import hashing_executor
+from apps.core import metrics
+from apps.core.caching import touch
+
+logger = logging.getLogger(__name__)
+
+UserModel = get_user_model()
+
+
+def needs_rehash(encoded):
+    """
+    Return whether a stored hash uses a hasher or parameters other than the
+    preferred ones.
+    """
+    try:
+        hasher = identify_hasher(encoded)
+    except ValueError:
+        return False
+    preferred = get_hasher('default')
+    return hasher.algorithm != preferred.algorithm or preferred.must_update(encoded)
+
+
+def rehash_password(user_id, encoded, password):
+    """
+    Store a fresh hash of ``password``, unless the stored hash changed since
+    ``encoded`` was read (e.g. a password change in the meantime).
+    """
+    try:
+        updated = UserModel._default_manager.filter(pk=user_id, password=encoded).update(
+            password=make_password(password),
+        )
+        metrics.inc('password_rehash_total' if updated else 'password_rehash_stale_total')
+        if updated:
+            # update() sends no post_save: drop the cached user and its
+            # representations, which still hold the old hash.
+            forget_user(user_id)
+            touch(UserModel._meta.label_lower, user_id)
+    except Exception:
+        logger.exception('Password rehash failed', extra={'user_id': user_id})
+    finally:
+        # Runs on a hashing pool thread, which would otherwise keep its own
+        # database connection open forever.
+        connection.close()
+
+
+class DeferredRehashModelBackend(ModelBackend):
+    """
+    ModelBackend that upgrades outdated password hashes in the background.
+
+    Django's ModelBackend rehashes and saves the user inline when the stored
+    hash is outdated, doubling the hashing cost of that login. This backend
+    verifies without rehashing and hands the upgrade to the hashing pool to
+    run in the background; if the pool is busy the upgrade is simply left
+    for a later login. The rehash stays in-process rather than
+    going through Celery so the plaintext password never reaches the broker.
+    """
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        if username is None:
+            username = kwargs.get(UserModel.USERNAME_FIELD)
+        if username is None or password is None:
+            return
+        try:
+            user = UserModel._default_manager.get_by_natural_key(username)
+        except UserModel.DoesNotExist:
+            # Run the default password hasher once to reduce the timing
+            # difference between an existing and a nonexistent user.
+            UserModel().set_password(password)
+            return
+        if not (check_password(password, user.password) and self.user_can_authenticate(user)):
+            return
+        if needs_rehash(user.password):
+            if not hashing_executor.run_later(rehash_password, user.pk, user.password, password):
+                metrics.inc('password_rehash_skipped_total')
+        return user
@@ -0,0 +1,252 @@
+"""
+Redis-backed refresh token blacklist.
+
+simplejwt's token_blacklist app records every issued and every blacklisted
+token in Postgres and needs a periodic flush. Here a blacklisted token is a
+Redis key ``jwt:blacklist:<jti>`` that expires with the token, plus an entry
+in a sorted set of jtis scored by expiry that cleanup_expired_tokens trims.
+
+Rotation claims the presented refresh token with a single SET NX, so of
+several requests presenting the same token exactly one rotates it; there is
+no check-then-insert window.
+
+Membership checks go through an in-process bloom filter of blacklisted jtis.
+A daemon thread per process subscribes to a pub/sub channel on which every
+blacklisting is announced, loads the sorted set once subscribed and then
+adds announced jtis as they arrive. A "no" from the filter skips Redis; a
+"maybe" is confirmed with EXISTS, as is every check while the listener is
+(re)connecting or rebuilding. A jti blacklisted by another process is
+visible to the filter once its announcement arrives, normally within a
+millisecond; rotation does not depend on this since its SET NX is atomic.
+
+Rotation is coalesced: the request whose claim succeeds stores the new
+pair under ``jwt:rotated:<jti>`` for JWT_REFRESH_COALESCE_WINDOW seconds,
+and requests presenting the same old token meanwhile (several tabs
+refreshing at once) wait up to JWT_REFRESH_COALESCE_WAIT seconds for it and
+receive the same pair instead of an error and a forced login. The blacklist
+key holds the claim time, so only requests for a rotation claimed less than
+JWT_REFRESH_COALESCE_WAIT seconds ago wait; replays of tokens rotated
+earlier are answered at once.
+
+Like the other Redis-backed guards, the blacklist fails open when Redis is
+unavailable.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+
+from django.conf import settings
+
+from apps.core import metrics
+from apps.core.bloom import BloomFilter
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = 'jwt:blacklist'
+INDEX_KEY = f'{KEY_PREFIX}:index'
+CHANNEL = f'{KEY_PREFIX}:announce'
+# Published instead of a jti to make every process rebuild its filter.
+REBUILD = b'*'
+LOAD_PAGE_SIZE = 10000
+RECONNECT_DELAY = 1.0
+ROTATED_PREFIX = 'jwt:rotated'
+ROTATION_POLL_INTERVAL = 0.025
+
+# KEYS: the jti key, the index. ARGV: jti, expiry (Unix seconds), channel.
+# The jti key holds the claim time in Unix milliseconds. Returns 1 if the
+# token was blacklisted now, 0 if it already was.
+BLACKLIST_SCRIPT = """
+local now = redis.call('TIME')
+local ttl = tonumber(ARGV[2]) - tonumber(now[1])
+if ttl < 1 then
+    ttl = 1
+end
+local claimed = tonumber(now[1]) * 1000 + math.floor(tonumber(now[2]) / 1000)
+if not redis.call('SET', KEYS[1], string.format('%d', claimed), 'NX', 'EX', ttl) then
+    return 0
+end
+redis.call('ZADD', KEYS[2], ARGV[2], ARGV[1])
+redis.call('PUBLISH', ARGV[3], ARGV[1])
+return 1
+"""
+
+_blacklist_script = None
+
+
+def _redis():
+    from django_redis import get_redis_connection
+
+    return get_redis_connection('default')
+
+
+def jti_key(jti):
+    return f'{KEY_PREFIX}:{jti}'
+
+
+class BlacklistFilter:
+    """
+    Per-process bloom filter kept in sync with the Redis blacklist.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self._lock = threading.Lock()
+        self._thread = None
+        self._bloom = None
+        self.ready = False
+
+    def _new_bloom(self):
+        return BloomFilter.for_capacity(settings.JWT_BLACKLIST_BLOOM_CAPACITY, settings.JWT_BLACKLIST_BLOOM_ERROR_RATE)
+
+    def ensure_started(self):
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._listen, name='jwt-blacklist', daemon=True)
+                    self._thread.start()
+
+    def _load(self, client):
+        bloom = self._new_bloom()
+        offset = 0
+        while True:
+            page = client.zrangebyscore(INDEX_KEY, time.time(), '+inf', start=offset, num=LOAD_PAGE_SIZE)
+            for jti in page:
+                bloom.add(jti)
+            if len(page) < LOAD_PAGE_SIZE:
+                break
+            offset += LOAD_PAGE_SIZE
+        self._bloom = bloom
+
+    def _listen(self):
+        while True:
+            pubsub = None
+            try:
+                client = _redis()
+                pubsub = client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(CHANNEL)
+                # Subscribe first: anything blacklisted while loading is
+                # buffered on the subscription and added afterwards.
+                self._load(client)
+                self.ready = True
+                for message in pubsub.listen():
+                    if message['data'] == REBUILD:
+                        self.ready = False
+                        self._load(client)
+                        self.ready = True
+                    else:
+                        self._bloom.add(message['data'])
+            except Exception:
+                logger.warning('JWT blacklist listener disconnected', exc_info=True)
+            finally:
+                self.ready = False
+                if pubsub is not None:
+                    try:
+                        pubsub.close()
+                    except Exception:
+                        pass
+            time.sleep(RECONNECT_DELAY)
+
+    def might_contain(self, jti):
+        """
+        Return False only if the jti is certainly not blacklisted.
+        """
+        self.ensure_started()
+        if not self.ready:
+            return True
+        return jti.encode() in self._bloom
+
+
+blacklist_filter = BlacklistFilter()
+os.register_at_fork(after_in_child=blacklist_filter.reset)
+
+
+def is_blacklisted(jti):
+    """
+    Return whether the refresh token with this jti is blacklisted.
+    """
+    if not blacklist_filter.might_contain(jti):
+        return False
+    try:
+        return bool(_redis().exists(jti_key(jti)))
+    except Exception:
+        logger.warning('JWT blacklist unavailable', exc_info=True)
+        return False
+
+
+def blacklist(jti, exp):
+    """
+    Blacklist a token until its expiry. Returns False if it already was.
+    """
+    global _blacklist_script
+
+    try:
+        client = _redis()
+        if _blacklist_script is None:
+            _blacklist_script = client.register_script(BLACKLIST_SCRIPT)
+        return bool(_blacklist_script(keys=[jti_key(jti), INDEX_KEY], args=[jti, int(exp), CHANNEL], client=client))
+    except Exception:
+        logger.warning('JWT blacklist unavailable', exc_info=True)
+        return True
+
+
+def remember_rotation(jti, data):
+    """
+    Keep the response of the rotation of ``jti`` for concurrent refreshes.
+    """
+    try:
+        _redis().set(f'{ROTATED_PREFIX}:{jti}', json.dumps(data), ex=settings.JWT_REFRESH_COALESCE_WINDOW)
+    except Exception:
+        logger.warning('Failed to store rotated token pair', exc_info=True)
+
+
+def wait_for_rotation(jti):
+    """
+    Return the response of a recent or in-flight rotation of ``jti``, or
+    None if none turns up within JWT_REFRESH_COALESCE_WAIT seconds of the
+    rotation's claim.
+    """
+    key = f'{ROTATED_PREFIX}:{jti}'
+    wait = settings.JWT_REFRESH_COALESCE_WAIT
+    try:
+        client = _redis()
+        pipe = client.pipeline(transaction=False)
+        pipe.get(key)
+        pipe.get(jti_key(jti))
+        pipe.time()
+        raw, claimed, (seconds, microseconds) = pipe.execute()
+        # Only a claim younger than the wait can still produce a pair; a
+        # replay of a token rotated earlier must not hold a worker thread.
+        try:
+            remaining = float(claimed) / 1000 + wait - (seconds + microseconds / 1e6)
+        except (TypeError, ValueError):
+            remaining = 0
+        deadline = time.monotonic() + min(remaining, wait)
+        while True:
+            if raw is not None:
+                metrics.inc('jwt_refresh_coalesced_total')
+                return json.loads(raw)
+            if time.monotonic() >= deadline:
+                return None
+            time.sleep(ROTATION_POLL_INTERVAL)
+            raw = client.get(key)
+    except Exception:
+        logger.warning('JWT blacklist unavailable', exc_info=True)
+        return None
+
+
+def cleanup_expired():
+    """
+    Drop expired tokens from the index and, if any were dropped, have every
+    process rebuild its filter without them. The per-token keys expire on
+    their own. Returns the number of index entries removed.
+    """
+    client = _redis()
+    removed = client.zremrangebyscore(INDEX_KEY, '-inf', time.time())
+    if removed:
+        client.publish(CHANNEL, REBUILD)
+    return removed
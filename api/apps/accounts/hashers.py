@@ -0,0 +1,50 @@
+"""
+Password hashers that run on the bulkheaded hashing pool.
+
+They keep the algorithm names of the Django hashers they extend, so stored
+hashes are unaffected; only where the hashing runs changes.
+"""
+
+from django.conf import settings
+from django.contrib.auth.hashers import Argon2PasswordHasher, PBKDF2PasswordHasher
+
+from apps.accounts.hashing import hashing_executor
+
+
+class BulkheadMixin:
+    """
+    Run encode, verify and harden_runtime on the hashing pool.
+    """
+
+    def encode(self, password, salt, *args, **kwargs):
+        return hashing_executor.run(super().encode, password, salt, *args, **kwargs)
+
+    def verify(self, password, encoded):
+        return hashing_executor.run(super().verify, password, encoded)
+
+    def harden_runtime(self, password, encoded):
+        return hashing_executor.run(super().harden_runtime, password, encoded)
+
+
+class BulkheadedPBKDF2PasswordHasher(BulkheadMixin, PBKDF2PasswordHasher):
+    pass
+
+
+class BulkheadedArgon2PasswordHasher(BulkheadMixin, Argon2PasswordHasher):
+    """
+    Argon2 with its cost taken from the PASSWORD_ARGON2_* settings, which
+    calibrate_password_hasher picks for this hardware. Hashes made with
+    other parameters are upgraded on the next login.
+    """
+
+    @property
+    def time_cost(self):
+        return settings.PASSWORD_ARGON2_TIME_COST
+
+    @property
+    def memory_cost(self):
+        return settings.PASSWORD_ARGON2_MEMORY_COST
+
+    @property
+    def parallelism(self):
+        return settings.PASSWORD_ARGON2_PARALLELISM
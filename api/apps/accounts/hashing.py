@@ -0,0 +1,131 @@
+"""
+Bulkheaded password hashing.
+
+Password hashing is deliberately slow and CPU bound. Running it on the
+request threads lets a login flood occupy every thread of every gunicorn
+worker, so cheap endpoints and health checks stall behind it. Instead the
+hashers in apps.accounts.hashers hand their work to a small per-process
+thread pool (PASSWORD_HASHING_WORKERS threads; argon2-cffi and hashlib
+release the GIL while hashing) with room for PASSWORD_HASHING_QUEUE waiting
+calls. A call that cannot get a slot within
+PASSWORD_HASHING_ADMISSION_TIMEOUT seconds raises HashingPoolSaturated,
+which HashingSaturationMiddleware turns into a 503 with Retry-After.
+
+Queue depth, wait time, hashing time and rejections are exported through
+apps.core.metrics.
+"""
+
+import math
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+
+from apps.core import metrics
+
+
+class HashingPoolSaturated(Exception):
+    """
+    Raised when no password hashing slot frees up in time.
+    """
+
+    def __init__(self, retry_after):
+        super().__init__('Password hashing pool is saturated')
+        self.retry_after = retry_after
+
+
+class HashingExecutor:
+    """
+    Bounded thread pool with admission control for password hashing.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._executor = None
+        self._slots = None
+        self._in_flight = 0
+        self._mean_duration = 0.1
+
+    def _ensure_started(self):
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    workers = settings.PASSWORD_HASHING_WORKERS
+                    self._slots = threading.BoundedSemaphore(workers + settings.PASSWORD_HASHING_QUEUE)
+                    self._executor = ThreadPoolExecutor(workers, thread_name_prefix='password-hashing')
+
+    def reset(self):
+        """
+        Forget the pool; used in forked children, which do not inherit threads.
+        """
+        self.__init__()
+
+    def retry_after(self):
+        """
+        Estimate how many seconds the current backlog needs to drain.
+        """
+        backlog = self._in_flight * self._mean_duration / settings.PASSWORD_HASHING_WORKERS
+        return max(1, math.ceil(backlog))
+
+    def run(self, func, *args, **kwargs):
+        """
+        Run ``func`` on the hashing pool and return its result.
+        """
+        if getattr(self._local, 'in_pool', False):
+            return func(*args, **kwargs)
+        self._ensure_started()
+        if not self._slots.acquire(timeout=settings.PASSWORD_HASHING_ADMISSION_TIMEOUT):
+            metrics.inc('password_hashing_rejected_total')
+            raise HashingPoolSaturated(self.retry_after())
+
+        with self._lock:
+            self._in_flight += 1
+            metrics.set_gauge('password_hashing_queue_depth', self._in_flight)
+        enqueued = time.monotonic()
+
+        def call():
+            started = time.monotonic()
+            metrics.observe('password_hashing_wait_seconds', started - enqueued)
+            self._local.in_pool = True
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self._local.in_pool = False
+                duration = time.monotonic() - started
+                self._mean_duration = 0.9 * self._mean_duration + 0.1 * duration
+                metrics.observe('password_hashing_seconds', duration)
+
+        try:
+            return self._executor.submit(call).result()
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+                metrics.set_gauge('password_hashing_queue_depth', self._in_flight)
+            self._slots.release()
+
+    def run_later(self, func, *args, **kwargs):
+        """
+        Run ``func`` on the hashing pool in the background if a slot is free
+        right now. Returns False, without running it, when the pool is busy.
+        """
+        self._ensure_started()
+        if not self._slots.acquire(blocking=False):
+            return False
+
+        def call():
+            self._local.in_pool = True
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self._local.in_pool = False
+                self._slots.release()
+
+        self._executor.submit(call)
+        return True
+
+
+hashing_executor = HashingExecutor()
+os.register_at_fork(after_in_child=hashing_executor.reset)
@@ -0,0 +1,76 @@
+"""
+Case-insensitive user lookup by email address.
+
+Lookups match ``lower(email)`` and so use the functional index that
+migration 0004 adds to auth_user. Addresses found to belong to no account
+are remembered in Redis for PASSWORD_RESET_NEGATIVE_CACHE_TIMEOUT seconds
+(under a hash, never the address itself), so a flood of reset requests for
+made-up addresses is handled without reaching Postgres. Saving a user
+forgets its address. The password reset endpoint only looks addresses up
+from Celery (request_password_reset), so neither path is visible in its
+response time.
+"""
+
+import hashlib
+import logging
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.functions import Lower
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = 'accounts:absent-email'
+
+
+def absent_email_key(email):
+    digest = hashlib.sha256(email.strip().lower().encode()).hexdigest()
+    return f'{KEY_PREFIX}:{digest}'
+
+
+def find_users_by_email(email):
+    """
+    Return the active users with a usable password whose email matches
+    ``email`` case-insensitively; addresses are not unique, so there may be
+    several.
+    """
+    key = absent_email_key(email)
+    try:
+        if cache.get(key):
+            return []
+    except Exception:
+        logger.warning('Absent email cache unavailable', exc_info=True)
+
+    users = list(
+        get_user_model().objects
+        .annotate(email_lower=Lower('email'))
+        .filter(email_lower=email.strip().lower(), is_active=True)
+    )
+    users = [user for user in users if user.has_usable_password()]
+    if not users:
+        try:
+            cache.set(key, 1, settings.PASSWORD_RESET_NEGATIVE_CACHE_TIMEOUT)
+        except Exception:
+            logger.warning('Absent email cache unavailable', exc_info=True)
+    return users
+
+
+def forget_absent_email(email):
+    """
+    Drop an address from the absent cache, now and again once the
+    transaction commits so a concurrent lookup cannot re-cache it.
+    """
+    if not email:
+        return
+    key = absent_email_key(email)
+
+    def forget():
+        try:
+            cache.delete(key)
+        except Exception:
+            logger.warning('Failed to forget absent email', exc_info=True)
+
+    forget()
+    transaction.on_commit(forget)
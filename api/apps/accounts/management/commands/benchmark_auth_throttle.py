@@ -0,0 +1,96 @@
+"""
+Benchmark auth throttle overhead and accuracy under concurrency.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory, override_settings
+from rest_framework.parsers import JSONParser
+from rest_framework.request import Request
+from rest_framework.throttling import ScopedRateThrottle
+
+from apps.accounts.throttling import KEY_PREFIX, AuthRateThrottle, _redis
+from apps.core.benchmarks import format_summary, summarize, time_calls
+
+SCOPE = 'benchmark'
+
+
+class BenchmarkView:
+    throttle_scope = SCOPE
+    throttle_check_lockout = True
+
+
+class Command(BaseCommand):
+    help = 'Measure per-request overhead of AuthRateThrottle versus ScopedRateThrottle, and how many requests each lets past a limit.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=2000, help='Requests per thread for the overhead runs')
+        parser.add_argument('--concurrency', type=int, default=8, help='Concurrent threads')
+        parser.add_argument('--limit', type=int, default=50, help='Requests per minute allowed in the accuracy run')
+
+    def handle(self, *args, **options):
+        factory = RequestFactory()
+        counter = iter(range(10**9))
+        counter_lock = threading.Lock()
+
+        def make_request(shared_key=False):
+            with counter_lock:
+                n = next(counter)
+            address = '198.51.100.1' if shared_key else f'10.{n >> 16 & 255}.{n >> 8 & 255}.{n & 255}'
+            username = 'bench-shared' if shared_key else f'bench{n}'
+            django_request = factory.post(
+                '/api/auth/login/', {'username': username}, content_type='application/json', REMOTE_ADDR=address,
+            )
+            return Request(django_request, parsers=[JSONParser()])
+
+        view = BenchmarkView()
+
+        def run(throttle_class, requests, shared_key=False):
+            """
+            Return (per-call samples, number of requests allowed).
+            """
+            allowed = []
+
+            def worker():
+                throttle = throttle_class()
+                samples = []
+                for _ in range(requests):
+                    request = make_request(shared_key)
+                    samples += time_calls(lambda: allowed.append(throttle.allow_request(request, view)), 1)
+                return samples
+
+            with ThreadPoolExecutor(options['concurrency']) as pool:
+                futures = [pool.submit(worker) for _ in range(options['concurrency'])]
+                samples = [sample for future in futures for sample in future.result()]
+            return samples, sum(allowed)
+
+        rest_framework = settings.REST_FRAMEWORK
+        try:
+            for label, rate, requests, shared_key in (
+                ('overhead', '1000000/min', options['requests'], False),
+                ('accuracy', f'{options["limit"]}/min', options['limit'], True),
+            ):
+                rates = {**rest_framework.get('DEFAULT_THROTTLE_RATES', {}), SCOPE: rate, f'{SCOPE}_username': rate}
+
+                class DRFThrottle(ScopedRateThrottle):
+                    THROTTLE_RATES = rates
+
+                with override_settings(REST_FRAMEWORK={**rest_framework, 'DEFAULT_THROTTLE_RATES': rates}):
+                    for name, throttle_class in (('ScopedRateThrottle', DRFThrottle), ('AuthRateThrottle', AuthRateThrottle)):
+                        samples, allowed = run(throttle_class, requests, shared_key)
+                        if label == 'overhead':
+                            self.stdout.write(format_summary(name, summarize(samples)))
+                        else:
+                            self.stdout.write(
+                                f'{name:<24} allowed {allowed} of {len(samples)} concurrent requests '
+                                f'(limit {options["limit"]})'
+                            )
+        finally:
+            cache.delete(f'throttle_{SCOPE}_198.51.100.1')
+            client = _redis()
+            for key in client.scan_iter(f'{KEY_PREFIX}:{SCOPE}:*', count=1000):
+                client.delete(key)
@@ -0,0 +1,53 @@
+"""
+Benchmark the profile endpoint with simplejwt's JWTAuthentication and with
+CachedJWTAuthentication.
+"""
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import Client
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from apps.accounts.authentication import CachedJWTAuthentication, forget_user
+from apps.accounts.serializers import CustomTokenObtainPairSerializer
+from apps.accounts.views import UserProfileView
+from apps.core.benchmarks import format_summary, summarize, time_calls
+from apps.core.caching import stamp_key
+
+
+class Command(BaseCommand):
+    help = 'Measure requests per second on /api/auth/profile/ with JWTAuthentication versus CachedJWTAuthentication.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=2000, help='Requests per authentication class')
+        parser.add_argument('--host', default='localhost', help='Host header sent with each request')
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        original_classes = UserProfileView.authentication_classes
+        # Everything runs in one rolled back transaction so the benchmark
+        # leaves no user behind.
+        with transaction.atomic():
+            user = User.objects.create_user(username='bench-jwt', email='bench-jwt@example.com', password=None)
+            token = CustomTokenObtainPairSerializer.get_token(user).access_token
+            client = Client(HTTP_HOST=options['host'], HTTP_AUTHORIZATION=f'Bearer {token}')
+
+            def request():
+                client.get('/api/auth/profile/')
+
+            try:
+                for auth_class in (JWTAuthentication, CachedJWTAuthentication):
+                    UserProfileView.authentication_classes = [auth_class]
+                    request()  # warm up connections and caches
+                    samples = time_calls(request, options['requests'])
+                    self.stdout.write(
+                        f'{format_summary(auth_class.__name__, summarize(samples))} '
+                        f'rps={len(samples) / sum(samples):.0f}'
+                    )
+            finally:
+                UserProfileView.authentication_classes = original_classes
+                transaction.set_rollback(True)
+        forget_user(user.pk)
+        cache.delete(stamp_key(User._meta.label_lower, user.pk))
@@ -0,0 +1,50 @@
+"""
+Benchmark password validation with Django's validators and with the
+accounts app's replacements.
+"""
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.password_validation import (
+    CommonPasswordValidator,
+    UserAttributeSimilarityValidator,
+    validate_password,
+)
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand
+
+from apps.accounts.validators import BoundedUserAttributeSimilarityValidator, BreachedPasswordValidator
+from apps.core.benchmarks import format_summary, summarize, time_calls
+
+PASSWORDS = {
+    'short': 'Tr0ub4dor&3',
+    'passphrase': 'correct horse battery staple and then some',
+    'long (4 KiB)': 'x9!Qz' * 820,
+}
+
+
+class Command(BaseCommand):
+    help = 'Measure validate_password latency with Django validators versus BreachedPasswordValidator and BoundedUserAttributeSimilarityValidator.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=2000, help='Validations per password and validator set')
+
+    def handle(self, *args, **options):
+        user = get_user_model()(
+            username='benchmark.user', first_name='Benchmark', last_name='User',
+            email='benchmark.user@example.com',
+        )
+        validator_sets = (
+            ('django', [UserAttributeSimilarityValidator(), CommonPasswordValidator()]),
+            ('accounts', [BoundedUserAttributeSimilarityValidator(), BreachedPasswordValidator()]),
+        )
+        for label, validators in validator_sets:
+            def validate():
+                try:
+                    validate_password(password, user, password_validators=validators)
+                except ValidationError:
+                    pass
+
+            for name, password in PASSWORDS.items():
+                validate()  # load password lists and filters
+                samples = time_calls(validate, options['iterations'])
+                self.stdout.write(format_summary(f'{label} {name}', summarize(samples)))
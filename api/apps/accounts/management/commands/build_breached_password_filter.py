@@ -0,0 +1,103 @@
+"""
+Build the bloom filter file used by BreachedPasswordValidator.
+"""
+
+import gzip
+import hashlib
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.core.bloom import BloomFilter
+
+PROGRESS_EVERY = 10_000_000
+
+
+class Command(BaseCommand):
+    help = (
+        'Build a breached password bloom filter from SHA-1 hash lists (Pwned Passwords "HASH:COUNT" '
+        'lines) or, with --plaintext, from one password per line. Files ending in .gz are decompressed; '
+        '"-" reads standard input.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('sources', nargs='+', help='Input files')
+        parser.add_argument('--output', default=None, help='Filter file to write (defaults to BREACHED_PASSWORD_FILTER)')
+        parser.add_argument('--error-rate', type=float, default=0.001, help='Target false positive rate')
+        parser.add_argument(
+            '--capacity', type=int, default=None,
+            help='Number of entries to size the filter for; counted from the inputs when omitted',
+        )
+        parser.add_argument('--plaintext', action='store_true', help='Inputs hold passwords rather than SHA-1 hashes')
+
+    def open_source(self, source):
+        if source == '-':
+            return sys.stdin.buffer
+        if source.endswith('.gz'):
+            return gzip.open(source, 'rb')
+        return open(source, 'rb')
+
+    def lines(self, sources):
+        """
+        Yield the non-empty lines of the sources with their source name.
+        """
+        for source in sources:
+            f = self.open_source(source)
+            try:
+                for line in f:
+                    line = line.rstrip(b'\r\n')
+                    if line:
+                        yield source, line
+            finally:
+                if f is not sys.stdin.buffer:
+                    f.close()
+
+    def entries(self, sources, plaintext):
+        """
+        Yield the SHA-1 digest of every entry in the sources.
+        """
+        for source, line in self.lines(sources):
+            if plaintext:
+                yield hashlib.sha1(line, usedforsecurity=False).digest()
+                continue
+            try:
+                digest = bytes.fromhex(line.split(b':', 1)[0].decode('ascii'))
+            except ValueError:
+                digest = b''
+            if len(digest) != 20:
+                raise CommandError(f'{source}: not a SHA-1 hash: {line[:60]!r}')
+            yield digest
+
+    def handle(self, *args, **options):
+        output = options['output'] or settings.BREACHED_PASSWORD_FILTER
+        if not output:
+            raise CommandError('Pass --output or set BREACHED_PASSWORD_FILTER.')
+
+        capacity = options['capacity']
+        if capacity is None:
+            if '-' in options['sources']:
+                raise CommandError('--capacity is required when reading standard input.')
+            capacity = sum(1 for _ in self.lines(options['sources']))
+
+        bloom = BloomFilter.for_capacity(capacity, options['error_rate'])
+        self.stdout.write(
+            f'Sizing for {capacity} entries at {options["error_rate"]:.2%}: '
+            f'{len(bloom.bits) / 2**20:.1f} MiB, {bloom.hashes} hashes'
+        )
+
+        start = time.monotonic()
+        added = 0
+        for digest in self.entries(options['sources'], options['plaintext']):
+            bloom.add(digest)
+            added += 1
+            if added % PROGRESS_EVERY == 0:
+                self.stdout.write(f'  {added} entries, {time.monotonic() - start:.0f}s')
+        if added > capacity:
+            self.stderr.write(self.style.WARNING(
+                f'{added} entries exceed the capacity of {capacity}; the false positive rate will be higher.'
+            ))
+
+        bloom.save(output)
+        self.stdout.write(self.style.SUCCESS(f'Wrote {added} entries to {output} in {time.monotonic() - start:.0f}s'))
@@ -0,0 +1,87 @@
+"""
+Pick Argon2 parameters for this machine.
+"""
+
+import os
+import statistics
+import time
+
+from argon2 import PasswordHasher, Type
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark Argon2 on this machine and print the PASSWORD_ARGON2_* settings '
+        'with the most memory and time cost that verify within the target latency.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--target-ms', type=float, default=250, help='Target verify latency in milliseconds')
+        parser.add_argument('--max-memory-mib', type=int, default=64, help='Memory budget per hash in MiB')
+        parser.add_argument('--min-memory-mib', type=int, default=8, help='Smallest memory cost to consider')
+        parser.add_argument(
+            '--parallelism', type=int, default=1,
+            help='Argon2 lanes per hash; 1 leaves the other cores to concurrent logins',
+        )
+        parser.add_argument('--samples', type=int, default=5, help='Verifications timed per candidate')
+
+    def measure(self, time_cost, memory_kib, parallelism, samples):
+        """
+        Return the median verify time in milliseconds for the parameters.
+        """
+        hasher = PasswordHasher(
+            time_cost=time_cost, memory_cost=memory_kib, parallelism=parallelism, type=Type.ID,
+        )
+        encoded = hasher.hash('calibration-password')
+        timings = []
+        for _ in range(samples):
+            start = time.perf_counter()
+            hasher.verify(encoded, 'calibration-password')
+            timings.append((time.perf_counter() - start) * 1000)
+        return statistics.median(timings)
+
+    def handle(self, *args, **options):
+        target = options['target_ms']
+        parallelism = options['parallelism']
+        samples = options['samples']
+        self.stdout.write(f'CPUs: {os.cpu_count()}, target: {target:.0f} ms, parallelism: {parallelism}')
+
+        # Prefer memory over iterations: start at the budget and halve the
+        # memory until one pass fits, then add passes while they still fit.
+        memory_mib = options['max_memory_mib']
+        chosen = None
+        while memory_mib >= options['min_memory_mib']:
+            elapsed = self.measure(1, memory_mib * 1024, parallelism, samples)
+            self.stdout.write(f'  m={memory_mib:>4} MiB t=1  {elapsed:8.1f} ms')
+            if elapsed <= target:
+                chosen = (1, memory_mib, elapsed)
+                break
+            memory_mib //= 2
+        if chosen is None:
+            self.stderr.write(self.style.ERROR(
+                f'Even {options["min_memory_mib"]} MiB with one pass exceeds {target:.0f} ms; '
+                'raise --target-ms or lower --min-memory-mib.'
+            ))
+            return
+
+        time_cost = 1
+        while True:
+            elapsed = self.measure(time_cost + 1, memory_mib * 1024, parallelism, samples)
+            self.stdout.write(f'  m={memory_mib:>4} MiB t={time_cost + 1:<2} {elapsed:8.1f} ms')
+            if elapsed > target:
+                break
+            time_cost += 1
+            chosen = (time_cost, memory_mib, elapsed)
+
+        time_cost, memory_mib, elapsed = chosen
+        workers = settings.PASSWORD_HASHING_WORKERS
+        self.stdout.write('')
+        self.stdout.write(self.style.SUCCESS(
+            f'Argon2id t={time_cost}, m={memory_mib} MiB, p={parallelism}: {elapsed:.1f} ms per verify, '
+            f'about {workers * 1000 / elapsed:.0f} logins/s per process with {workers} hashing workers'
+        ))
+        self.stdout.write(f'PASSWORD_ARGON2_TIME_COST={time_cost}')
+        self.stdout.write(f'PASSWORD_ARGON2_MEMORY_COST={memory_mib * 1024}')
+        self.stdout.write(f'PASSWORD_ARGON2_PARALLELISM={parallelism}')
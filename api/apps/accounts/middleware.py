@@ -0,0 +1,25 @@
+"""
+Middleware for the accounts app.
+"""
+
+from django.http import JsonResponse
+from django.utils.deprecation import MiddlewareMixin
+
+from apps.accounts.hashing import HashingPoolSaturated
+
+
+class HashingSaturationMiddleware(MiddlewareMixin):
+    """
+    Turn a saturated password hashing pool into a fast 503 with Retry-After
+    instead of an error or a request stuck behind the backlog.
+    """
+
+    def process_exception(self, request, exception):
+        if not isinstance(exception, HashingPoolSaturated):
+            return None
+        response = JsonResponse(
+            {'detail': 'Authentication is temporarily busy. Please retry shortly.'},
+            status=503,
+        )
+        response['Retry-After'] = str(exception.retry_after)
+        return response
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.10 on 2026-10-17 18:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="loginattempt",
+            index=models.Index(fields=["username", "created_at"], name="accounts_attempt_user_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="loginattempt",
+            index=models.Index(fields=["ip_address", "created_at"], name="accounts_attempt_ip_idx"),
+        ),
+    ]
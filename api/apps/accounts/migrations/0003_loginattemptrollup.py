@@ -0,0 +1,52 @@
+# Generated by Django 4.2.10 on 2026-10-17 18:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0002_loginattempt_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="LoginAttemptRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("hour", models.DateTimeField()),
+                ("ip_address", models.GenericIPAddressField()),
+                ("username", models.CharField(max_length=150)),
+                ("successful", models.BooleanField()),
+                ("attempts", models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                "verbose_name": "Login attempt rollup",
+                "indexes": [
+                    models.Index(fields=["successful", "hour"], name="accounts_rollup_outcome_idx")
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name="RollupCheckpoint",
+            fields=[
+                ("name", models.CharField(max_length=100, primary_key=True, serialize=False)),
+                ("position", models.BigIntegerField(default=0)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="loginattemptrollup",
+            constraint=models.UniqueConstraint(
+                fields=("hour", "ip_address", "username", "successful"), name="accounts_rollup_key"
+            ),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.10 on 2026-10-17 21:40
+
+from django.conf import settings
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction.
+    atomic = False
+
+    dependencies = [
+        ("accounts", "0003_loginattemptrollup"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        # auth_user belongs to django.contrib.auth, so the index is created
+        # with SQL rather than declared on the model. Built concurrently to
+        # avoid locking the users table against logins and sign-ups.
+        migrations.RunSQL(
+            sql="CREATE INDEX CONCURRENTLY IF NOT EXISTS accounts_user_email_lower_idx ON auth_user (lower(email))",
+            reverse_sql="DROP INDEX CONCURRENTLY IF EXISTS accounts_user_email_lower_idx",
+        ),
+    ]
@@ -4,9 +4,11 @@ Models for the accounts app.
 
 from django.db import models
 from django.contrib.auth.models import User
-from django.db.models.signals import post_save
+from django.contrib.auth.signals import user_login_failed
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
+from apps.core.caching import touch
 from apps.core.models import TimeStampedModel, UUIDModel
 
 
@@ -17,6 +19,9 @@ class Profile(UUIDModel, TimeStampedModel):
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='profile')
     bio = models.TextField(max_length=500, blank=True)
     avatar = models.ImageField(upload_to='avatars/', null=True, blank=True)
+    # Storage names of the processed avatar by size and format, e.g.
+    # {"64": {"webp": ..., "jpeg": ...}} (see apps.accounts.avatars).
+    avatar_variants = models.JSONField(default=dict, blank=True)
     phone_number = models.CharField(max_length=20, blank=True)
     
     def __str__(self):
@@ -33,17 +38,53 @@ def create_user_profile(sender, instance, created, **kwargs):
 
 
 @receiver(post_save, sender=User)
-def save_user_profile(sender, instance, **kwargs):
+def save_user_profile(sender, instance, created, **kwargs):
     """
     Signal handler to save a profile when a user is saved.
+
+    Only a profile already loaded on the user can carry unsaved changes, so
+    nothing is fetched; Profile's dirty tracking skips the save when none of
+    its fields changed.
     """
-    try:
-        # Check if profile exists before saving
-        if hasattr(instance, 'profile'):
-            instance.profile.save()
-    except User.profile.RelatedObjectDoesNotExist:
-        # Create profile if it doesn't exist
-        Profile.objects.create(user=instance)
+    if created:
+        # create_user_profile has just inserted it.
+        return
+    if User.profile.is_cached(instance):
+        instance.profile.save()
+
+
+@receiver(post_save, sender=User)
+@receiver(post_save, sender=Profile)
+def touch_user(sender, instance, **kwargs):
+    """
+    Signal handler to invalidate cached representations of a user (see
+    apps.core.caching) when the user or their profile changes.
+    """
+    user_id = instance.pk if sender is User else instance.user_id
+    touch(User._meta.label_lower, user_id)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def forget_cached_user(sender, instance, **kwargs):
+    """
+    Signal handler to drop a saved or deleted user from the authentication
+    caches.
+    """
+    from apps.accounts.authentication import forget_user
+
+    forget_user(instance.pk)
+
+
+@receiver(post_save, sender=User)
+def forget_absent_email(sender, instance, **kwargs):
+    """
+    Signal handler to drop a user's address from the absent email cache used
+    by password reset.
+    """
+    from apps.accounts import lookup
+
+    lookup.forget_absent_email(instance.email)
 
 
 class LoginAttempt(TimeStampedModel):
@@ -55,7 +96,64 @@ class LoginAttempt(TimeStampedModel):
     ip_address = models.GenericIPAddressField()
     user_agent = models.TextField(blank=True)
     successful = models.BooleanField(default=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['username', 'created_at'], name='accounts_attempt_user_idx'),
+            models.Index(fields=['ip_address', 'created_at'], name='accounts_attempt_ip_idx'),
+        ]
     
     def __str__(self):
         status = "successful" if self.successful else "failed"
-        return f"{status} login attempt by {self.username} from {self.ip_address}" 
\ No newline at end of file
+        return f"{status} login attempt by {self.username} from {self.ip_address}" 
+
+
+class LoginAttemptRollup(models.Model):
+    """
+    Hourly count of login attempts per IP address, username and outcome,
+    maintained incrementally from LoginAttempt by the
+    roll_up_login_attempts task (see apps.accounts.rollups).
+    """
+    hour = models.DateTimeField()
+    ip_address = models.GenericIPAddressField()
+    username = models.CharField(max_length=150)
+    successful = models.BooleanField()
+    attempts = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name = 'Login attempt rollup'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['hour', 'ip_address', 'username', 'successful'], name='accounts_rollup_key',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['successful', 'hour'], name='accounts_rollup_outcome_idx'),
+        ]
+
+    def __str__(self):
+        status = "successful" if self.successful else "failed"
+        return f"{self.attempts} {status} attempts by {self.username} from {self.ip_address} at {self.hour:%Y-%m-%d %H:00}"
+
+
+class RollupCheckpoint(models.Model):
+    """
+    High-water mark of an incremental rollup: the last source row id folded in.
+    """
+    name = models.CharField(max_length=100, primary_key=True)
+    position = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} at {self.position}"
+
+
+@receiver(user_login_failed)
+def record_failed_login(sender, credentials, request=None, **kwargs):
+    """
+    Signal handler to record failed logins, including those rejected by axes
+    while locked out.
+    """
+    from apps.accounts.attempts import record_login_attempt
+
+    record_login_attempt(request, credentials.get('username'), successful=False)
@@ -0,0 +1,24 @@
+"""
+Permissions for the accounts app.
+"""
+
+from rest_framework import permissions
+
+
+class IsStaffClaim(permissions.BasePermission):
+    """
+    Allows access only to staff users, judged by the ``is_staff`` claim of the
+    access token when the request carries one (see
+    CustomTokenObtainPairSerializer.get_token) and by the user otherwise.
+
+    A claim is only as fresh as its token: revoking staff status takes
+    effect once the user's current access tokens expire.
+    """
+
+    def has_permission(self, request, view):
+        if not (request.user and request.user.is_authenticated):
+            return False
+        token = request.auth
+        if token is not None and hasattr(token, 'payload') and 'is_staff' in token.payload:
+            return bool(token.payload['is_staff'])
+        return bool(request.user.is_staff)
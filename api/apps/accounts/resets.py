@@ -0,0 +1,67 @@
+"""
+Per-account coalescing of password reset requests.
+
+The first reset request for an account opens a window of
+PASSWORD_RESET_COALESCE_WINDOW seconds and sends the email; repeats inside
+the window are only counted, so hammering the button (or a bot) does not
+mint tokens, render templates, send mail and archive emails over and over.
+The link from the first email stays valid throughout.
+
+The window is a Redis counter ``password-reset:<user_id>`` that expires with
+the window, and the password_reset_* counters in apps.core.metrics track
+sent and coalesced requests. The window is only claimed in Celery, after the
+account lookup: a throttle in the request path consulting it would reveal
+which addresses have accounts.
+"""
+
+import logging
+
+from django.conf import settings
+
+from apps.core import metrics
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = 'password-reset'
+
+
+def _redis():
+    from django_redis import get_redis_connection
+
+    return get_redis_connection('default')
+
+
+def window_key(user_id):
+    return f'{KEY_PREFIX}:{user_id}'
+
+
+def claim_reset(user_id):
+    """
+    Count a reset request for the account. Returns True if it opens a new
+    window and the email should be sent; sends when Redis is unavailable.
+    """
+    key = window_key(user_id)
+    try:
+        pipe = _redis().pipeline(transaction=True)
+        pipe.set(key, 0, ex=settings.PASSWORD_RESET_COALESCE_WINDOW, nx=True)
+        pipe.incr(key)
+        _, count = pipe.execute()
+    except Exception:
+        logger.warning('Password reset window unavailable', exc_info=True)
+        count = 1
+    if count == 1:
+        metrics.inc('password_reset_sent_total')
+        return True
+    metrics.inc('password_reset_coalesced_total')
+    return False
+
+
+def release_reset(user_id):
+    """
+    Close the account's window, so that a reset whose email could not be
+    sent can be requested again right away.
+    """
+    try:
+        _redis().delete(window_key(user_id))
+    except Exception:
+        logger.warning('Password reset window unavailable', exc_info=True)
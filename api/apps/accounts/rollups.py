@@ -0,0 +1,94 @@
+"""
+Hourly login attempt rollups.
+
+LoginAttemptRollup holds one row per (hour, ip_address, username,
+successful) with the number of attempts. roll_up_login_attempts() folds in
+LoginAttempt rows above the id stored in a RollupCheckpoint, so each run
+only reads rows ingested since the last one; dashboards and the staff API
+read the rollups and never touch the raw table.
+
+Ingest transactions hold an advisory lock (apps.accounts.attempts), so by
+taking the same lock before reading max(id) the rollup knows no row with a
+lower id is still uncommitted and the high-water mark can never skip one.
+"""
+
+from django.db import connection, transaction
+from django.db.models import Count, Q, Sum
+
+from apps.accounts.attempts import INGEST_LOCK_KEY
+from apps.accounts.models import LoginAttempt, LoginAttemptRollup, RollupCheckpoint
+
+CHECKPOINT_NAME = 'login_attempts_hourly'
+
+ROLLUP_SQL = """
+INSERT INTO {rollup} (hour, ip_address, username, successful, attempts)
+SELECT date_trunc('hour', created_at), ip_address, username, successful, count(*)
+FROM {attempts}
+WHERE id > %s AND id <= %s
+GROUP BY 1, 2, 3, 4
+ON CONFLICT (hour, ip_address, username, successful)
+DO UPDATE SET attempts = {rollup}.attempts + EXCLUDED.attempts
+"""
+
+
+def _committed_high_water_mark():
+    """
+    Return the highest LoginAttempt id below which every row is committed.
+    """
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute('SELECT pg_advisory_xact_lock(%s)', [INGEST_LOCK_KEY])
+        cursor.execute(f'SELECT COALESCE(max(id), 0) FROM {LoginAttempt._meta.db_table}')
+        return cursor.fetchone()[0]
+
+
+def roll_up_login_attempts(chunk_size=100_000):
+    """
+    Fold LoginAttempt rows added since the last run into the hourly rollups.
+
+    Returns the number of ids covered by this run.
+    """
+    if connection.vendor != 'postgresql':
+        return 0
+
+    upper = _committed_high_water_mark()
+    sql = ROLLUP_SQL.format(rollup=LoginAttemptRollup._meta.db_table, attempts=LoginAttempt._meta.db_table)
+    covered = 0
+    while True:
+        with transaction.atomic():
+            checkpoint, _ = RollupCheckpoint.objects.select_for_update().get_or_create(name=CHECKPOINT_NAME)
+            if checkpoint.position >= upper:
+                return covered
+            start, end = checkpoint.position, min(checkpoint.position + chunk_size, upper)
+            with connection.cursor() as cursor:
+                cursor.execute(sql, [start, end])
+            checkpoint.position = end
+            checkpoint.save(update_fields=['position', 'updated_at'])
+        covered += end - start
+
+
+def top_failing_ips(since, limit=20):
+    """
+    IP addresses with the most failed logins since ``since``.
+    """
+    return list(
+        LoginAttemptRollup.objects.filter(successful=False, hour__gte=since)
+        .values('ip_address')
+        .annotate(failures=Sum('attempts'), usernames=Count('username', distinct=True))
+        .order_by('-failures')[:limit]
+    )
+
+
+def failure_rate(since):
+    """
+    Attempts, failures and failure rate per hour since ``since``.
+    """
+    rows = list(
+        LoginAttemptRollup.objects.filter(hour__gte=since)
+        .values('hour')
+        .annotate(attempts=Sum('attempts'), failures=Sum('attempts', filter=Q(successful=False)))
+        .order_by('hour')
+    )
+    for row in rows:
+        row['failures'] = row['failures'] or 0
+        row['failure_rate'] = row['failures'] / row['attempts'] if row['attempts'] else 0.0
+    return rows
@@ -2,14 +2,21 @@
 Serializers for the accounts app.
 """
 
-from django.contrib.auth.models import User
+from django.conf import settings
 from django.contrib.auth.password_validation import validate_password
+from django.contrib.auth.validators import UnicodeUsernameValidator
+from django.db import IntegrityError, transaction
 from rest_framework import serializers
-from rest_framework.validators import UniqueValidator
-from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
 from django.contrib.auth import get_user_model
 
+from apps.accounts.attempts import record_login_attempt
 from apps.accounts.models import Profile
+from apps.accounts import blacklist as token_blacklist
+from apps.accounts.avatars import ALLOWED_CONTENT_TYPES, UPLOAD_NAME_RE, UPLOAD_PREFIX
+from apps.accounts.tokens import RefreshToken, TokenBlacklisted
+from apps.core.media import media_url, media_urls
 
 User = get_user_model()
 
@@ -18,9 +25,27 @@ class ProfileSerializer(serializers.ModelSerializer):
     """
     Serializer for the Profile model.
     """
+    # Avatars are uploaded through the avatar endpoints.
+    avatar = serializers.SerializerMethodField()
+    avatar_variants = serializers.SerializerMethodField()
+
     class Meta:
         model = Profile
-        fields = ['id', 'bio', 'avatar', 'phone_number', 'created_at', 'updated_at']
+        fields = ['id', 'bio', 'avatar', 'avatar_variants', 'phone_number', 'created_at', 'updated_at']
+
+    def get_avatar(self, profile):
+        return media_url(profile.avatar.name)
+
+    def get_avatar_variants(self, profile):
+        # URLs are resolved here rather than stored: private media URLs are
+        # signed and expire.
+        urls = media_urls(
+            name for formats in profile.avatar_variants.values() for name in formats.values()
+        )
+        return {
+            size: {extension: urls[name] for extension, name in formats.items()}
+            for size, formats in profile.avatar_variants.items()
+        }
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -34,32 +59,52 @@ class UserSerializer(serializers.ModelSerializer):
         model = User
         fields = ('id', 'username', 'email', 'first_name', 'last_name', 'password', 'password2')
         extra_kwargs = {
+            # Uniqueness is left to the database constraint (see create) rather
+            # than a UniqueValidator SELECT ahead of the INSERT.
+            'username': {'validators': [UnicodeUsernameValidator()]},
             'email': {'required': True},
             'first_name': {'required': True},
             'last_name': {'required': True}
         }
 
+    # Unique constraints on auth_user mapped to the field they protect.
+    UNIQUE_CONSTRAINTS = {
+        'auth_user_username_key': ('username', 'A user with that username already exists.'),
+    }
+
     def validate(self, attrs):
         if attrs['password'] != attrs.pop('password2'):
             raise serializers.ValidationError({"password": "Password fields didn't match."})
         return attrs
 
     def create(self, validated_data):
-        user = User.objects.create_user(
-            username=validated_data['username'],
-            email=validated_data['email'],
-            first_name=validated_data['first_name'],
-            last_name=validated_data['last_name']
-        )
-        user.set_password(validated_data['password'])
-        user.save()
-        return user
+        """
+        Hash the password once and insert the user and, through the post_save
+        receiver, its profile in a single transaction.
+        """
+        try:
+            with transaction.atomic():
+                return User.objects.create_user(
+                    username=validated_data['username'],
+                    email=validated_data['email'],
+                    password=validated_data['password'],
+                    first_name=validated_data['first_name'],
+                    last_name=validated_data['last_name']
+                )
+        except IntegrityError as exc:
+            constraint = getattr(getattr(exc.__cause__, 'diag', None), 'constraint_name', None)
+            if constraint not in self.UNIQUE_CONSTRAINTS:
+                raise
+            field, message = self.UNIQUE_CONSTRAINTS[constraint]
+            raise serializers.ValidationError({field: [message]})
 
 
 class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
     """
     Custom token serializer to include additional user info in the token.
     """
+    token_class = RefreshToken
+
     @classmethod
     def get_token(cls, user):
         token = super().get_token(user)
@@ -73,6 +118,51 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
 
         return token
 
+    def validate(self, attrs):
+        data = super().validate(attrs)
+        record_login_attempt(self.context.get('request'), self.user.get_username(), successful=True, user=self.user)
+        return data
+
+
+class RotatingTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    Token refresh serializer that rotates through the Redis blacklist.
+
+    The presented token is blacklisted before a new one is issued. Requests
+    presenting a token that another request is rotating, or has just
+    rotated, receive that request's pair (see apps.accounts.blacklist).
+    """
+    token_class = RefreshToken
+
+    def validate(self, attrs):
+        try:
+            refresh = self.token_class(attrs['refresh'])
+        except TokenBlacklisted as exc:
+            return self.coalesce(exc.jti, exc)
+
+        data = {'access': str(refresh.access_token)}
+
+        if api_settings.ROTATE_REFRESH_TOKENS:
+            jti = refresh[api_settings.JTI_CLAIM]
+            if api_settings.BLACKLIST_AFTER_ROTATION and not refresh.blacklist():
+                return self.coalesce(jti, TokenBlacklisted(jti))
+
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
+
+            data['refresh'] = str(refresh)
+            if api_settings.BLACKLIST_AFTER_ROTATION:
+                token_blacklist.remember_rotation(jti, data)
+
+        return data
+
+    def coalesce(self, jti, error):
+        data = token_blacklist.wait_for_rotation(jti)
+        if data is None:
+            raise error
+        return data
+
 
 class ChangePasswordSerializer(serializers.Serializer):
     """
@@ -114,7 +204,48 @@ class UserProfileSerializer(serializers.ModelSerializer):
     """
     Serializer for user profile.
     """
+    profile = ProfileSerializer(read_only=True, allow_null=True)
+
     class Meta:
         model = User
-        fields = ('id', 'username', 'email', 'first_name', 'last_name', 'date_joined', 'last_login')
-        read_only_fields = ('id', 'date_joined', 'last_login') 
\ No newline at end of file
+        fields = ('id', 'username', 'email', 'first_name', 'last_name', 'date_joined', 'last_login', 'profile')
+        read_only_fields = ('id', 'date_joined', 'last_login') 
+
+
+class LoginAttemptStatsQuerySerializer(serializers.Serializer):
+    """
+    Query parameters for the login attempt statistics endpoints.
+    """
+    hours = serializers.IntegerField(min_value=1, max_value=24 * 90, default=24)
+    limit = serializers.IntegerField(min_value=1, max_value=100, default=20)
+
+
+class AvatarUploadSerializer(serializers.Serializer):
+    """
+    Serializer for requesting a direct avatar upload.
+    """
+    content_type = serializers.ChoiceField(choices=sorted(ALLOWED_CONTENT_TYPES))
+    size = serializers.IntegerField(min_value=1)
+
+    def validate_size(self, value):
+        if value > settings.AVATAR_MAX_UPLOAD_BYTES:
+            raise serializers.ValidationError(
+                f"Avatars can be at most {settings.AVATAR_MAX_UPLOAD_BYTES // (1024 * 1024)} MB."
+            )
+        return value
+
+
+class AvatarLocalUploadSerializer(serializers.Serializer):
+    """
+    Serializer for the signed upload form of storages without presigned
+    uploads.
+    """
+    token = serializers.CharField()
+    file = serializers.FileField()
+
+
+class AvatarConfirmSerializer(serializers.Serializer):
+    """
+    Serializer for confirming a completed avatar upload.
+    """
+    key = serializers.RegexField(rf'^{UPLOAD_PREFIX}/\d+/{UPLOAD_NAME_RE.pattern}$', max_length=255)
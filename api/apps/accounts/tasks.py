@@ -4,44 +4,104 @@ Celery tasks for the accounts app.
 
 from celery import shared_task
 from django.conf import settings
-from django.core.mail import send_mail
-from django.template.loader import render_to_string
 from django.contrib.auth import get_user_model
-from django.urls import reverse
+from django.contrib.auth.tokens import default_token_generator
+from django.utils.encoding import force_bytes
+from django.utils.http import urlsafe_base64_encode
 
+from apps.accounts import avatars, blacklist, rollups
+from apps.accounts.attempts import drain_login_attempts
+from apps.accounts.lookup import find_users_by_email
+from apps.accounts.resets import claim_reset, release_reset
+from apps.core.mail import send_email
+from apps.core.rendering import render_email
 
-@shared_task
-def send_password_reset_email(user_id, token, uid):
+
+@shared_task(queue='emails', ignore_result=True)
+def request_password_reset(email):
+    """
+    Send a password reset email to each account with the address, at most
+    once per account per coalescing window. The lookup runs here rather than
+    in the view so that the endpoint does the same work, one enqueue, whether
+    or not an account exists.
     """
-    Send password reset email asynchronously.
+    sent = 0
+    for user in find_users_by_email(email):
+        if not claim_reset(user.pk):
+            continue
+        try:
+            delivered = send_password_reset_email(user.pk)
+        except Exception:
+            release_reset(user.pk)
+            raise
+        if delivered:
+            sent += 1
+        else:
+            release_reset(user.pk)
+    return sent
+
+
+@shared_task(queue='emails', ignore_result=True)
+def send_password_reset_email(user_id):
+    """
+    Send a password reset email to the user.
     """
     User = get_user_model()
     try:
         user = User.objects.get(pk=user_id)
-        
-        # Build the reset URL (frontend URL)
-        reset_url = f"{settings.FRONTEND_URL}/auth/reset-password/{uid}/{token}/"
-        
-        # Render email template
-        context = {
-            'user': user,
-            'reset_url': reset_url,
-            'site_name': settings.PROJECT_NAME,
-        }
-        
-        email_html_message = render_to_string('email/password_reset_email.html', context)
-        email_plaintext_message = render_to_string('email/password_reset_email.txt', context)
-        
-        # Send email
-        send_mail(
-            subject=f"Password Reset for {settings.PROJECT_NAME}",
-            message=email_plaintext_message,
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            recipient_list=[user.email],
-            html_message=email_html_message,
-            fail_silently=False,
-        )
-        
-        return True
     except User.DoesNotExist:
-        return False 
\ No newline at end of file
+        return False
+
+    # Generate token and URL
+    token = default_token_generator.make_token(user)
+    uid = urlsafe_base64_encode(force_bytes(user.pk))
+    reset_url = f"{settings.FRONTEND_URL}/auth/reset-password?uid={uid}&token={token}"
+
+    # Render email template
+    context = {
+        'user': user,
+        'reset_url': reset_url,
+        'project_name': getattr(settings, 'PROJECT_NAME', 'LaunchKit'),
+    }
+
+    text_message, html_message = render_email('email/password_reset_email', context)
+
+    # Send email
+    return send_email(
+        subject="Reset Your Password",
+        message=text_message,
+        html_message=html_message,
+        to_emails=[user.email],
+    )
+
+
+@shared_task(queue='default', ignore_result=True)
+def ingest_login_attempts():
+    """
+    Drain recorded login attempts from the Redis stream into LoginAttempt.
+    """
+    return drain_login_attempts()
+
+
+@shared_task(queue='default', ignore_result=True)
+def roll_up_login_attempts():
+    """
+    Fold newly ingested login attempts into the hourly rollups.
+    """
+    return rollups.roll_up_login_attempts()
+
+
+@shared_task(queue='default', ignore_result=True)
+def cleanup_expired_tokens():
+    """
+    Prune expired refresh tokens from the Redis blacklist index.
+    """
+    return blacklist.cleanup_expired()
+
+
+@shared_task(queue='default', ignore_result=True)
+def process_avatar(user_id, key):
+    """
+    Generate the avatar variants for an uploaded image.
+    """
+    return avatars.process_upload(user_id, key)
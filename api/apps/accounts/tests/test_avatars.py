@@ -0,0 +1,252 @@
+"""
+Tests for avatar uploads and processing.
+"""
+
+import io
+import time
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.urls import reverse
+from PIL import Image, ImageFile
+from rest_framework.test import APIClient
+
+from apps.accounts import avatars
+from apps.accounts.tasks import process_avatar
+
+User = get_user_model()
+
+ORIENTATION = 0x0112
+MAKE = 0x010F
+
+
+def image_bytes(size=(400, 300), image_format='JPEG'):
+    exif = Image.Exif()
+    exif[ORIENTATION] = 6
+    exif[MAKE] = 'Camera'
+    out = io.BytesIO()
+    Image.new('RGB', size, 'red').save(out, image_format, exif=exif)
+    return out.getvalue()
+
+
+@pytest.fixture
+def media(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    return tmp_path
+
+
+@pytest.fixture
+def user(db):
+    return User.objects.create_user(username='ada', email='ada@example.com', password='analytical-engine-1843')
+
+
+@pytest.fixture
+def client(user):
+    client = APIClient()
+    client.force_authenticate(user)
+    return client
+
+
+@pytest.fixture
+def queued(monkeypatch):
+    calls = []
+    monkeypatch.setattr(process_avatar, 'delay', lambda *args: calls.append(args))
+    return calls
+
+
+def upload(client, data, content_type='image/jpeg'):
+    response = client.post(
+        reverse('avatar_upload'), {'content_type': content_type, 'size': len(data)}, format='json'
+    )
+    assert response.status_code == 200
+    form = response.data
+    response = APIClient().post(
+        form['url'],
+        {**form['fields'], 'file': SimpleUploadedFile('avatar', data, content_type=content_type)},
+        format='multipart',
+    )
+    return form['key'], response
+
+
+@pytest.fixture
+def confirm_and_process(client, user, queued, django_capture_on_commit_callbacks):
+    def confirm_and_process(key):
+        response = client.post(reverse('avatar'), {'key': key}, format='json')
+        assert response.status_code == 202
+        assert queued.pop() == (user.pk, key)
+        # The test transaction never commits: run the on-commit touch() of
+        # the profile's modification stamp as a real commit would.
+        with django_capture_on_commit_callbacks(execute=True):
+            return process_avatar(user.pk, key)
+
+    return confirm_and_process
+
+
+@pytest.mark.django_db
+def test_upload_confirm_and_process(client, user, media, confirm_and_process):
+    assert client.get(reverse('user_profile')).data['profile']['avatar_variants'] == {}
+    key, response = upload(client, image_bytes())
+    assert response.status_code == 204
+    assert (media / key).exists()
+
+    assert confirm_and_process(key) is True
+
+    user.profile.refresh_from_db()
+    variants = user.profile.avatar_variants
+    assert sorted(variants, key=int) == ['64', '128', '256']
+    for size, formats in variants.items():
+        assert sorted(formats) == ['jpeg', 'webp']
+        for extension, name in formats.items():
+            with Image.open(media / name) as image:
+                assert image.size == (int(size), int(size))
+                assert image.format == extension.upper()
+                assert not image.getexif()
+    assert user.profile.avatar.name == variants['256']['jpeg']
+    assert not (media / key).exists()
+
+    response = client.get(reverse('user_profile'))
+    assert response.status_code == 200
+    urls = response.data['profile']['avatar_variants']
+    assert urls['64']['webp'].split('?')[0].endswith(variants['64']['webp'])
+    assert response.data['profile']['avatar'] == urls['256']['jpeg']
+    file_response = APIClient().get(urls['64']['webp'])
+    assert file_response.status_code == 200
+    assert b''.join(file_response.streaming_content) == (media / variants['64']['webp']).read_bytes()
+
+
+@pytest.mark.django_db
+def test_profile_etag_changes_when_avatar_urls_are_renewed(client, settings, media, confirm_and_process, monkeypatch):
+    key, _ = upload(client, image_bytes())
+    confirm_and_process(key)
+    clock = [1_800_000_000.0]
+    monkeypatch.setattr(time, 'time', lambda: clock[0])
+
+    first = client.get(reverse('user_profile'))
+    clock[0] += settings.MEDIA_URL_REFRESH_MARGIN - 1
+    assert client.get(reverse('user_profile'), HTTP_IF_NONE_MATCH=first['ETag']).status_code == 304
+
+    clock[0] += 1
+    renewed = client.get(reverse('user_profile'), HTTP_IF_NONE_MATCH=first['ETag'])
+    assert renewed.status_code == 200
+    assert renewed['ETag'] != first['ETag']
+    assert renewed.data['profile']['avatar'] != first.data['profile']['avatar']
+
+
+@pytest.mark.django_db
+def test_new_avatar_replaces_previous_variants(client, user, media, confirm_and_process):
+    first, _ = upload(client, image_bytes())
+    confirm_and_process(first)
+    user.profile.refresh_from_db()
+    previous = user.profile.avatar_variants
+
+    second, _ = upload(client, image_bytes((300, 400), 'PNG'), content_type='image/png')
+    assert confirm_and_process(second) is True
+
+    user.profile.refresh_from_db()
+    assert user.profile.avatar_variants != previous
+    for formats in previous.values():
+        for name in formats.values():
+            assert not (media / name).exists()
+
+
+@pytest.mark.django_db
+def test_confirm_rejects_another_users_upload(client, media, queued):
+    other = User.objects.create_user(username='grace', email='grace@example.com', password='x')
+    key = f'{avatars.upload_prefix(other.pk)}{"0" * 32}'
+    (media / key).parent.mkdir(parents=True)
+    (media / key).write_bytes(image_bytes())
+
+    response = client.post(reverse('avatar'), {'key': key}, format='json')
+
+    assert response.status_code == 400
+    assert queued == []
+
+
+@pytest.mark.django_db
+def test_upload_keys_cannot_traverse_to_other_files(client, user, media, queued):
+    victim = media / 'avatars' / '7' / 'abc' / '256.jpeg'
+    victim.parent.mkdir(parents=True)
+    victim.write_bytes(image_bytes())
+    key = f'{avatars.upload_prefix(user.pk)}../../7/abc/256.jpeg'
+
+    response = client.post(reverse('avatar'), {'key': key}, format='json')
+
+    assert response.status_code == 400
+    assert queued == []
+    with pytest.raises(ValueError):
+        avatars.process_upload(user.pk, key)
+    assert victim.exists()
+
+
+@pytest.mark.django_db
+def test_presign_rejects_oversized_upload(client, settings):
+    response = client.post(
+        reverse('avatar_upload'),
+        {'content_type': 'image/jpeg', 'size': settings.AVATAR_MAX_UPLOAD_BYTES + 1},
+        format='json',
+    )
+
+    assert response.status_code == 400
+    assert 'size' in response.data
+
+
+@pytest.mark.django_db
+def test_local_upload_rejects_file_over_limit(client, settings, media):
+    data = image_bytes()
+    settings.AVATAR_MAX_UPLOAD_BYTES = len(data) - 1
+    response = client.post(
+        reverse('avatar_upload'), {'content_type': 'image/jpeg', 'size': 1}, format='json'
+    )
+    form = response.data
+
+    response = APIClient().post(
+        form['url'],
+        {**form['fields'], 'file': SimpleUploadedFile('avatar', data, content_type='image/jpeg')},
+        format='multipart',
+    )
+
+    assert response.status_code == 400
+    assert not (media / form['key']).exists()
+
+
+@pytest.mark.django_db
+def test_process_rejects_image_over_max_pixels(client, user, settings, media, confirm_and_process, monkeypatch):
+    key, _ = upload(client, image_bytes((200, 200)))
+    settings.AVATAR_MAX_PIXELS = 100 * 100
+
+    def load(image):
+        raise AssertionError('decoded an oversized image')
+
+    monkeypatch.setattr(ImageFile.ImageFile, 'load', load)
+
+    assert confirm_and_process(key) is False
+    user.profile.refresh_from_db()
+    assert user.profile.avatar_variants == {}
+    assert not (media / key).exists()
+
+
+def test_open_image_rejects_oversized_image_from_header(settings, monkeypatch):
+    settings.AVATAR_MAX_PIXELS = 100 * 100
+
+    def load(image):
+        raise AssertionError('decoded an oversized image')
+
+    monkeypatch.setattr(ImageFile.ImageFile, 'load', load)
+
+    with pytest.raises(avatars.AvatarRejected):
+        avatars.open_image(image_bytes((101, 100)))
+
+
+def test_render_variants_are_square_and_without_metadata(settings):
+    settings.AVATAR_SIZES = [32, 16]
+
+    variants = avatars.render_variants(avatars.open_image(image_bytes((90, 40))))
+
+    assert sorted(variants) == [16, 32]
+    for size, encoded in variants.items():
+        for extension, data in encoded.items():
+            with Image.open(io.BytesIO(data)) as image:
+                assert image.size == (size, size)
+                assert image.format == extension.upper()
+                assert not image.getexif()
@@ -0,0 +1,45 @@
+"""
+Tests for user registration.
+"""
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from apps.accounts.models import Profile
+
+User = get_user_model()
+
+PAYLOAD = {
+    'username': 'ada',
+    'email': 'ada@example.com',
+    'first_name': 'Ada',
+    'last_name': 'Lovelace',
+    'password': 'analytical-engine-1843',
+    'password2': 'analytical-engine-1843',
+}
+
+
+@pytest.mark.django_db
+def test_register_creates_user_and_profile_in_one_round(django_assert_num_queries):
+    # SAVEPOINT, INSERT auth_user, INSERT accounts_profile, RELEASE SAVEPOINT:
+    # no uniqueness SELECT ahead of the insert and no second profile save.
+    with django_assert_num_queries(4):
+        response = APIClient().post(reverse('register'), PAYLOAD, format='json')
+
+    assert response.status_code == 201
+    user = User.objects.get(username='ada')
+    assert user.check_password(PAYLOAD['password'])
+    assert Profile.objects.filter(user=user).exists()
+
+
+@pytest.mark.django_db
+def test_register_duplicate_username_is_a_validation_error():
+    User.objects.create_user(username='ada', email='other@example.com', password='x')
+
+    response = APIClient().post(reverse('register'), PAYLOAD, format='json')
+
+    assert response.status_code == 400
+    assert response.data['username'] == ['A user with that username already exists.']
+    assert User.objects.filter(username='ada').count() == 1
@@ -0,0 +1,178 @@
+"""
+Redis-backed sliding-window throttling for the authentication endpoints.
+
+AuthRateThrottle enforces the rate for a view's ``throttle_scope`` per
+client IP and, when the request names an account, per username as well.
+Each key is a sorted set of request timestamps covering the last window;
+one Lua script trims, counts and records every key at once, so concurrent
+gunicorn workers cannot race past the limit the way DRF's cache throttles
+(read list, modify, write back) can.
+
+For the login view the same script also reads the django-axes failure
+counters for the client, so a locked out client is turned away with a 429 before its
+password is hashed, without a second round trip.
+"""
+
+import logging
+import uuid
+
+from axes.helpers import get_cache, get_client_cache_keys, get_failure_limit
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+from apps.accounts.attempts import client_ip
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = 'throttle'
+
+# KEYS: window keys, then axes failure counter keys.
+# ARGV: number of window keys, member, then limit and window (ms) per window
+# key, then the axes failure limit. Time comes from the Redis clock.
+# Returns {allowed, wait in ms, axes failures}.
+THROTTLE_SCRIPT = """
+local window_keys = tonumber(ARGV[1])
+local member = ARGV[2]
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) * 1000 + math.floor(tonumber(clock[2]) / 1000)
+
+local failures = 0
+local lock_ttl = 0
+for i = window_keys + 1, #KEYS do
+    local value = tonumber(redis.call('GET', KEYS[i]) or '0') or 0
+    if value > failures then
+        failures = value
+        lock_ttl = redis.call('PTTL', KEYS[i])
+    end
+end
+local failure_limit = tonumber(ARGV[3 + window_keys * 2])
+if failure_limit > 0 and failures >= failure_limit then
+    return {0, math.max(lock_ttl, 1000), failures}
+end
+
+local wait = 0
+for i = 1, window_keys do
+    local limit = tonumber(ARGV[1 + i * 2])
+    local window = tonumber(ARGV[2 + i * 2])
+    redis.call('ZREMRANGEBYSCORE', KEYS[i], '-inf', now - window)
+    if redis.call('ZCARD', KEYS[i]) >= limit then
+        local oldest = redis.call('ZRANGE', KEYS[i], 0, 0, 'WITHSCORES')
+        wait = math.max(wait, tonumber(oldest[2]) + window - now)
+    end
+end
+if wait > 0 then
+    return {0, wait, failures}
+end
+
+for i = 1, window_keys do
+    redis.call('ZADD', KEYS[i], now, member)
+    redis.call('PEXPIRE', KEYS[i], tonumber(ARGV[2 + i * 2]))
+end
+return {1, 0, failures}
+"""
+
+USERNAME_FIELDS = ('username', 'email')
+
+_throttle_script = None
+
+
+def _redis():
+    from django_redis import get_redis_connection
+
+    return get_redis_connection('default')
+
+
+def parse_rate(rate):
+    """
+    Parse a DRF rate string such as ``'5/min'`` into ``(limit, seconds)``.
+    """
+    if not rate:
+        return None, None
+    num, period = rate.split('/')
+    return int(num), {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}[period[0]]
+
+
+class AuthRateThrottle(BaseThrottle):
+    """
+    Sliding-window throttle for views with a ``throttle_scope``.
+
+    Uses the scope's rate from DEFAULT_THROTTLE_RATES for the client IP and
+    the ``<scope>_username`` rate (falling back to the scope's rate) for the
+    username or email in the request body. Views without a scope, or whose
+    scope has no rate, are not throttled. Views that set
+    ``throttle_check_lockout = True`` also turn away clients axes has locked
+    out.
+    """
+
+    def __init__(self):
+        self.wait_seconds = None
+
+    def get_rates(self, scope):
+        rates = api_settings.DEFAULT_THROTTLE_RATES
+        ip_rate = rates.get(scope)
+        return parse_rate(ip_rate), parse_rate(rates.get(f'{scope}_username', ip_rate))
+
+    def get_username(self, request):
+        try:
+            data = request.data
+        except Exception:
+            return ''
+        if not hasattr(data, 'get'):
+            return ''
+        for field in USERNAME_FIELDS:
+            value = data.get(field)
+            if isinstance(value, str) and value.strip():
+                return value.strip().lower()
+        return ''
+
+    def allow_request(self, request, view):
+        scope = getattr(view, 'throttle_scope', None)
+        if not scope:
+            return True
+        (ip_limit, ip_window), (user_limit, user_window) = self.get_rates(scope)
+        if ip_limit is None:
+            return True
+
+        ip_address = client_ip(request)
+        username = self.get_username(request)
+        windows = [(f'{KEY_PREFIX}:{scope}:ip:{ip_address}', ip_limit, ip_window)]
+        if username and user_limit is not None:
+            windows.append((f'{KEY_PREFIX}:{scope}:user:{username}', user_limit, user_window))
+
+        axes_keys, failure_limit = [], 0
+        if getattr(view, 'throttle_check_lockout', False):
+            cache = get_cache()
+            credentials = {'username': username} if username else None
+            axes_keys = [cache.make_key(key) for key in get_client_cache_keys(request._request, credentials)]
+            failure_limit = get_failure_limit(request._request, credentials)
+
+        allowed, wait_ms = self.evaluate(windows, axes_keys, failure_limit)
+        if not allowed:
+            self.wait_seconds = wait_ms / 1000
+        return bool(allowed)
+
+    def evaluate(self, windows, axes_keys, failure_limit):
+        """
+        Run the throttle script. Returns ``(allowed, wait_ms)``; lets the
+        request through if Redis is unavailable.
+        """
+        global _throttle_script
+
+        args = [len(windows), uuid.uuid4().hex]
+        for _, limit, window in windows:
+            args += [limit, window * 1000]
+        args.append(failure_limit or 0)
+        try:
+            client = _redis()
+            if _throttle_script is None:
+                _throttle_script = client.register_script(THROTTLE_SCRIPT)
+            allowed, wait_ms, _ = _throttle_script(
+                keys=[key for key, _, _ in windows] + axes_keys, args=args, client=client,
+            )
+        except Exception:
+            logger.warning('Auth throttle unavailable', exc_info=True)
+            return True, 0
+        return allowed, wait_ms
+
+    def wait(self):
+        return self.wait_seconds
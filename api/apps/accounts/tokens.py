@@ -0,0 +1,45 @@
+"""
+JWT token classes backed by the Redis blacklist (apps.accounts.blacklist).
+"""
+
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt import tokens
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+
+from apps.accounts import blacklist as token_blacklist
+
+
+class TokenBlacklisted(TokenError):
+    """
+    Raised for a blacklisted token; carries its jti.
+    """
+
+    def __init__(self, jti):
+        super().__init__(_("Token is blacklisted"))
+        self.jti = jti
+
+
+class RefreshToken(tokens.RefreshToken):
+    """
+    Refresh token that is checked against and added to the Redis blacklist.
+    """
+
+    def verify(self, *args, **kwargs):
+        super().verify(*args, **kwargs)
+        self.check_blacklist()
+
+    def check_blacklist(self):
+        """
+        Raise TokenBlacklisted if this token is blacklisted.
+        """
+        jti = self.payload[api_settings.JTI_CLAIM]
+        if token_blacklist.is_blacklisted(jti):
+            raise TokenBlacklisted(jti)
+
+    def blacklist(self):
+        """
+        Blacklist this token until it expires. Returns False if another
+        request blacklisted it first.
+        """
+        return token_blacklist.blacklist(self.payload[api_settings.JTI_CLAIM], self.payload['exp'])
@@ -13,6 +13,11 @@ from apps.accounts.views import (
     CustomTokenObtainPairView,
     UserProfileView,
     ProfileUpdateView,
+    AvatarView,
+    AvatarUploadView,
+    AvatarLocalUploadView,
+    LoginAttemptTopIPsView,
+    LoginAttemptFailureRateView,
 )
 
 urlpatterns = [
@@ -27,4 +32,11 @@ urlpatterns = [
     # Profile endpoints
     path('profile/', UserProfileView.as_view(), name='user_profile'),
     path('profile/update/', ProfileUpdateView.as_view(), name='profile_update'),
+    path('profile/avatar/', AvatarView.as_view(), name='avatar'),
+    path('profile/avatar/upload/', AvatarUploadView.as_view(), name='avatar_upload'),
+    path('profile/avatar/upload/local/', AvatarLocalUploadView.as_view(), name='avatar_local_upload'),
+
+    # Security dashboard endpoints (staff only)
+    path('login-attempts/top-ips/', LoginAttemptTopIPsView.as_view(), name='login_attempt_top_ips'),
+    path('login-attempts/failure-rate/', LoginAttemptFailureRateView.as_view(), name='login_attempt_failure_rate'),
 ] 
\ No newline at end of file
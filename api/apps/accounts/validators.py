@@ -0,0 +1,113 @@
+"""
+Password validators for the accounts app.
+"""
+
+import hashlib
+import logging
+import re
+from collections import Counter
+from functools import cached_property, lru_cache
+
+from django.conf import settings
+from django.contrib.auth.password_validation import CommonPasswordValidator, exceeds_maximum_length_ratio
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.utils.translation import gettext as _
+
+from apps.core.bloom import BloomFilter
+
+logger = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=None)
+def load_breached_filter(path):
+    """
+    Memory-map the breached password filter at ``path`` once per process.
+    """
+    return BloomFilter.open(path)
+
+
+class BreachedPasswordValidator:
+    """
+    Validate that the password does not appear in a breached password corpus.
+
+    The corpus is a bloom filter of the SHA-1 digests of the passwords (the
+    form Pwned Passwords downloads come in), built by the
+    build_breached_password_filter command and memory-mapped read-only, so
+    all gunicorn and Celery processes on a host share one copy through the
+    page cache; a 100M entry corpus at a 0.1% false positive rate takes
+    about 180 MB. Without BREACHED_PASSWORD_FILTER the validator falls back
+    to Django's CommonPasswordValidator.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+
+    @cached_property
+    def fallback(self):
+        return CommonPasswordValidator()
+
+    def validate(self, password, user=None):
+        path = self.path or settings.BREACHED_PASSWORD_FILTER
+        if not path:
+            return self.fallback.validate(password, user)
+        if hashlib.sha1(password.encode(), usedforsecurity=False).digest() in load_breached_filter(path):
+            raise ValidationError(
+                _("This password has appeared in a data breach."),
+                code="password_breached",
+            )
+
+    def get_help_text(self):
+        return _("Your password can’t be one that has appeared in a known data breach.")
+
+
+class BoundedUserAttributeSimilarityValidator:
+    """
+    Validate that the password is sufficiently different from the user's
+    attributes, in time linear in the input.
+
+    Equivalent to Django's UserAttributeSimilarityValidator, which compares
+    with SequenceMatcher.quick_ratio(): the ratio is twice the size of the
+    multiset intersection of the characters over the combined length. The
+    password's character counts are computed once rather than per attribute
+    part, and parts too short or too long to reach max_similarity are
+    skipped without comparing.
+    """
+
+    DEFAULT_USER_ATTRIBUTES = ("username", "first_name", "last_name", "email")
+
+    def __init__(self, user_attributes=DEFAULT_USER_ATTRIBUTES, max_similarity=0.7):
+        self.user_attributes = user_attributes
+        if max_similarity < 0.1:
+            raise ValueError("max_similarity must be at least 0.1")
+        self.max_similarity = max_similarity
+
+    def validate(self, password, user=None):
+        if not user:
+            return
+
+        password = password.lower()
+        password_counts = None
+        for attribute_name in self.user_attributes:
+            value = getattr(user, attribute_name, None)
+            if not value or not isinstance(value, str):
+                continue
+            value_lower = value.lower()
+            for value_part in re.split(r"\W+", value_lower) + [value_lower]:
+                if not value_part or exceeds_maximum_length_ratio(password, self.max_similarity, value_part):
+                    continue
+                if password_counts is None:
+                    password_counts = Counter(password)
+                matches = sum((password_counts & Counter(value_part)).values())
+                if 2.0 * matches / (len(password) + len(value_part)) >= self.max_similarity:
+                    try:
+                        verbose_name = str(user._meta.get_field(attribute_name).verbose_name)
+                    except FieldDoesNotExist:
+                        verbose_name = attribute_name
+                    raise ValidationError(
+                        _("The password is too similar to the %(verbose_name)s."),
+                        code="password_too_similar",
+                        params={"verbose_name": verbose_name},
+                    )
+
+    def get_help_text(self):
+        return _("Your password can’t be too similar to your other personal information.")
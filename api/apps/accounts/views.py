@@ -2,17 +2,23 @@
 Views for the accounts app.
 """
 
+from datetime import timedelta
+
 from rest_framework import generics, permissions, status
+from rest_framework.parsers import MultiPartParser
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework_simplejwt.views import TokenObtainPairView
 
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.contrib.auth.tokens import default_token_generator
-from django.utils.http import urlsafe_base64_encode, urlsafe_base64_decode
-from django.utils.encoding import force_bytes
-from django.conf import settings
-from django.template.loader import render_to_string
+from django.core import signing
+from django.db import transaction
+from django.core.files.storage import default_storage
+from django.urls import reverse
+from django.utils.http import urlsafe_base64_decode
+from django.utils import timezone
 
 from apps.accounts.serializers import (
     UserSerializer, 
@@ -21,8 +27,16 @@ from apps.accounts.serializers import (
     ResetPasswordEmailSerializer,
     ResetPasswordSerializer,
     UserProfileSerializer,
+    LoginAttemptStatsQuerySerializer,
+    AvatarUploadSerializer,
+    AvatarLocalUploadSerializer,
+    AvatarConfirmSerializer,
 )
-from apps.core.mail import send_email
+from apps.accounts import avatars
+from apps.accounts.permissions import IsStaffClaim
+from apps.accounts.rollups import failure_rate, top_failing_ips
+from apps.accounts.tasks import process_avatar, request_password_reset
+from apps.core.mixins import CachedRetrieveMixin
 
 User = get_user_model()
 
@@ -33,6 +47,7 @@ class RegisterView(generics.CreateAPIView):
     queryset = User.objects.all()
     serializer_class = UserSerializer
     permission_classes = [permissions.AllowAny]
+    throttle_scope = 'auth'
 
 
 class CustomTokenObtainPairView(TokenObtainPairView):
@@ -40,6 +55,8 @@ class CustomTokenObtainPairView(TokenObtainPairView):
     Custom token obtain pair view that uses our custom serializer.
     """
     serializer_class = CustomTokenObtainPairSerializer
+    throttle_scope = 'auth'
+    throttle_check_lockout = True
 
 
 class ChangePasswordView(generics.UpdateAPIView):
@@ -48,22 +65,27 @@ class ChangePasswordView(generics.UpdateAPIView):
     """
     serializer_class = ChangePasswordSerializer
     permission_classes = [permissions.IsAuthenticated]
+    throttle_scope = 'auth'
     
     def get_object(self):
-        return self.request.user
+        # request.user comes from the authentication cache and may be stale;
+        # check and write the current row, locked against concurrent writes.
+        return User.objects.select_for_update().get(pk=self.request.user.pk)
     
     def update(self, request, *args, **kwargs):
-        user = self.get_object()
         serializer = self.get_serializer(data=request.data)
         
         if serializer.is_valid():
-            # Check old password
-            if not user.check_password(serializer.data.get("old_password")):
-                return Response({"old_password": ["Wrong password."]}, status=status.HTTP_400_BAD_REQUEST)
-            
-            # Set new password
-            user.set_password(serializer.data.get("new_password"))
-            user.save()
+            with transaction.atomic():
+                user = self.get_object()
+
+                # Check old password
+                if not user.check_password(serializer.data.get("old_password")):
+                    return Response({"old_password": ["Wrong password."]}, status=status.HTTP_400_BAD_REQUEST)
+
+                # Set new password
+                user.set_password(serializer.data.get("new_password"))
+                user.save(update_fields=['password'])
             
             return Response({"detail": "Password updated successfully."}, status=status.HTTP_200_OK)
         
@@ -75,49 +97,17 @@ class ResetPasswordEmailView(APIView):
     API endpoint for requesting a password reset email.
     """
     permission_classes = [permissions.AllowAny]
+    throttle_scope = 'auth'
     
     def post(self, request):
         serializer = ResetPasswordEmailSerializer(data=request.data)
         
         if serializer.is_valid():
-            email = serializer.validated_data["email"]
-            
-            try:
-                user = User.objects.get(email=email)
-                
-                # Generate token and URL
-                token = default_token_generator.make_token(user)
-                uid = urlsafe_base64_encode(force_bytes(user.pk))
-                reset_url = f"{settings.FRONTEND_URL}/auth/reset-password?uid={uid}&token={token}"
-                
-                # Prepare email context
-                context = {
-                    'user': user,
-                    'reset_url': reset_url,
-                    'project_name': getattr(settings, 'PROJECT_NAME', 'LaunchKit'),
-                }
-                
-                # Render email templates
-                html_message = render_to_string('email/password_reset_email.html', context)
-                text_message = render_to_string('email/password_reset_email.txt', context)
-                
-                # Send email
-                send_email(
-                    subject="Reset Your Password",
-                    message=text_message,
-                    html_message=html_message,
-                    to_emails=[user.email],
-                )
-                
-                return Response(
-                    {"detail": "Password reset email sent."}, 
-                    status=status.HTTP_200_OK
-                )
-            
-            except User.DoesNotExist:
-                # Don't reveal whether a user account exists
-                pass
-                
+            # Don't reveal whether a user account exists: the response is
+            # the same either way, and so is the work, since the account is
+            # looked up in Celery.
+            request_password_reset.delay(serializer.validated_data["email"])
+
         return Response(
             {"detail": "Password reset email sent if the account exists."}, 
             status=status.HTTP_200_OK
@@ -129,6 +119,7 @@ class ResetPasswordView(APIView):
     API endpoint for resetting password with token.
     """
     permission_classes = [permissions.AllowAny]
+    throttle_scope = 'auth'
     
     def post(self, request):
         serializer = ResetPasswordSerializer(data=request.data)
@@ -155,15 +146,28 @@ class ResetPasswordView(APIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
-class UserProfileView(generics.RetrieveAPIView):
+class UserProfileView(CachedRetrieveMixin, generics.RetrieveAPIView):
     """
-    API endpoint for retrieving user profile.
+    API endpoint for retrieving user profile, including the avatar URLs.
+
+    Answers with ETag/Last-Modified and a cached serialization; both change
+    when the user or their profile is saved, and when the signed avatar URLs
+    are renewed.
     """
     serializer_class = UserProfileSerializer
     permission_classes = [permissions.IsAuthenticated]
     
     def get_object(self):
-        return self.request.user
+        # Loaded fresh rather than request.user, which was resolved before
+        # the modification stamp was read (see CachedRetrieveMixin).
+        return User.objects.select_related('profile').get(pk=self.request.user.pk)
+
+    def get_cache_identity(self):
+        return User._meta.label_lower, self.request.user.pk
+
+    def get_cache_refresh_interval(self):
+        # The avatar URLs are signed and renewed every window.
+        return settings.MEDIA_URL_REFRESH_MARGIN
 
 
 class ProfileUpdateView(generics.UpdateAPIView):
@@ -174,4 +178,102 @@ class ProfileUpdateView(generics.UpdateAPIView):
     permission_classes = [permissions.IsAuthenticated]
     
     def get_object(self):
-        return self.request.user 
\ No newline at end of file
+        # Not request.user, which comes from the authentication cache: saving
+        # a stale copy would write back old is_staff, is_active or password.
+        # The profile is only read, so only the user row is locked.
+        return User.objects.select_related('profile').select_for_update(of=('self',)).get(pk=self.request.user.pk)
+
+    def update(self, request, *args, **kwargs):
+        with transaction.atomic():
+            return super().update(request, *args, **kwargs)
+
+
+class AvatarUploadView(APIView):
+    """
+    API endpoint returning a form for uploading an avatar image straight to
+    storage, so that the image never passes through the API workers.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        serializer = AvatarUploadSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        upload = avatars.presign_upload(
+            request.user.pk,
+            serializer.validated_data['content_type'],
+            request.build_absolute_uri(reverse('avatar_local_upload')),
+        )
+        return Response(upload, status=status.HTTP_200_OK)
+
+
+class AvatarLocalUploadView(APIView):
+    """
+    API endpoint receiving avatar uploads for storages without presigned
+    uploads, such as the local filesystem in development. Authorized by the
+    signed token from AvatarUploadView, like a presigned S3 POST.
+    """
+    permission_classes = [permissions.AllowAny]
+    authentication_classes = []
+    parser_classes = [MultiPartParser]
+
+    def post(self, request):
+        serializer = AvatarLocalUploadSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            signed = avatars.check_upload_token(serializer.validated_data['token'])
+        except signing.BadSignature:
+            return Response({"detail": "Invalid or expired upload token."}, status=status.HTTP_403_FORBIDDEN)
+
+        upload = serializer.validated_data['file']
+        if upload.size > settings.AVATAR_MAX_UPLOAD_BYTES or upload.content_type != signed['content_type']:
+            return Response({"detail": "File does not match the upload policy."}, status=status.HTTP_400_BAD_REQUEST)
+        if default_storage.exists(signed['key']):
+            return Response({"detail": "Upload token already used."}, status=status.HTTP_403_FORBIDDEN)
+        default_storage.save(signed['key'], upload)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class AvatarView(APIView):
+    """
+    API endpoint confirming a completed avatar upload. The variants are
+    generated by the process_avatar task and appear on the profile once it
+    has run.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        serializer = AvatarConfirmSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        key = serializer.validated_data['key']
+        if not avatars.is_upload_key(request.user.pk, key) or not default_storage.exists(key):
+            return Response({"key": ["No such upload."]}, status=status.HTTP_400_BAD_REQUEST)
+        process_avatar.delay(request.user.pk, key)
+        return Response({"detail": "Avatar is being processed."}, status=status.HTTP_202_ACCEPTED)
+
+
+class LoginAttemptTopIPsView(APIView):
+    """
+    Staff-only API endpoint listing the IP addresses with the most failed
+    logins over the last ``hours`` hours. Reads the hourly rollups only.
+    """
+    permission_classes = [IsStaffClaim]
+
+    def get(self, request):
+        params = LoginAttemptStatsQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        since = timezone.now() - timedelta(hours=params.validated_data['hours'])
+        return Response(top_failing_ips(since, limit=params.validated_data['limit']))
+
+
+class LoginAttemptFailureRateView(APIView):
+    """
+    Staff-only API endpoint returning login attempts, failures and failure
+    rate per hour over the last ``hours`` hours. Reads the hourly rollups only.
+    """
+    permission_classes = [IsStaffClaim]
+
+    def get(self, request):
+        params = LoginAttemptStatsQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        since = timezone.now() - timedelta(hours=params.validated_data['hours'])
+        return Response(failure_rate(since))
@@ -1,8 +1,15 @@
+import logging
+import smtplib
+
 from celery import shared_task
 from django.db import connections
-from django.core.mail import send_mail
+from django.core.mail import get_connection, send_mail
 from django.conf import settings
 
+from apps.core import scheduling
+
+logger = logging.getLogger(__name__)
+
 @shared_task(
     queue='default',
     autoretry_for=(Exception,),
@@ -25,22 +32,74 @@ def check_db_connections():
                     )
     return True
 
-@shared_task(
-    queue='emails',
-    bind=True,
-    autoretry_for=(Exception,),
-    retry_backoff=True,
-    retry_kwargs={'max_retries': 3},
-)
-def send_email_notification(self, subject, message, recipient_list):
-    """Send email notification task."""
+@shared_task(queue='emails', bind=True)
+def send_email_notification(self, subject, message, recipient_list, attempt=0):
+    """
+    Send email notification task, shaped per recipient domain.
+
+    Recipients are grouped by domain and sent as one message per domain as
+    far as the domain's token bucket allows (see apps.core.scheduling). The
+    rest are re-queued with an ETA computed from the bucket. A temporary
+    failure (SMTP 4xx or a connection error) pauses the domain's bucket and
+    re-queues that batch with backoff, up to EMAIL_DOMAIN_MAX_DEFERRALS
+    times; permanent 5xx rejections are logged and dropped. When the server
+    refuses the recipients, each is classified by its own code.
+    """
+    ready, deferred = scheduling.schedule(recipient_list)
+    failures = []
+    connection = get_connection()
     try:
-        send_mail(
-            subject=subject,
-            message=message,
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            recipient_list=recipient_list,
+        for domain, recipients in ready.items():
+            try:
+                send_mail(
+                    subject=subject,
+                    message=message,
+                    from_email=settings.DEFAULT_FROM_EMAIL,
+                    recipient_list=recipients,
+                    connection=connection,
+                )
+            except smtplib.SMTPResponseException as exc:
+                if exc.smtp_code >= 500:
+                    logger.error(
+                        'Email notification rejected',
+                        extra={'domain': domain, 'smtp_code': exc.smtp_code, 'recipients': len(recipients)},
+                    )
+                    continue
+                failures.append((domain, recipients, exc))
+            except smtplib.SMTPRecipientsRefused as exc:
+                # Every recipient was refused, each with its own code.
+                retry = [address for address, (code, _) in exc.recipients.items() if code < 500]
+                rejected = len(exc.recipients) - len(retry)
+                if rejected:
+                    logger.error(
+                        'Email notification rejected',
+                        extra={'domain': domain, 'recipients': rejected,
+                               'smtp_codes': sorted({code for code, _ in exc.recipients.values() if code >= 500})},
+                    )
+                if retry:
+                    failures.append((domain, retry, exc))
+            except (smtplib.SMTPException, OSError) as exc:
+                failures.append((domain, recipients, exc))
+    finally:
+        connection.close()
+
+    for delay, recipients in deferred:
+        self.apply_async(args=(subject, message, recipients), kwargs={'attempt': attempt}, countdown=delay)
+
+    for domain, recipients, exc in failures:
+        if attempt >= settings.EMAIL_DOMAIN_MAX_DEFERRALS:
+            logger.error(
+                'Giving up on email notification',
+                extra={'domain': domain, 'recipients': len(recipients), 'error': str(exc)},
+            )
+            continue
+        backoff = settings.EMAIL_DOMAIN_DEFER_DELAY * 2 ** attempt
+        _, wait = scheduling.take(domain, 0, penalty=backoff)
+        logger.warning(
+            'Email notification deferred',
+            extra={'domain': domain, 'recipients': len(recipients), 'delay': max(backoff, wait), 'error': str(exc)},
+        )
+        self.apply_async(
+            args=(subject, message, recipients), kwargs={'attempt': attempt + 1}, countdown=max(backoff, wait),
         )
-        return True
-    except Exception as exc:
-        self.retry(exc=exc) 
\ No newline at end of file
+    return True
@@ -15,7 +15,7 @@ CELERYBEAT_SCHEDULE = {
     
     # Token cleanup task - runs at midnight
     'cleanup-expired-tokens': {
-        'task': 'apps.auth.tasks.cleanup_expired_tokens',
+        'task': 'apps.accounts.tasks.cleanup_expired_tokens',
         'schedule': crontab(hour=0, minute=0),
         'options': {
             'expires': 60 * 30,
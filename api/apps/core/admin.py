@@ -2,10 +2,31 @@
 Admin configuration for core app.
 """
 
+from django import forms
 from django.contrib import admin
 from django.utils.html import format_html, escape
 from django.utils.safestring import mark_safe
-from apps.core.models import Email
+from apps.core.models import Email, EmailOutbox
+
+
+class EmailAdminForm(forms.ModelForm):
+    """
+    Form exposing the content-addressed plain text body as a regular field.
+    """
+    body = forms.CharField(widget=forms.Textarea)
+
+    class Meta:
+        model = Email
+        fields = ('subject', 'from_email', 'to_emails', 'cc_emails', 'bcc_emails')
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if self.instance.pk:
+            self.fields['body'].initial = self.instance.body
+
+    def save(self, commit=True):
+        self.instance.body = self.cleaned_data['body']
+        return super().save(commit=commit)
 
 
 @admin.register(Email)
@@ -13,10 +34,13 @@ class EmailAdmin(admin.ModelAdmin):
     """
     Admin configuration for Email model.
     """
+    form = EmailAdminForm
     list_display = ('subject', 'from_email', 'to_emails', 'created_at')
     list_filter = ('created_at',)
-    search_fields = ('subject', 'from_email', 'to_emails', 'body', 'html_body')
+    # Searched through the full-text index, see get_search_results().
+    search_fields = ('subject', 'from_email', 'to_emails')
     readonly_fields = ('created_at', 'html_preview')
+    show_full_result_count = False
     
     fieldsets = (
         (None, {
@@ -41,6 +65,20 @@ class EmailAdmin(admin.ModelAdmin):
         })
     )
     
+    def get_queryset(self, request):
+        """
+        Skip loading the search vector; bodies are only fetched on access.
+        """
+        return super().get_queryset(request).defer('search_vector')
+
+    def get_search_results(self, request, queryset, search_term):
+        """
+        Search through the full-text index instead of ILIKE scans.
+        """
+        if not search_term:
+            return queryset, False
+        return queryset.search(search_term), False
+
     def html_preview(self, obj):
         """
         Display the email preview in an isolated iframe.
@@ -55,4 +93,15 @@ class EmailAdmin(admin.ModelAdmin):
                 '</div>'
             )
         return "No HTML preview available"
-    html_preview.short_description = " " 
\ No newline at end of file
+    html_preview.short_description = " " 
+
+
+@admin.register(EmailOutbox)
+class EmailOutboxAdmin(admin.ModelAdmin):
+    """
+    Admin configuration for EmailOutbox model.
+    """
+    list_display = ('subject', 'from_email', 'status', 'attempts', 'available_at', 'created_at')
+    list_filter = ('status',)
+    search_fields = ('subject', 'from_email')
+    readonly_fields = ('attempts', 'last_error', 'created_at', 'sent_at')
@@ -0,0 +1,14 @@
+"""
+App configuration for the core app.
+"""
+
+from django.apps import AppConfig
+
+
+class CoreConfig(AppConfig):
+    name = 'apps.core'
+
+    def ready(self):
+        from apps.core.rendering import precompile_email_templates
+
+        precompile_email_templates()
@@ -0,0 +1,234 @@
+"""
+Buffered archival of sent emails.
+
+Emails are archived in the Email model. Instead of one INSERT per message,
+records are collected per process and written with bulk_create once the
+buffer reaches EMAIL_ARCHIVE_BUFFER_SIZE records or EMAIL_ARCHIVE_FLUSH_INTERVAL
+seconds, and at the end of every request and Celery task.
+
+When EMAIL_ARCHIVE_SPILL_KEY is set, every buffered record is also pushed to a
+per-process Redis list until it is flushed, so a crashed process loses no more
+than what Redis itself would lose. recover_spilled_emails() writes lists left
+behind by dead processes to the database. A list belongs to a dead process
+once its heartbeat expires; live processes refresh it whenever they spill or
+flush, and a failed flush is retried on a timer so that a process holding
+records keeps flushing, and beating, even when idle.
+"""
+
+import atexit
+import json
+import logging
+import os
+import socket
+import threading
+import time
+
+from django.conf import settings
+from django.utils.dateparse import parse_datetime
+
+from apps.core.models import Email
+
+logger = logging.getLogger(__name__)
+
+
+def _redis():
+    from django_redis import get_redis_connection
+
+    return get_redis_connection('default')
+
+
+class EmailArchiveBuffer:
+    """
+    Per-process buffer of Email records waiting to be bulk inserted.
+    """
+
+    def __init__(self):
+        self._records = []
+        self._lock = threading.Lock()
+        self._first_added = None
+        self._spill_key = None
+        self._retry = None
+
+    @property
+    def spill_key(self):
+        """
+        Redis list holding this process's unflushed records, if spilling is on.
+        """
+        base = getattr(settings, 'EMAIL_ARCHIVE_SPILL_KEY', '')
+        if not base:
+            return None
+        if self._spill_key is None:
+            self._spill_key = f'{base}:{socket.gethostname()}:{os.getpid()}'
+        return self._spill_key
+
+    def add(self, **fields):
+        """
+        Buffer an Email record and flush if a threshold has been reached.
+        """
+        email = Email(**fields)
+        spill_key = self.spill_key
+
+        with self._lock:
+            # Spill under the lock so the Redis list stays in buffer order
+            # and flush() can trim exactly the records it wrote.
+            if spill_key:
+                self._spill(spill_key, email)
+            self._records.append(email)
+            if self._first_added is None:
+                self._first_added = time.monotonic()
+            due = (
+                len(self._records) >= settings.EMAIL_ARCHIVE_BUFFER_SIZE
+                or time.monotonic() - self._first_added >= settings.EMAIL_ARCHIVE_FLUSH_INTERVAL
+            )
+        if due:
+            self.flush()
+        return email
+
+    def flush(self):
+        """
+        Write all buffered records with a single bulk_create.
+        """
+        with self._lock:
+            records, self._records = self._records, []
+            self._first_added = None
+        if not records:
+            return 0
+
+        spill_key = self.spill_key
+        if spill_key:
+            self._heartbeat(spill_key)
+        try:
+            Email.objects.bulk_create(records, batch_size=500)
+        except Exception:
+            # Keep the records for the next flush; they are still spilled.
+            with self._lock:
+                self._records[:0] = records
+                self._first_added = self._first_added or time.monotonic()
+            logger.exception('Failed to flush email archive buffer')
+            self._schedule_retry()
+            return 0
+
+        if spill_key:
+            try:
+                _redis().ltrim(spill_key, len(records), -1)
+            except Exception:
+                logger.exception('Failed to trim email archive spill list')
+        return len(records)
+
+    def reset(self):
+        """
+        Forget buffered records without writing them (used after fork).
+        """
+        self._records = []
+        self._first_added = None
+        self._spill_key = None
+        self._retry = None
+        self._lock = threading.Lock()
+
+    def _schedule_retry(self):
+        with self._lock:
+            if self._retry is not None:
+                return
+            self._retry = threading.Timer(settings.EMAIL_ARCHIVE_FLUSH_INTERVAL, self._retry_flush)
+            self._retry.daemon = True
+            self._retry.start()
+
+    def _retry_flush(self):
+        from django.db import connections
+
+        with self._lock:
+            self._retry = None
+        try:
+            self.flush()
+        finally:
+            connections.close_all()
+
+    def _heartbeat(self, spill_key, pipe=None):
+        heartbeat = settings.EMAIL_ARCHIVE_FLUSH_INTERVAL * 4 + 60
+        if pipe is not None:
+            pipe.set(f'{spill_key}:alive', 1, ex=heartbeat)
+            return
+        try:
+            _redis().set(f'{spill_key}:alive', 1, ex=heartbeat)
+        except Exception:
+            logger.warning('Failed to refresh email archive spill heartbeat', exc_info=True)
+
+    def _spill(self, spill_key, email):
+        try:
+            pipe = _redis().pipeline()
+            pipe.rpush(spill_key, json.dumps(_serialize(email)))
+            self._heartbeat(spill_key, pipe)
+            pipe.execute()
+        except Exception:
+            logger.exception('Failed to spill email archive record to Redis')
+
+
+def _serialize(email):
+    return {
+        'from_email': email.from_email,
+        'to_emails': email.to_emails,
+        'cc_emails': email.cc_emails,
+        'bcc_emails': email.bcc_emails,
+        'subject': email.subject,
+        'body': email.body,
+        'html_body': email.html_body,
+        'created_at': email.created_at.isoformat(),
+    }
+
+
+def _deserialize(data):
+    data = dict(data)
+    data['created_at'] = parse_datetime(data['created_at'])
+    return Email(**data)
+
+
+email_archive = EmailArchiveBuffer()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=email_archive.reset)
+atexit.register(email_archive.flush)
+
+
+def archive_email(**fields):
+    """
+    Archive an email through the process-wide buffer.
+    """
+    return email_archive.add(**fields)
+
+
+def flush_email_archive():
+    """
+    Flush the process-wide buffer; safe to call from request and task hooks.
+    """
+    try:
+        return email_archive.flush()
+    except Exception:
+        logger.exception('Failed to flush email archive buffer')
+        return 0
+
+
+def recover_spilled_emails():
+    """
+    Archive records spilled by processes that died before flushing them.
+
+    A spill list is considered orphaned once its heartbeat key has expired.
+    """
+    base = getattr(settings, 'EMAIL_ARCHIVE_SPILL_KEY', '')
+    if not base:
+        return 0
+
+    client = _redis()
+    recovered = 0
+    for key in client.scan_iter(match=f'{base}:*'):
+        key = key.decode() if isinstance(key, bytes) else key
+        if key.endswith(':alive') or client.exists(f'{key}:alive'):
+            continue
+        payloads = client.lrange(key, 0, -1)
+        if payloads:
+            Email.objects.bulk_create(
+                [_deserialize(json.loads(payload)) for payload in payloads],
+                batch_size=500,
+            )
+            recovered += len(payloads)
+        client.delete(key)
+    return recovered
@@ -0,0 +1,56 @@
+"""
+Timing helpers shared by the benchmark management commands.
+"""
+
+import math
+import statistics
+import time
+
+
+def percentile(samples, pct):
+    """
+    Return the nearest-rank percentile of a list of samples.
+    """
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(int(math.ceil(pct / 100.0 * len(ordered))) - 1, 0)
+    return ordered[rank]
+
+
+def summarize(samples):
+    """
+    Summarize a list of durations (in seconds) as milliseconds.
+    """
+    return {
+        'count': len(samples),
+        'mean_ms': statistics.fmean(samples) * 1000 if samples else 0.0,
+        'p50_ms': percentile(samples, 50) * 1000,
+        'p95_ms': percentile(samples, 95) * 1000,
+        'p99_ms': percentile(samples, 99) * 1000,
+        'max_ms': max(samples) * 1000 if samples else 0.0,
+    }
+
+
+def format_summary(label, summary):
+    """
+    Format a summary produced by summarize() as a single report line.
+    """
+    return (
+        f"{label:<24} n={summary['count']:<6} "
+        f"mean={summary['mean_ms']:.2f}ms p50={summary['p50_ms']:.2f}ms "
+        f"p95={summary['p95_ms']:.2f}ms p99={summary['p99_ms']:.2f}ms "
+        f"max={summary['max_ms']:.2f}ms"
+    )
+
+
+def time_calls(func, iterations):
+    """
+    Call func() repeatedly and return the duration of each call in seconds.
+    """
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return samples
@@ -0,0 +1,73 @@
+"""
+Bloom filter over byte strings.
+
+The bits live in any buffer: a bytearray for filters built in memory, or a
+read-only memory map for filters saved to disk with save(), so that every
+process on a host opening the same file shares one copy in the page cache.
+"""
+
+import hashlib
+import math
+import mmap
+import os
+import struct
+
+MAGIC = b'LKBLOOM1'
+# Magic, size in bits, number of hashes.
+HEADER = struct.Struct('<8sQI4x')
+
+
+class BloomFilter:
+    """
+    Fixed-size bloom filter over byte strings.
+    """
+
+    def __init__(self, size, hashes, bits=None):
+        self.size = size
+        self.hashes = hashes
+        self.bits = bits if bits is not None else bytearray((size + 7) // 8)
+
+    @classmethod
+    def for_capacity(cls, capacity, error_rate):
+        """
+        Return an empty filter sized for ``capacity`` items at ``error_rate``.
+        """
+        capacity = max(1, capacity)
+        size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        return cls(size, max(1, round(size / capacity * math.log(2))))
+
+    @classmethod
+    def open(cls, path):
+        """
+        Memory-map a filter written by save(), read-only.
+        """
+        with open(path, 'rb') as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, size, hashes = HEADER.unpack_from(mapped)
+        if magic != MAGIC or len(mapped) != HEADER.size + (size + 7) // 8:
+            raise ValueError(f'{path} is not a bloom filter file')
+        return cls(size, hashes, memoryview(mapped)[HEADER.size:])
+
+    def save(self, path):
+        """
+        Write the filter to ``path``, replacing any previous file atomically.
+        """
+        temporary = f'{path}.tmp'
+        with open(temporary, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, self.size, self.hashes))
+            f.write(self.bits)
+        os.replace(temporary, path)
+
+    def _positions(self, value):
+        # Kirsch-Mitzenmacher: derive all positions from two 64-bit hashes.
+        digest = hashlib.blake2b(value, digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'little')
+        second = int.from_bytes(digest[8:], 'little') | 1
+        return ((first + i * second) % self.size for i in range(self.hashes))
+
+    def add(self, value):
+        for position in self._positions(value):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, value):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(value))
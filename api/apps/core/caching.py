@@ -0,0 +1,49 @@
+"""
+Modification stamps for cached representations.
+
+A stamp is the time an object last changed, kept in the default cache under
+``stamp:<app_label.model>:<pk>``. Writers call touch() when the object
+changes (after the transaction commits, so readers never pair a new stamp
+with old rows); readers call modified_at() to learn whether anything they
+cached or a client holds is still current without loading the object.
+CachedRetrieveMixin in apps.core.mixins builds ETags, Last-Modified and its
+response cache on top of these stamps.
+"""
+
+import logging
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = 'stamp'
+
+# Stamps outlive any cached representation; a lost stamp only costs a miss.
+STAMP_TIMEOUT = 30 * 86400
+
+
+def stamp_key(label, pk):
+    return f'{KEY_PREFIX}:{label}:{pk}'
+
+
+def touch(label, pk):
+    """
+    Record that the object changed, once the current transaction commits.
+    """
+    def bump():
+        try:
+            cache.set(stamp_key(label, pk), time.time(), timeout=STAMP_TIMEOUT)
+        except Exception:
+            logger.warning('Failed to update modification stamp for %s %s', label, pk, exc_info=True)
+
+    transaction.on_commit(bump)
+
+
+def modified_at(label, pk):
+    """
+    Return the object's modification stamp as a Unix timestamp. An object
+    without a stamp (never touched, or evicted) is stamped now.
+    """
+    return cache.get_or_set(stamp_key(label, pk), time.time, timeout=STAMP_TIMEOUT)
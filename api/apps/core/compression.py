@@ -0,0 +1,57 @@
+"""
+Compression helpers for content-addressed email bodies.
+
+zstd is used when the optional ``zstandard`` package is installed, zlib
+otherwise. The codec is stored with every blob, so blobs written with
+either codec stay readable.
+"""
+
+import hashlib
+import zlib
+
+from django.conf import settings
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+CODEC_ZLIB = 'zlib'
+CODEC_ZSTD = 'zstd'
+
+
+def text_digest(text):
+    """
+    Return the SHA-256 hex digest used as the content address of a text.
+    """
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def default_codec():
+    codec = getattr(settings, 'EMAIL_BODY_CODEC', CODEC_ZSTD)
+    if codec == CODEC_ZSTD and zstandard is None:
+        return CODEC_ZLIB
+    return codec
+
+
+def compress_text(text, codec=None):
+    """
+    Compress a text, returning a ``(codec, data)`` tuple.
+    """
+    codec = codec or default_codec()
+    raw = text.encode('utf-8')
+    if codec == CODEC_ZSTD:
+        return codec, zstandard.ZstdCompressor(level=10).compress(raw)
+    return CODEC_ZLIB, zlib.compress(raw, 9)
+
+
+def decompress_text(codec, data):
+    """
+    Decompress data produced by compress_text().
+    """
+    data = bytes(data)
+    if codec == CODEC_ZSTD:
+        if zstandard is None:
+            raise RuntimeError('The zstandard package is required to read zstd email bodies.')
+        return zstandard.ZstdDecompressor().decompress(data).decode('utf-8')
+    return zlib.decompress(data).decode('utf-8')
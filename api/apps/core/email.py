@@ -1,20 +1,289 @@
 """
-Custom email backend for development that stores emails in the database.
+Custom email backends for LaunchKit.
+
+DevEmailBackend prints emails to the console in development.
+PooledSMTPEmailBackend keeps a per-worker pool of authenticated SMTP
+connections so messages don't pay for a connect, TLS handshake and login
+each.
 """
 
+import asyncio
+import logging
+import os
+import smtplib
+import threading
+import time
+from collections import deque
+
 from django.core.mail.backends.smtp import EmailBackend as SMTPBackend
 from django.core.mail.backends.console import EmailBackend as ConsoleBackend
 from django.conf import settings
 from django.utils import timezone
 
+logger = logging.getLogger(__name__)
+
 
 class DevEmailBackend(ConsoleBackend):
     """
     Email backend for development that prints to console.
     """
-    
+
     def send_messages(self, email_messages):
         """
         Print emails to console in development.
         """
-        return super().send_messages(email_messages) 
\ No newline at end of file
+        return super().send_messages(email_messages)
+
+
+class PooledConnection:
+    """
+    An authenticated SMTP session checked out of a pool.
+    """
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+        self.messages_sent = 0
+
+    def is_alive(self):
+        """
+        Check the session with a NOOP.
+        """
+        try:
+            return self.connection.noop()[0] == 250
+        except (smtplib.SMTPException, OSError):
+            return False
+
+    def close(self):
+        try:
+            self.connection.quit()
+        except (smtplib.SMTPException, OSError):
+            try:
+                self.connection.close()
+            except (smtplib.SMTPException, OSError):
+                pass
+
+
+class SMTPConnectionPool:
+    """
+    A bounded pool of SMTP sessions to one server.
+
+    Idle sessions are reused most-recently-used first. Sessions idle for
+    longer than ``healthcheck_after`` seconds are checked with a NOOP before
+    reuse, and sessions that have sent ``max_messages`` messages are
+    recycled, since many relays cap messages per session.
+    """
+
+    def __init__(self, connect, size, max_messages, healthcheck_after, acquire_timeout):
+        self._connect = connect
+        self._idle = deque()
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(size)
+        self.max_messages = max_messages
+        self.healthcheck_after = healthcheck_after
+        self.acquire_timeout = acquire_timeout
+
+    def acquire(self):
+        """
+        Check out a live session, opening a new one if none is idle.
+        """
+        if not self._slots.acquire(timeout=self.acquire_timeout):
+            raise smtplib.SMTPException('Timed out waiting for a pooled SMTP connection')
+        try:
+            while True:
+                with self._lock:
+                    pooled = self._idle.pop() if self._idle else None
+                if pooled is None:
+                    return PooledConnection(self._connect())
+                idle_for = time.monotonic() - pooled.last_used
+                if idle_for < self.healthcheck_after or pooled.is_alive():
+                    return pooled
+                pooled.close()
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def release(self, pooled, discard=False):
+        """
+        Return a session to the pool, or close it if it is broken or spent.
+        """
+        try:
+            pooled.last_used = time.monotonic()
+            if discard or pooled.messages_sent >= self.max_messages:
+                pooled.close()
+            else:
+                with self._lock:
+                    self._idle.append(pooled)
+        finally:
+            self._slots.release()
+
+    def close_all(self):
+        with self._lock:
+            idle, self._idle = list(self._idle), deque()
+        for pooled in idle:
+            pooled.close()
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def _reset_pools():
+    """
+    Drop pools inherited from a parent process; sockets must not be shared
+    between gunicorn or Celery worker processes.
+    """
+    global _pools_lock
+    _pools.clear()
+    _pools_lock = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_pools)
+
+
+class PooledSMTPEmailBackend(SMTPBackend):
+    """
+    SMTP backend that borrows sessions from a per-process connection pool.
+
+    open() checks out a session and close() returns it, so callers that
+    reuse a backend instance for many messages keep a single session, and
+    one-off send_mail() calls reuse sessions from earlier calls. A session
+    that drops mid-send is replaced and the message retried once.
+
+    With EMAIL_POOL_CONCURRENCY > 1, batches of messages are sent over
+    several sessions at once from an asyncio loop; smtplib is blocking, so
+    each session runs in a worker thread.
+    """
+
+    RECOVERABLE_ERRORS = (smtplib.SMTPServerDisconnected, smtplib.SMTPHeloError, OSError)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.concurrency = getattr(settings, 'EMAIL_POOL_CONCURRENCY', 1)
+        self._pooled = None
+
+    @property
+    def pool(self):
+        key = (self.host, self.port, self.username, self.use_tls, self.use_ssl)
+        with _pools_lock:
+            pool = _pools.get(key)
+            if pool is None:
+                pool = _pools[key] = SMTPConnectionPool(
+                    connect=self._connect,
+                    size=getattr(settings, 'EMAIL_POOL_SIZE', 4),
+                    max_messages=getattr(settings, 'EMAIL_POOL_MAX_MESSAGES', 100),
+                    healthcheck_after=getattr(settings, 'EMAIL_POOL_HEALTHCHECK_AFTER', 30),
+                    acquire_timeout=getattr(settings, 'EMAIL_POOL_ACQUIRE_TIMEOUT', 10),
+                )
+        return pool
+
+    def _connect(self):
+        """
+        Open and authenticate a new SMTP session using the parent backend.
+        """
+        backend = SMTPBackend(
+            host=self.host, port=self.port, username=self.username,
+            password=self.password, use_tls=self.use_tls, use_ssl=self.use_ssl,
+            timeout=self.timeout, ssl_keyfile=self.ssl_keyfile,
+            ssl_certfile=self.ssl_certfile, fail_silently=False,
+        )
+        backend.open()
+        return backend.connection
+
+    def open(self):
+        if self._pooled is not None:
+            return False
+        try:
+            self._pooled = self.pool.acquire()
+        except (smtplib.SMTPException, OSError):
+            if not self.fail_silently:
+                raise
+            return None
+        self.connection = self._pooled.connection
+        return True
+
+    def close(self, discard=False):
+        if self._pooled is None:
+            return
+        pooled, self._pooled, self.connection = self._pooled, None, None
+        self.pool.release(pooled, discard=discard)
+
+    def send_messages(self, email_messages):
+        if not email_messages:
+            return 0
+        if self.concurrency > 1 and len(email_messages) > 1 and self._pooled is None:
+            try:
+                asyncio.get_running_loop()
+            except RuntimeError:
+                return asyncio.run(self.asend_messages(email_messages))
+
+        with self._lock:
+            new_conn_created = self.open()
+            if not self.connection or new_conn_created is None:
+                return 0
+            num_sent = 0
+            try:
+                for message in email_messages:
+                    if self._send_with_retry(message):
+                        num_sent += 1
+            finally:
+                if new_conn_created:
+                    self.close()
+        return num_sent
+
+    def _send_with_retry(self, message):
+        """
+        Send a message, replacing the session once if it has gone away.
+        """
+        if self._pooled is None and self.open() is None:
+            # Reopening after the last recycle failed silently.
+            return False
+        try:
+            sent = self._send(message)
+        except self.RECOVERABLE_ERRORS:
+            logger.info('Pooled SMTP session lost, reconnecting')
+            self.close(discard=True)
+            if self.open() is None:
+                return False
+            sent = self._send(message)
+        if sent:
+            self._pooled.messages_sent += 1
+            if self._pooled.messages_sent >= self.pool.max_messages:
+                # Only release the spent session: the message is delivered,
+                # so a failure to open the next one must not be reported
+                # against it. The next send opens a session when it needs one.
+                self.close()
+        return sent
+
+    async def asend_messages(self, email_messages):
+        """
+        Send messages over up to EMAIL_POOL_CONCURRENCY sessions at once.
+        """
+        queue = deque(email_messages)
+
+        def drain():
+            backend = PooledSMTPEmailBackend(
+                host=self.host, port=self.port, username=self.username,
+                password=self.password, use_tls=self.use_tls, use_ssl=self.use_ssl,
+                timeout=self.timeout, ssl_keyfile=self.ssl_keyfile,
+                ssl_certfile=self.ssl_certfile, fail_silently=self.fail_silently,
+            )
+            sent = 0
+            if backend.open() is None:
+                return 0
+            try:
+                while True:
+                    try:
+                        message = queue.popleft()
+                    except IndexError:
+                        return sent
+                    if backend._send_with_retry(message):
+                        sent += 1
+            finally:
+                backend.close()
+
+        workers = min(self.concurrency, len(email_messages))
+        results = await asyncio.gather(*(asyncio.to_thread(drain) for _ in range(workers)))
+        return sum(results)
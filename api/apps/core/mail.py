@@ -3,10 +3,12 @@ Email utilities for LaunchKit.
 """
 
 from typing import List, Optional
-from django.core.mail import send_mail as django_send_mail
+from django.core.mail import EmailMultiAlternatives
 from django.conf import settings
+from django.db import transaction
 from django.utils import timezone
-from apps.core.models import Email
+from apps.core.archive import archive_email
+from apps.core.models import EmailOutbox
 
 
 def send_email(
@@ -17,10 +19,15 @@ def send_email(
     html_message: Optional[str] = None,
     cc_emails: Optional[List[str]] = None,
     bcc_emails: Optional[List[str]] = None,
+    defer: Optional[bool] = None,
 ) -> bool:
     """
     Send an email and store it in the database.
-    
+
+    When the outbox is enabled (EMAIL_OUTBOX_ENABLED) or ``defer`` is True,
+    the email is written to the outbox in the caller's transaction and
+    delivered later by the ``dispatch_email_outbox`` task.
+
     Args:
         subject: The subject of the email
         message: The plain text message
@@ -29,27 +36,115 @@ def send_email(
         html_message: Optional HTML version of the message
         cc_emails: Optional list of CC recipients
         bcc_emails: Optional list of BCC recipients
-    
+        defer: Queue the email in the outbox instead of sending it inline
+            (defaults to EMAIL_OUTBOX_ENABLED)
+
     Returns:
-        bool: True if the email was sent successfully, False otherwise
+        bool: True if the email was sent (or queued) successfully, False otherwise
     """
     if from_email is None:
         from_email = settings.DEFAULT_FROM_EMAIL
-        
-    try:
-        # Send the email using Django's send_mail
-        sent = django_send_mail(
+    if defer is None:
+        defer = settings.EMAIL_OUTBOX_ENABLED
+
+    if defer:
+        enqueue_email(
             subject=subject,
             message=message,
+            to_emails=to_emails,
             from_email=from_email,
-            recipient_list=to_emails,
             html_message=html_message,
-            fail_silently=False,
+            cc_emails=cc_emails,
+            bcc_emails=bcc_emails,
+        )
+        return True
+
+    return deliver_email(
+        subject=subject,
+        message=message,
+        to_emails=to_emails,
+        from_email=from_email,
+        html_message=html_message,
+        cc_emails=cc_emails,
+        bcc_emails=bcc_emails,
+    )
+
+
+def enqueue_email(
+    subject: str,
+    message: str,
+    to_emails: List[str],
+    from_email: str,
+    html_message: Optional[str] = None,
+    cc_emails: Optional[List[str]] = None,
+    bcc_emails: Optional[List[str]] = None,
+) -> EmailOutbox:
+    """
+    Write an email to the outbox and kick the dispatcher once the
+    surrounding transaction commits.
+    """
+    item = EmailOutbox.objects.create(
+        subject=subject,
+        body=message,
+        html_body=html_message,
+        from_email=from_email,
+        to_emails=list(to_emails),
+        cc_emails=list(cc_emails or []),
+        bcc_emails=list(bcc_emails or []),
+    )
+    transaction.on_commit(_schedule_outbox_dispatch)
+    return item
+
+
+def _schedule_outbox_dispatch():
+    """
+    Ask a worker to drain the outbox. The periodic beat entry picks up
+    anything missed if the broker is unavailable.
+    """
+    from apps.core.tasks import dispatch_email_outbox
+
+    dispatch_email_outbox.delay()
+
+
+def deliver_email(
+    subject: str,
+    message: str,
+    to_emails: List[str],
+    from_email: str,
+    html_message: Optional[str] = None,
+    cc_emails: Optional[List[str]] = None,
+    bcc_emails: Optional[List[str]] = None,
+    connection=None,
+) -> bool:
+    """
+    Send an email immediately and archive it in the database.
+
+    The archive record is buffered and bulk inserted at the end of the
+    request or task (see apps.core.archive).
+
+    Args:
+        connection: Optional open email backend connection to reuse
+
+    Returns:
+        bool: True if the email was sent successfully, False otherwise
+    """
+    try:
+        email = EmailMultiAlternatives(
+            subject=subject,
+            body=message,
+            from_email=from_email,
+            to=to_emails,
+            cc=cc_emails,
+            bcc=bcc_emails,
+            connection=connection,
         )
-        
+        if html_message:
+            email.attach_alternative(html_message, 'text/html')
+        sent = email.send(fail_silently=False)
+
         # Store the email in the database regardless of whether it was sent
         # This helps track failed attempts in development
-        Email.objects.create(
+        archive_email(
             subject=subject,
             body=message,
             html_body=html_message,
@@ -59,13 +154,13 @@ def send_email(
             bcc_emails=', '.join(bcc_emails or []),
             created_at=timezone.now()
         )
-        
-        return sent
-        
+
+        return bool(sent)
+
     except Exception as e:
         # Log the error and store the failed attempt
         # In development, this will help debug email issues
-        Email.objects.create(
+        archive_email(
             subject=f"[FAILED] {subject}",
             body=f"Error sending email: {str(e)}\n\nOriginal message:\n{message}",
             html_body=html_message,
@@ -75,6 +170,6 @@ def send_email(
             bcc_emails=', '.join(bcc_emails or []),
             created_at=timezone.now()
         )
-        
+
         # Re-raise the exception to be handled by the caller
-        raise 
\ No newline at end of file
+        raise
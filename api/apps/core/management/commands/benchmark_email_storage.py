@@ -0,0 +1,102 @@
+"""
+Benchmark content-addressed email body storage on a seeded archive.
+"""
+
+import random
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from apps.core.benchmarks import format_summary, summarize, time_calls
+from apps.core.models import Email
+
+
+class Command(BaseCommand):
+    help = 'Seed archived emails, then report body storage saved and insert, list-view and lookup latency.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=100_000, help='Emails to seed (e.g. 10000000)')
+        parser.add_argument('--batch', type=int, default=5000, help='Emails per bulk insert')
+        parser.add_argument(
+            '--duplicate-share', type=float, default=0.3,
+            help='Share of emails reusing one of a few identical notification bodies',
+        )
+        parser.add_argument('--iterations', type=int, default=50, help='List-view queries to time')
+
+    def handle(self, *args, **options):
+        context = {
+            'user': {'username': '__USERNAME__', 'email': '__EMAIL__'},
+            'reset_url': '__RESET_URL__',
+            'project_name': 'LaunchKit',
+        }
+        html_template = render_to_string('email/password_reset_email.html', context)
+        text_template = render_to_string('email/password_reset_email.txt', context)
+        notifications = [f'Scheduled notification #{n}\n' + 'x' * 2000 for n in range(10)]
+
+        raw_bytes = 0
+        insert_samples = []
+        rng = random.Random(0)
+        now = timezone.now()
+        seeded = 0
+        while seeded < options['rows']:
+            batch = []
+            for i in range(seeded, min(seeded + options['batch'], options['rows'])):
+                address = f'bench{i}@example.com'
+                if rng.random() < options['duplicate_share']:
+                    body, html_body = rng.choice(notifications), None
+                else:
+                    url = f'https://app.example.com/auth/reset-password?uid={i}&token={rng.getrandbits(64):x}'
+                    body = (text_template.replace('__USERNAME__', f'bench{i}')
+                            .replace('__EMAIL__', address).replace('__RESET_URL__', url))
+                    html_body = (html_template.replace('__USERNAME__', f'bench{i}')
+                                 .replace('__EMAIL__', address).replace('__RESET_URL__', url))
+                raw_bytes += len(body.encode('utf-8')) + len((html_body or '').encode('utf-8'))
+                batch.append(Email(
+                    subject='[bench] Reset Your Password',
+                    from_email='no-reply@example.com',
+                    to_emails=address,
+                    body=body,
+                    html_body=html_body,
+                    created_at=now - timedelta(seconds=i),
+                ))
+            start = time.perf_counter()
+            Email.objects.bulk_create(batch)
+            insert_samples.append((time.perf_counter() - start) / len(batch))
+            seeded += len(batch)
+            self.stdout.write(f'seeded {seeded}/{options["rows"]}', ending='\r')
+        self.stdout.write('')
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT pg_total_relation_size('core_email'), pg_total_relation_size('core_emailbody')"
+            )
+            email_size, body_size = cursor.fetchone()
+
+        self.stdout.write(f'raw body text:        {raw_bytes / 2**20:,.1f} MiB')
+        self.stdout.write(f'body table on disk:   {body_size / 2**20:,.1f} MiB')
+        self.stdout.write(f'email table on disk:  {email_size / 2**20:,.1f} MiB')
+        if raw_bytes:
+            self.stdout.write(f'body storage saved:   {100 * (1 - body_size / raw_bytes):.1f}%')
+        self.stdout.write(format_summary('insert (per email)', summarize(insert_samples)))
+
+        def list_page():
+            list(
+                Email.objects.order_by('-created_at')
+                .values_list('id', 'subject', 'from_email', 'to_emails', 'created_at')[:100]
+            )
+
+        def detail_view():
+            email = Email.objects.order_by('-created_at').first()
+            email.body, email.html_body
+
+        def recipient_lookup():
+            address = f'BENCH{rng.randrange(options["rows"])}@example.com'
+            list(Email.objects.sent_to(address, since=now - timedelta(days=30)).values_list('id', flat=True)[:50])
+
+        self.stdout.write(format_summary('changelist page', summarize(time_calls(list_page, options['iterations']))))
+        self.stdout.write(format_summary('recipient lookup', summarize(time_calls(recipient_lookup, options['iterations']))))
+        self.stdout.write(format_summary('detail + decompress', summarize(time_calls(detail_view, options['iterations']))))
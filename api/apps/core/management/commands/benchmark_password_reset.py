@@ -0,0 +1,60 @@
+"""
+Benchmark password reset request latency for existing and unknown
+addresses.
+"""
+
+import itertools
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import Client, override_settings
+
+from apps.accounts.lookup import absent_email_key
+from apps.core.benchmarks import format_summary, summarize, time_calls
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure reset-password-email latency for an existing account, a repeated unknown address '
+        'and fresh unknown addresses; the three should be indistinguishable.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200, help='Requests per case')
+        parser.add_argument('--email', default='bench-reset@example.com', help='Address of the benchmark account')
+        parser.add_argument('--host', default='localhost', help='Host header sent with each request')
+
+    def handle(self, *args, **options):
+        client = Client(HTTP_HOST=options['host'])
+        fresh = (f'bench-absent-{n}@example.com' for n in itertools.count())
+        cases = (
+            ('existing account', lambda: options['email']),
+            ('unknown (cached)', lambda: 'bench-absent@example.com'),
+            ('unknown (fresh)', lambda: next(fresh)),
+        )
+        used = []
+
+        # Everything runs in one rolled back transaction so the benchmark
+        # leaves no users behind; the reset tasks it queues find no user
+        # and send nothing.
+        with transaction.atomic():
+            get_user_model().objects.create_user(
+                username='bench-reset', email=options['email'], password='bench-reset-password',
+            )
+            # The auth throttle would turn away all but the first requests.
+            rest_framework = {**settings.REST_FRAMEWORK, 'DEFAULT_THROTTLE_RATES': {}}
+            with override_settings(REST_FRAMEWORK=rest_framework):
+                for label, address in cases:
+                    def request():
+                        email = address()
+                        used.append(email)
+                        client.post('/api/auth/reset-password-email/', {'email': email}, content_type='application/json')
+
+                    request()  # warm up connections and the absent cache
+                    samples = time_calls(request, options['requests'])
+                    self.stdout.write(format_summary(label, summarize(samples)))
+            transaction.set_rollback(True)
+        cache.delete_many([absent_email_key(email) for email in set(used)])
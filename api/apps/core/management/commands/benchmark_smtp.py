@@ -0,0 +1,68 @@
+"""
+Benchmark SMTP delivery throughput against a local sink server.
+"""
+
+import time
+
+from django.core.mail import EmailMessage
+from django.core.mail.backends.smtp import EmailBackend as SMTPBackend
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.core.email import PooledSMTPEmailBackend
+
+
+class Command(BaseCommand):
+    help = 'Compare per-message SMTP connections with the pooled backend using a local aiosmtpd sink.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--messages', type=int, default=500, help='Messages per mode')
+        parser.add_argument('--port', type=int, default=8025, help='Port for the local sink')
+        parser.add_argument('--concurrency', type=int, default=4, help='Sessions for the concurrent mode')
+
+    def handle(self, *args, **options):
+        try:
+            from aiosmtpd.controller import Controller
+            from aiosmtpd.handlers import Sink
+        except ImportError:
+            raise CommandError('aiosmtpd is required for this benchmark (pip install -r requirements/dev.txt).')
+
+        host, port = '127.0.0.1', options['port']
+        controller = Controller(Sink(), hostname=host, port=port)
+        controller.start()
+        try:
+            messages = [
+                EmailMessage(
+                    subject=f'Benchmark {i}',
+                    body='x' * 2048,
+                    from_email='bench@example.com',
+                    to=[f'user{i}@example.com'],
+                )
+                for i in range(options['messages'])
+            ]
+            backend_kwargs = {'host': host, 'port': port, 'username': '', 'password': '',
+                              'use_tls': False, 'use_ssl': False}
+
+            def per_message():
+                for message in messages:
+                    SMTPBackend(**backend_kwargs).send_messages([message])
+
+            def pooled():
+                for message in messages:
+                    PooledSMTPEmailBackend(**backend_kwargs).send_messages([message])
+
+            def pooled_concurrent():
+                backend = PooledSMTPEmailBackend(**backend_kwargs)
+                backend.concurrency = options['concurrency']
+                backend.send_messages(messages)
+
+            for label, run in (
+                ('connection per message', per_message),
+                ('pooled', pooled),
+                (f"pooled x{options['concurrency']} sessions", pooled_concurrent),
+            ):
+                start = time.perf_counter()
+                run()
+                elapsed = time.perf_counter() - start
+                self.stdout.write(f'{label:<28} {len(messages) / elapsed:>10.1f} msg/s')
+        finally:
+            controller.stop()
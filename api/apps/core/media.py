@@ -0,0 +1,109 @@
+"""
+Signed URLs for private media.
+
+Media is not public: S3 objects are private in production, and local
+media is served by the protected_media view (apps.core.views) rather than
+straight from MEDIA_ROOT. A serializer that has decided the requester may
+see a file hands out media_url(name). URLs are renewed in windows of
+MEDIA_URL_REFRESH_MARGIN seconds: a URL handed out in one window stays
+valid for at least MEDIA_URL_REFRESH_MARGIN seconds after it ends, so a
+response embedding URLs can be reused until the end of the window it was
+built in (see CachedRetrieveMixin.get_cache_refresh_interval):
+
+- With S3, as in production, it is a presigned URL. Presigned URLs are
+  kept in the default cache and reused until 2 * MEDIA_URL_REFRESH_MARGIN
+  seconds before they expire, so repeated serializations are neither
+  signed again nor given a new URL that browsers would download again.
+- Otherwise it is MEDIA_URL plus an expiry and an HMAC signature of the
+  name, expiring MEDIA_URL_EXPIRY seconds after the window started, so the
+  URL is the same throughout a window. protected_media checks the
+  signature and has nginx send the file (X-Accel-Redirect to
+  MEDIA_ACCEL_REDIRECT_PREFIX). Without a prefix, as in development, it
+  streams the file itself.
+"""
+
+import hashlib
+import logging
+import time
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.utils.crypto import constant_time_compare
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = 'media:url'
+SIGNING_SALT = 'apps.core.media'
+
+
+def is_presigning(storage=default_storage):
+    """
+    Whether ``storage`` produces its own expiring URLs (S3).
+    """
+    return hasattr(storage, 'bucket')
+
+
+def url_key(name):
+    return f'{KEY_PREFIX}:{hashlib.sha256(name.encode()).hexdigest()}'
+
+
+def signature(name, expires):
+    return signing.Signer(salt=SIGNING_SALT).signature(f'{name}:{expires}')
+
+
+def check_signature(name, expires, value):
+    """
+    Whether ``value`` is a current signature of ``name`` from media_url().
+    """
+    try:
+        expires = int(expires)
+    except (TypeError, ValueError):
+        return False
+    return expires > time.time() and constant_time_compare(value or '', signature(name, expires))
+
+
+def signed_local_url(name):
+    margin = settings.MEDIA_URL_REFRESH_MARGIN
+    expires = int(time.time()) // margin * margin + settings.MEDIA_URL_EXPIRY
+    query = urlencode({'expires': expires, 'signature': signature(name, expires)})
+    return f'{default_storage.url(name)}?{query}'
+
+
+def media_urls(names):
+    """
+    Return ``{name: url}`` for the given storage names.
+    """
+    names = [name for name in names if name]
+    if not is_presigning():
+        return {name: signed_local_url(name) for name in names}
+
+    keys = {url_key(name): name for name in names}
+    try:
+        cached = cache.get_many(keys)
+    except Exception:
+        logger.warning('Failed to read cached media URLs', exc_info=True)
+        cached = {}
+    urls = {keys[key]: url for key, url in cached.items()}
+
+    fresh = {}
+    for key, name in keys.items():
+        if name not in urls:
+            urls[name] = fresh[key] = default_storage.url(name, expire=settings.MEDIA_URL_EXPIRY)
+    if fresh:
+        try:
+            cache.set_many(fresh, timeout=settings.MEDIA_URL_EXPIRY - 2 * settings.MEDIA_URL_REFRESH_MARGIN)
+        except Exception:
+            logger.warning('Failed to cache media URLs', exc_info=True)
+    return urls
+
+
+def media_url(name):
+    """
+    Return a URL for the storage name ``name``, or None for no file.
+    """
+    if not name:
+        return None
+    return media_urls([name])[name]
@@ -0,0 +1,147 @@
+"""
+Lightweight application metrics.
+
+Each process keeps counters, gauges and timing summaries in memory and
+publishes a snapshot to Redis at most every METRICS_PUBLISH_INTERVAL
+seconds, under a per-process key that expires when the process stops
+publishing. collect() merges the live snapshots of every gunicorn and
+Celery process, and render_prometheus() formats them for the
+/api/health/metrics/ endpoint.
+"""
+
+import json
+import logging
+import os
+import socket
+import threading
+import time
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = 'metrics'
+
+
+def _redis():
+    from django_redis import get_redis_connection
+
+    return get_redis_connection('default')
+
+
+class Registry:
+    """
+    In-process metric values for one process.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._gauges = {}
+        self._timings = {}
+        self._published_at = 0.0
+        self._key = None
+
+    @property
+    def key(self):
+        if self._key is None:
+            self._key = f'{KEY_PREFIX}:{socket.gethostname()}:{os.getpid()}'
+        return self._key
+
+    def inc(self, name, value=1):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+        self.publish()
+
+    def set_gauge(self, name, value):
+        with self._lock:
+            self._gauges[name] = value
+        self.publish()
+
+    def observe(self, name, seconds):
+        """
+        Record a duration; kept as count, sum and max.
+        """
+        with self._lock:
+            count, total, peak = self._timings.get(name, (0, 0.0, 0.0))
+            self._timings[name] = (count + 1, total + seconds, max(peak, seconds))
+        self.publish()
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'counters': dict(self._counters),
+                'gauges': dict(self._gauges),
+                'timings': {name: list(values) for name, values in self._timings.items()},
+            }
+
+    def publish(self, force=False):
+        """
+        Write this process's snapshot to Redis if the interval has passed.
+        """
+        interval = getattr(settings, 'METRICS_PUBLISH_INTERVAL', 5)
+        now = time.monotonic()
+        if not force and now - self._published_at < interval:
+            return
+        self._published_at = now
+        try:
+            _redis().set(self.key, json.dumps(self.snapshot()), ex=max(int(interval * 3), 15))
+        except Exception:
+            logger.warning('Failed to publish metrics', exc_info=True)
+
+
+registry = Registry()
+os.register_at_fork(after_in_child=registry.reset)
+
+inc = registry.inc
+set_gauge = registry.set_gauge
+observe = registry.observe
+
+
+def collect():
+    """
+    Merge the published snapshots of all live processes: counters and gauges
+    are summed, timings combined.
+    """
+    registry.publish(force=True)
+    merged = {'counters': {}, 'gauges': {}, 'timings': {}, 'processes': 0}
+    client = _redis()
+    keys = list(client.scan_iter(f'{KEY_PREFIX}:*', count=1000))
+    for raw in client.mget(keys) if keys else []:
+        if raw is None:
+            continue
+        snapshot = json.loads(raw)
+        merged['processes'] += 1
+        for kind in ('counters', 'gauges'):
+            for name, value in snapshot[kind].items():
+                merged[kind][name] = merged[kind].get(name, 0) + value
+        for name, (count, total, peak) in snapshot['timings'].items():
+            previous = merged['timings'].get(name, (0, 0.0, 0.0))
+            merged['timings'][name] = (previous[0] + count, previous[1] + total, max(previous[2], peak))
+    return merged
+
+
+def render_prometheus(merged):
+    """
+    Format merged metrics in the Prometheus text exposition format.
+    """
+    lines = [
+        '# TYPE app_processes gauge',
+        f'app_processes {merged["processes"]}',
+    ]
+    for name, value in sorted(merged['counters'].items()):
+        lines += [f'# TYPE {name} counter', f'{name} {value}']
+    for name, value in sorted(merged['gauges'].items()):
+        lines += [f'# TYPE {name} gauge', f'{name} {value}']
+    for name, (count, total, peak) in sorted(merged['timings'].items()):
+        lines += [
+            f'# TYPE {name} summary',
+            f'{name}_count {count}',
+            f'{name}_sum {total:.6f}',
+            f'# TYPE {name}_max gauge',
+            f'{name}_max {peak:.6f}',
+        ]
+    return '\n'.join(lines) + '\n'
@@ -10,6 +10,8 @@ import traceback
 from django.conf import settings
 from django.utils.deprecation import MiddlewareMixin
 
+from apps.core.archive import flush_email_archive
+
 logger = logging.getLogger(__name__)
 
 
@@ -133,4 +135,18 @@ class ExceptionLoggingMiddleware(MiddlewareMixin):
         }
         
         logger.error('Unhandled exception', extra=log_data)
-        return None 
\ No newline at end of file
+        return None 
+
+
+class EmailArchiveMiddleware(MiddlewareMixin):
+    """
+    Middleware that flushes buffered email archive records at the end of
+    each request, so every email sent by a request is visible in the admin.
+    """
+
+    def process_response(self, request, response):
+        """
+        Bulk insert any emails archived while handling the request.
+        """
+        flush_email_archive()
+        return response
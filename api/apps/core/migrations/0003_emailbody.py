@@ -0,0 +1,94 @@
+# Generated by Django 4.2.10 on 2026-10-17 11:40
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+from apps.core.compression import compress_text, text_digest
+
+
+def move_bodies_to_blobs(apps, schema_editor):
+    """
+    Copy every existing body into the content-addressed body table.
+    """
+    Email = apps.get_model("core", "Email")
+    EmailBody = apps.get_model("core", "EmailBody")
+
+    batch = []
+
+    def flush(batch):
+        texts = {email.body for email in batch} | {
+            email.html_body for email in batch if email.html_body is not None
+        }
+        digests = {text: text_digest(text) for text in texts}
+        existing = set(
+            EmailBody.objects.filter(digest__in=digests.values()).values_list("digest", flat=True)
+        )
+        blobs = []
+        for text, digest in digests.items():
+            if digest not in existing:
+                codec, data = compress_text(text)
+                blobs.append(
+                    EmailBody(digest=digest, codec=codec, data=data, size=len(text.encode("utf-8")))
+                )
+        EmailBody.objects.bulk_create(blobs, ignore_conflicts=True)
+        for email in batch:
+            email.body_blob_id = digests[email.body]
+            email.html_body_blob_id = digests.get(email.html_body)
+        Email.objects.bulk_update(batch, ["body_blob", "html_body_blob"])
+
+    for email in Email.objects.only("id", "body", "html_body").iterator(chunk_size=2000):
+        batch.append(email)
+        if len(batch) >= 2000:
+            flush(batch)
+            batch = []
+    if batch:
+        flush(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0002_emailoutbox"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="EmailBody",
+            fields=[
+                ("digest", models.CharField(max_length=64, primary_key=True, serialize=False)),
+                ("codec", models.CharField(max_length=8)),
+                ("data", models.BinaryField()),
+                ("size", models.PositiveIntegerField(help_text="Uncompressed size in bytes")),
+                ("created_at", models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                "verbose_name": "Email Body",
+                "verbose_name_plural": "Email Bodies",
+            },
+        ),
+        migrations.AddField(
+            model_name="email",
+            name="body_blob",
+            field=models.ForeignKey(
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="+",
+                to="core.emailbody",
+            ),
+        ),
+        migrations.AddField(
+            model_name="email",
+            name="html_body_blob",
+            field=models.ForeignKey(
+                blank=True,
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="+",
+                to="core.emailbody",
+            ),
+        ),
+        migrations.RunPython(move_bodies_to_blobs, migrations.RunPython.noop),
+    ]
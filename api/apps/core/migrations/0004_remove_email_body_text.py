@@ -0,0 +1,35 @@
+# Generated by Django 4.2.10 on 2026-10-17 11:41
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    # Kept separate from 0003 so the body rows copied there are committed
+    # before core_email is altered (PostgreSQL refuses to ALTER a table with
+    # pending deferred foreign key checks).
+
+    dependencies = [
+        ("core", "0003_emailbody"),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name="email",
+            name="body",
+        ),
+        migrations.RemoveField(
+            model_name="email",
+            name="html_body",
+        ),
+        migrations.AlterField(
+            model_name="email",
+            name="body_blob",
+            field=models.ForeignKey(
+                editable=False,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="+",
+                to="core.emailbody",
+            ),
+        ),
+    ]
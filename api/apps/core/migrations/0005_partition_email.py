@@ -0,0 +1,85 @@
+# Generated by Django 4.2.10 on 2026-10-17 14:05
+
+from django.conf import settings
+from django.db import migrations, models
+
+from apps.core.partitions import ensure_partitions
+
+
+def partition_email_table(apps, schema_editor):
+    """
+    Rebuild core_email as a table range partitioned by month on created_at.
+
+    PostgreSQL requires the partition key in the primary key, so the table
+    gets PRIMARY KEY (id, created_at); id stays unique through its sequence
+    and Django keeps using it as the model's primary key.
+    """
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT min(created_at) FROM core_email")
+        (oldest,) = cursor.fetchone()
+
+        cursor.execute("ALTER TABLE core_email RENAME TO core_email_legacy")
+        cursor.execute("ALTER SEQUENCE IF EXISTS core_email_id_seq RENAME TO core_email_legacy_id_seq")
+        cursor.execute("CREATE SEQUENCE core_email_id_seq")
+        cursor.execute(
+            """
+            CREATE TABLE core_email (
+                id bigint NOT NULL DEFAULT nextval('core_email_id_seq'),
+                from_email varchar(254) NOT NULL,
+                to_emails text NOT NULL,
+                cc_emails text NOT NULL,
+                bcc_emails text NOT NULL,
+                subject varchar(255) NOT NULL,
+                created_at timestamp with time zone NOT NULL,
+                body_blob_id varchar(64) NOT NULL
+                    REFERENCES core_emailbody (digest) DEFERRABLE INITIALLY DEFERRED,
+                html_body_blob_id varchar(64) NULL
+                    REFERENCES core_emailbody (digest) DEFERRABLE INITIALLY DEFERRED,
+                PRIMARY KEY (id, created_at)
+            ) PARTITION BY RANGE (created_at)
+            """
+        )
+        cursor.execute("ALTER SEQUENCE core_email_id_seq OWNED BY core_email.id")
+        cursor.execute("CREATE INDEX core_email_body_blob_id_idx ON core_email (body_blob_id)")
+        cursor.execute("CREATE INDEX core_email_html_body_blob_id_idx ON core_email (html_body_blob_id)")
+
+        ensure_partitions(
+            "core_email",
+            months_ahead=getattr(settings, "EMAIL_PARTITION_PREMAKE_MONTHS", 3),
+            start=oldest,
+            cursor=cursor,
+        )
+        cursor.execute("CREATE TABLE core_email_default PARTITION OF core_email DEFAULT")
+
+        cursor.execute(
+            """
+            INSERT INTO core_email (id, from_email, to_emails, cc_emails, bcc_emails,
+                                    subject, created_at, body_blob_id, html_body_blob_id)
+            SELECT id, from_email, to_emails, cc_emails, bcc_emails,
+                   subject, created_at, body_blob_id, html_body_blob_id
+            FROM core_email_legacy
+            """
+        )
+        cursor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+        cursor.execute(
+            "SELECT setval('core_email_id_seq', COALESCE((SELECT max(id) FROM core_email), 0) + 1, false)"
+        )
+        cursor.execute("DROP TABLE core_email_legacy")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0004_remove_email_body_text"),
+    ]
+
+    operations = [
+        migrations.RunPython(partition_email_table, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="email",
+            index=models.Index(fields=["-created_at"], name="core_email_created_idx"),
+        ),
+    ]
@@ -0,0 +1,103 @@
+# Generated by Django 4.2.10 on 2026-10-17 16:20
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+from apps.core.compression import decompress_text
+from apps.core.search import update_body_search_vectors
+
+EMAIL_TRIGGER_SQL = """
+CREATE OR REPLACE FUNCTION core_email_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('simple', coalesce(NEW.subject, '')), 'A') ||
+        setweight(to_tsvector('simple', concat_ws(' ', NEW.from_email, NEW.to_emails,
+                                                  NEW.cc_emails, NEW.bcc_emails)), 'B');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER core_email_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF subject, from_email, to_emails, cc_emails, bcc_emails
+    ON core_email
+    FOR EACH ROW EXECUTE FUNCTION core_email_search_vector_update();
+"""
+
+EMAIL_TRIGGER_REVERSE_SQL = """
+DROP TRIGGER IF EXISTS core_email_search_vector_trigger ON core_email;
+DROP FUNCTION IF EXISTS core_email_search_vector_update();
+"""
+
+
+BACKFILL_BATCH_SIZE = 10000
+
+
+def index_existing_emails(apps, schema_editor):
+    """
+    Fire the search vector trigger for existing emails, one id range per
+    statement so that no single UPDATE spans the archive.
+    """
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT min(id), max(id) FROM core_email")
+        low, high = cursor.fetchone()
+        if low is None:
+            return
+        for start in range(low, high + 1, BACKFILL_BATCH_SIZE):
+            cursor.execute(
+                "UPDATE core_email SET subject = subject WHERE id >= %s AND id < %s",
+                [start, start + BACKFILL_BATCH_SIZE],
+            )
+
+
+def index_existing_bodies(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    EmailBody = apps.get_model("core", "EmailBody")
+    batch = []
+    for body in EmailBody.objects.only("digest", "codec", "data").iterator(chunk_size=1000):
+        batch.append((body.digest, decompress_text(body.codec, body.data)))
+        if len(batch) >= 1000:
+            update_body_search_vectors(batch, using=schema_editor.connection)
+            batch = []
+    update_body_search_vectors(batch, using=schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+    # Each operation commits on its own so the backfills don't hold one
+    # long transaction over the whole archive.
+    atomic = False
+
+    dependencies = [
+        ("core", "0005_partition_email"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="email",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name="emailbody",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunSQL(EMAIL_TRIGGER_SQL, EMAIL_TRIGGER_REVERSE_SQL),
+        migrations.RunPython(index_existing_emails, migrations.RunPython.noop),
+        migrations.RunPython(index_existing_bodies, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="email",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search_vector"], name="core_email_search_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="emailbody",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search_vector"], name="core_emailbody_search_idx"
+            ),
+        ),
+    ]
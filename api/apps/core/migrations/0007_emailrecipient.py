@@ -0,0 +1,111 @@
+# Generated by Django 4.2.10 on 2026-10-17 17:10
+
+import django.db.models.deletion
+import django.db.models.functions.text
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+from apps.core.partitions import ensure_partitions
+
+BACKFILL_SQL = """
+INSERT INTO core_emailrecipient (email_id, address, kind, created_at)
+SELECT email.id, btrim(recipient.address), recipient.kind, email.created_at
+FROM core_email AS email
+CROSS JOIN LATERAL (
+    SELECT unnest(string_to_array(email.to_emails, ',')), 'to'
+    UNION ALL
+    SELECT unnest(string_to_array(email.cc_emails, ',')), 'cc'
+    UNION ALL
+    SELECT unnest(string_to_array(email.bcc_emails, ',')), 'bcc'
+) AS recipient(address, kind)
+WHERE btrim(recipient.address) <> ''
+"""
+
+
+def create_recipient_table(apps, schema_editor):
+    """
+    Create core_emailrecipient, range partitioned by month like core_email,
+    and backfill it from the comma-joined address columns.
+    """
+    if schema_editor.connection.vendor != "postgresql":
+        schema_editor.create_model(apps.get_model("core", "EmailRecipient"))
+        return
+
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT min(created_at) FROM core_email")
+        (oldest,) = cursor.fetchone()
+
+        cursor.execute(
+            """
+            CREATE TABLE core_emailrecipient (
+                id bigint GENERATED BY DEFAULT AS IDENTITY,
+                email_id bigint NOT NULL,
+                address varchar(254) NOT NULL,
+                kind varchar(3) NOT NULL,
+                created_at timestamp with time zone NOT NULL,
+                PRIMARY KEY (id, created_at)
+            ) PARTITION BY RANGE (created_at)
+            """
+        )
+        cursor.execute("CREATE INDEX core_emailrecipient_email_id_idx ON core_emailrecipient (email_id)")
+        cursor.execute(
+            "CREATE INDEX core_emailrecipient_addr_idx ON core_emailrecipient (lower(address), created_at)"
+        )
+
+        ensure_partitions(
+            "core_emailrecipient",
+            months_ahead=getattr(settings, "EMAIL_PARTITION_PREMAKE_MONTHS", 3),
+            start=oldest,
+            cursor=cursor,
+        )
+        cursor.execute("CREATE TABLE core_emailrecipient_default PARTITION OF core_emailrecipient DEFAULT")
+        cursor.execute(BACKFILL_SQL)
+
+
+def drop_recipient_table(apps, schema_editor):
+    schema_editor.delete_model(apps.get_model("core", "EmailRecipient"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0006_email_search_vector"),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.CreateModel(
+                    name="EmailRecipient",
+                    fields=[
+                        ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                        ("address", models.CharField(max_length=254)),
+                        ("kind", models.CharField(choices=[("to", "To"), ("cc", "CC"), ("bcc", "BCC")], max_length=3)),
+                        ("created_at", models.DateTimeField(default=django.utils.timezone.now)),
+                        (
+                            "email",
+                            models.ForeignKey(
+                                db_constraint=False,
+                                on_delete=django.db.models.deletion.CASCADE,
+                                related_name="recipients",
+                                to="core.email",
+                            ),
+                        ),
+                    ],
+                    options={
+                        "verbose_name": "Email Recipient",
+                        "verbose_name_plural": "Email Recipients",
+                        "indexes": [
+                            models.Index(
+                                django.db.models.functions.text.Lower("address"),
+                                models.F("created_at"),
+                                name="core_emailrecipient_addr_idx",
+                            )
+                        ],
+                    },
+                ),
+            ],
+        ),
+        migrations.RunPython(create_recipient_table, drop_recipient_table),
+    ]
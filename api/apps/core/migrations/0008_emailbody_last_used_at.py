@@ -0,0 +1,19 @@
+# Generated by Django 4.2.10 on 2026-10-18 09:20
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0007_emailrecipient"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="emailbody",
+            name="last_used_at",
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
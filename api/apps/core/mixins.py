@@ -0,0 +1,95 @@
+"""
+Reusable view mixins.
+"""
+
+import hashlib
+import logging
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+from rest_framework.response import Response
+
+from apps.core.caching import modified_at
+
+logger = logging.getLogger(__name__)
+
+
+class CachedRetrieveMixin:
+    """
+    Conditional, cached GET for retrieve views.
+
+    ETag and Last-Modified come from the object's modification stamp
+    (apps.core.caching), so a client that already holds the current
+    representation gets a 304 without the object being loaded or
+    serialized. Other requests are answered from a cached serialization
+    keyed by the stamp; touching the stamp on save makes it unreachable.
+
+    The object is identified by get_cache_identity(), by default the
+    queryset's model label and the URL lookup value; whatever changes the
+    object has to touch() the same identity. A cache hit skips get_object(),
+    so object-level permissions are only checked on a miss: adopt the mixin
+    where the view's own permissions are enough.
+
+    get_object() is called after the stamp is read and must load the object
+    from the database then, not return one loaded earlier in the request
+    (such as request.user): a save committed in between would otherwise
+    have its old data cached under its new stamp.
+
+    A representation that also changes without a save, such as one
+    embedding expiring media URLs, is versioned by the window of
+    get_cache_refresh_interval() seconds it was built in as well: the ETag
+    and the cached serialization last only until the window ends.
+    """
+    cache_timeout = None
+
+    def get_cache_identity(self):
+        """
+        Return ``(label, key)`` identifying the retrieved object.
+        """
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        return self.get_queryset().model._meta.label_lower, self.kwargs[lookup_url_kwarg]
+
+    def get_cache_refresh_interval(self):
+        """
+        Return how often, in seconds, the representation changes without the
+        object being saved, or None if it never does.
+        """
+        return None
+
+    def retrieve(self, request, *args, **kwargs):
+        label, key = self.get_cache_identity()
+        try:
+            modified = modified_at(label, key)
+        except Exception:
+            logger.warning('Modification stamp unavailable', exc_info=True)
+            return super().retrieve(request, *args, **kwargs)
+
+        version = f'{type(self).__module__}.{type(self).__qualname__}|{request.get_full_path()}|{label}|{key}|{modified!r}'
+        last_modified = int(modified)
+        timeout = self.cache_timeout or settings.RETRIEVE_CACHE_TIMEOUT
+        interval = self.get_cache_refresh_interval()
+        if interval:
+            now = int(time.time())
+            window = now // interval * interval
+            version = f'{version}|{window}'
+            last_modified = max(last_modified, window)
+            timeout = min(timeout, window + interval - now)
+        digest = hashlib.md5(version.encode(), usedforsecurity=False).hexdigest()
+        etag = quote_etag(digest)
+
+        response = get_conditional_response(request._request, etag=etag, last_modified=last_modified)
+        if response is None:
+            cache_key = f'retrieve:{digest}'
+            data = cache.get(cache_key)
+            if data is None:
+                data = self.get_serializer(self.get_object()).data
+                cache.set(cache_key, data, timeout)
+            response = Response(data)
+
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
@@ -3,11 +3,89 @@ Core models for LaunchKit.
 """
 
 import uuid
-from django.db import models
+from datetime import timedelta
+
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
+from django.db import models, transaction
+from django.db.models.fields.files import FieldFile
+from django.db.models import F
+from django.db.models.functions import Lower
 from django.utils import timezone
+from django.utils.functional import cached_property
+
+from apps.core.compression import compress_text, decompress_text, text_digest
+from apps.core.search import search_query, update_body_search_vectors
+
+
+class DirtyFieldsModel(models.Model):
+    """
+    An abstract base class model that tracks which fields changed since the
+    instance was loaded or last saved.
+
+    save() on a tracked instance writes only the changed fields (plus any
+    auto_now fields) and is skipped altogether, signals included, when
+    nothing changed. Inserts, explicit update_fields and instances without a
+    snapshot save as usual. Mutable values changed in place are not
+    detected; reassign them or pass update_fields.
+    """
+    class Meta:
+        abstract = True
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = instance._tracked_values()
+        return instance
+
+    def _tracked_values(self):
+        values = {}
+        for field in self._meta.concrete_fields:
+            if field.attname not in self.__dict__ or getattr(field, 'auto_now', False):
+                continue
+            value = self.__dict__[field.attname]
+            if isinstance(value, FieldFile):
+                # An uncommitted file is a new upload and always dirty.
+                value = value.name if value._committed else object()
+            values[field.attname] = value
+        return values
+
+    def get_dirty_fields(self):
+        """
+        Return the names of the fields changed since the last load or save.
+        """
+        loaded = getattr(self, '_loaded_values', None)
+        current = self._tracked_values()
+        if loaded is None:
+            return [self._meta.get_field(attname).name for attname in current]
+        return [
+            self._meta.get_field(attname).name
+            for attname, value in current.items()
+            if attname not in loaded or loaded[attname] != value
+        ]
+
+    def save(self, force_insert=False, force_update=False, using=None, update_fields=None):
+        loaded = getattr(self, '_loaded_values', None)
+        pk_name = self._meta.pk.attname
+        if (
+            update_fields is None and not force_insert and loaded is not None
+            and not self._state.adding and loaded.get(pk_name) == self.pk
+        ):
+            dirty = self.get_dirty_fields()
+            if not dirty:
+                return
+            update_fields = dirty + [
+                field.name for field in self._meta.concrete_fields if getattr(field, 'auto_now', False)
+            ]
+        super().save(force_insert=force_insert, force_update=force_update, using=using, update_fields=update_fields)
+        current = self._tracked_values()
+        if update_fields is not None and loaded is not None:
+            saved = {self._meta.get_field(name).attname for name in update_fields}
+            current = {**loaded, **{attname: current[attname] for attname in saved if attname in current}}
+        self._loaded_values = current
 
 
-class TimeStampedModel(models.Model):
+class TimeStampedModel(DirtyFieldsModel):
     """
     An abstract base class model that provides self-updating
     created and modified fields.
@@ -19,7 +97,7 @@ class TimeStampedModel(models.Model):
         abstract = True
 
 
-class UUIDModel(models.Model):
+class UUIDModel(DirtyFieldsModel):
     """
     An abstract base class model that uses UUID as primary key.
     """
@@ -37,7 +115,7 @@ class SoftDeleteManager(models.Manager):
         return super().get_queryset().filter(deleted_at__isnull=True)
 
 
-class SoftDeleteModel(models.Model):
+class SoftDeleteModel(DirtyFieldsModel):
     """
     An abstract base class model that provides soft delete functionality.
     """
@@ -64,54 +142,366 @@ class SoftDeleteModel(models.Model):
         return super().delete(using=using, keep_parents=keep_parents)
 
 
+# How stale last_used_at may get before intern_many() refreshes it; well
+# under the day the body sweep waits.
+BODY_REUSE_TOUCH_INTERVAL = timedelta(hours=1)
+
+
+class EmailBodyManager(models.Manager):
+    """
+    Manager that stores texts in the content-addressed body table.
+    """
+
+    def intern_many(self, texts):
+        """
+        Store each distinct text once and return a mapping of text to digest.
+        """
+        digests = {text: text_digest(text) for text in set(texts) if text is not None}
+        if not digests:
+            return {}
+        # Mark reused bodies before looking them up: the unreferenced body
+        # sweep (maintain_email_partitions) spares bodies used within the
+        # last day, so a body found here survives until the emails about to
+        # reference it are committed.
+        now = timezone.now()
+        self.filter(
+            digest__in=digests.values(), last_used_at__lt=now - BODY_REUSE_TOUCH_INTERVAL,
+        ).update(last_used_at=now)
+        existing = set(
+            self.filter(digest__in=digests.values()).values_list('digest', flat=True)
+        )
+        blobs = []
+        for text, digest in digests.items():
+            if digest in existing:
+                continue
+            codec, data = compress_text(text)
+            blobs.append(self.model(digest=digest, codec=codec, data=data, size=len(text.encode('utf-8'))))
+        if blobs:
+            self.bulk_create(blobs, ignore_conflicts=True)
+            update_body_search_vectors(
+                [(digest, text) for text, digest in digests.items() if digest not in existing]
+            )
+        return digests
+
+
+class EmailBody(models.Model):
+    """
+    Compressed email body stored once per distinct content (SHA-256 keyed).
+    """
+    digest = models.CharField(max_length=64, primary_key=True)
+    codec = models.CharField(max_length=8)
+    data = models.BinaryField()
+    size = models.PositiveIntegerField(help_text='Uncompressed size in bytes')
+    search_vector = SearchVectorField(null=True, editable=False)
+    created_at = models.DateTimeField(default=timezone.now)
+    last_used_at = models.DateTimeField(default=timezone.now)
+
+    objects = EmailBodyManager()
+
+    class Meta:
+        verbose_name = 'Email Body'
+        verbose_name_plural = 'Email Bodies'
+        indexes = [
+            GinIndex(fields=['search_vector'], name='core_emailbody_search_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.digest[:12]} ({self.size} bytes, {self.codec})'
+
+    @cached_property
+    def text(self):
+        """
+        The decompressed body text.
+        """
+        return decompress_text(self.codec, self.data)
+
+
+class EmailQuerySet(models.QuerySet):
+    """
+    QuerySet for archived emails.
+    """
+
+    def bulk_create(self, objs, *args, **kwargs):
+        """
+        Store email bodies in the body table before inserting, and insert
+        the emails and their recipient rows in one transaction.
+        """
+        objs = list(objs)
+        Email.intern_bodies(objs)
+        with transaction.atomic(using=self.db):
+            created = super().bulk_create(objs, *args, **kwargs)
+            EmailRecipient.objects.using(self.db).bulk_create(
+                [recipient for email in created if email.pk for recipient in email.build_recipients()],
+                batch_size=1000,
+            )
+        return created
+
+    def search(self, term):
+        """
+        Full-text search over subject, addresses and bodies.
+
+        The matches are a UNION of three separately indexed lookups; ORing
+        the conditions would keep PostgreSQL from using the GIN indexes.
+        """
+        query = search_query(term)
+        emails = Email.objects.order_by()
+        matching_bodies = EmailBody.objects.filter(search_vector=query).values('digest')
+        matches = emails.filter(search_vector=query).values('pk').union(
+            emails.filter(body_blob__in=matching_bodies).values('pk'),
+            emails.filter(html_body_blob__in=matching_bodies).values('pk'),
+        )
+        return self.filter(pk__in=matches)
+
+    def sent_to(self, address, since=None, until=None):
+        """
+        Emails with ``address`` among their recipients (case-insensitive),
+        optionally limited to ``since <= created_at < until``.
+
+        Uses the lower(address) index on EmailRecipient; the time bounds are
+        applied to both tables so PostgreSQL can skip whole partitions.
+        """
+        recipients = EmailRecipient.objects.alias(address_lower=Lower('address')).filter(
+            address_lower=address.strip().lower(),
+        )
+        emails = self
+        if since is not None:
+            recipients = recipients.filter(created_at__gte=since)
+            emails = emails.filter(created_at__gte=since)
+        if until is not None:
+            recipients = recipients.filter(created_at__lt=until)
+            emails = emails.filter(created_at__lt=until)
+        return emails.filter(pk__in=recipients.values('email_id'))
+
+
+_UNSET = object()
+
+
 class Email(models.Model):
     """
     Model to store emails sent during development.
+
+    Bodies live in EmailBody and are shared between emails with identical
+    content; ``body`` and ``html_body`` decompress them lazily on access.
+
+    On PostgreSQL the table is range partitioned by month on created_at
+    (see apps.core.partitions); old months are pruned by the
+    maintain_email_partitions task. search_vector is kept up to date by a
+    database trigger (see apps.core.search).
     """
     from_email = models.EmailField()
     to_emails = models.TextField()
     cc_emails = models.TextField(blank=True)
     bcc_emails = models.TextField(blank=True)
     subject = models.CharField(max_length=255)
-    body = models.TextField()
-    html_body = models.TextField(null=True, blank=True)
+    body_blob = models.ForeignKey(
+        EmailBody, on_delete=models.PROTECT, related_name='+', editable=False,
+    )
+    html_body_blob = models.ForeignKey(
+        EmailBody, on_delete=models.PROTECT, related_name='+', editable=False,
+        null=True, blank=True,
+    )
     created_at = models.DateTimeField(default=timezone.now)
-    
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    objects = EmailQuerySet.as_manager()
+
     class Meta:
         ordering = ['-created_at']
         verbose_name = 'Email'
         verbose_name_plural = 'Emails'
-    
+        indexes = [
+            models.Index(fields=['-created_at'], name='core_email_created_idx'),
+            GinIndex(fields=['search_vector'], name='core_email_search_idx'),
+        ]
+
     def __str__(self):
         return f'{self.subject} - To: {self.get_recipients_display()} ({self.created_at:%Y-%m-%d %H:%M})'
-    
+
+    @property
+    def body(self):
+        """
+        The plain text body, decompressed on first access.
+        """
+        text = getattr(self, '_body_text', _UNSET)
+        if text is _UNSET:
+            text = self.body_blob.text if self.body_blob_id else ''
+            self._body_text = text
+        return text
+
+    @body.setter
+    def body(self, value):
+        self._body_text = value
+        self.body_blob_id = None
+
+    @property
+    def html_body(self):
+        """
+        The HTML body, decompressed on first access.
+        """
+        text = getattr(self, '_html_body_text', _UNSET)
+        if text is _UNSET:
+            text = self.html_body_blob.text if self.html_body_blob_id else None
+            self._html_body_text = text
+        return text
+
+    @html_body.setter
+    def html_body(self, value):
+        self._html_body_text = value
+        self.html_body_blob_id = None
+
+    @classmethod
+    def intern_bodies(cls, emails):
+        """
+        Point emails whose bodies were assigned in memory at their stored blobs.
+        """
+        pending = [email for email in emails if email.body_blob_id is None or (
+            email.html_body_blob_id is None and email.html_body is not None
+        )]
+        if not pending:
+            return
+        digests = EmailBody.objects.intern_many(
+            [email.body for email in pending] + [email.html_body for email in pending]
+        )
+        for email in pending:
+            email.body_blob_id = digests[email.body]
+            email.html_body_blob_id = digests.get(email.html_body)
+
+    def save(self, *args, **kwargs):
+        Email.intern_bodies([self])
+        if not self._state.adding:
+            super().save(*args, **kwargs)
+            return
+        # An email is never visible without its recipient rows.
+        with transaction.atomic(using=kwargs.get('using')):
+            super().save(*args, **kwargs)
+            EmailRecipient.objects.using(self._state.db).bulk_create(self.build_recipients())
+
+    def build_recipients(self):
+        """
+        Build the normalized EmailRecipient rows for this email.
+        """
+        return [
+            EmailRecipient(email_id=self.pk, address=address, kind=kind, created_at=self.created_at)
+            for kind, value in (
+                (EmailRecipient.KIND_TO, self.to_emails),
+                (EmailRecipient.KIND_CC, self.cc_emails),
+                (EmailRecipient.KIND_BCC, self.bcc_emails),
+            )
+            for address in split_addresses(value)
+        ]
+
     def get_recipients_display(self, max_length=50):
         """
         Get a formatted string of recipients, truncated if too long.
         """
-        recipients = self.to_emails.split(',')[0].strip()
-        more = len(self.to_emails.split(',')) - 1
+        addresses = split_addresses(self.to_emails)
+        recipients = addresses[0] if addresses else ''
+        more = len(addresses) - 1
         if more > 0:
             recipients += f' and {more} more'
         if len(recipients) > max_length:
             recipients = recipients[:max_length-3] + '...'
         return recipients
-    
+
     def get_all_recipients(self):
         """
         Get a list of all recipients (To, CC, and BCC).
         """
-        recipients = []
-        if self.to_emails:
-            recipients.extend(email.strip() for email in self.to_emails.split(','))
-        if self.cc_emails:
-            recipients.extend(email.strip() for email in self.cc_emails.split(','))
-        if self.bcc_emails:
-            recipients.extend(email.strip() for email in self.bcc_emails.split(','))
-        return list(filter(None, recipients))
-    
+        return [
+            *split_addresses(self.to_emails),
+            *split_addresses(self.cc_emails),
+            *split_addresses(self.bcc_emails),
+        ]
+
     def has_html_content(self):
         """
         Check if the email has HTML content.
         """
-        return bool(self.html_body and self.html_body.strip()) 
\ No newline at end of file
+        return bool(self.html_body and self.html_body.strip())
+
+
+def split_addresses(value):
+    """
+    Split a comma-joined address list, dropping blanks.
+    """
+    if not value:
+        return ()
+    return tuple(filter(None, (address.strip() for address in value.split(','))))
+
+
+class EmailRecipient(models.Model):
+    """
+    One row per recipient address of an archived email, for address lookups.
+
+    On PostgreSQL the table is partitioned by month on created_at (a copy of
+    Email.created_at) like the Email table and pruned with it, so the email
+    reference is not enforced by a database constraint.
+    """
+    KIND_TO = 'to'
+    KIND_CC = 'cc'
+    KIND_BCC = 'bcc'
+    KIND_CHOICES = (
+        (KIND_TO, 'To'),
+        (KIND_CC, 'CC'),
+        (KIND_BCC, 'BCC'),
+    )
+
+    email = models.ForeignKey(
+        Email, on_delete=models.CASCADE, db_constraint=False, related_name='recipients',
+    )
+    address = models.CharField(max_length=254)
+    kind = models.CharField(max_length=3, choices=KIND_CHOICES)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        verbose_name = 'Email Recipient'
+        verbose_name_plural = 'Email Recipients'
+        indexes = [
+            models.Index(Lower('address'), F('created_at'), name='core_emailrecipient_addr_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.kind}: {self.address}'
+
+
+class EmailOutbox(models.Model):
+    """
+    Model to queue emails for asynchronous delivery by the outbox dispatcher.
+    """
+    STATUS_PENDING = 'pending'
+    STATUS_SENT = 'sent'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = (
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_SENT, 'Sent'),
+        (STATUS_FAILED, 'Failed'),
+    )
+
+    from_email = models.EmailField()
+    to_emails = models.JSONField(default=list)
+    cc_emails = models.JSONField(default=list, blank=True)
+    bcc_emails = models.JSONField(default=list, blank=True)
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    html_body = models.TextField(null=True, blank=True)
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    available_at = models.DateTimeField(default=timezone.now)
+    created_at = models.DateTimeField(default=timezone.now)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['created_at']
+        verbose_name = 'Outbox Email'
+        verbose_name_plural = 'Outbox Emails'
+        indexes = [
+            models.Index(
+                fields=['available_at'],
+                name='core_outbox_pending_idx',
+                condition=models.Q(status='pending'),
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.subject} [{self.status}] ({self.created_at:%Y-%m-%d %H:%M})'
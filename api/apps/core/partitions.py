@@ -0,0 +1,156 @@
+"""
+Monthly range partition management for PostgreSQL tables.
+
+Partitioned tables are split on a timestamp column into one partition per
+calendar month named ``<table>_pYYYY_MM``, plus a ``<table>_default``
+partition that catches rows outside the premade range (moved into their
+month's partition when it is created). Retention then
+becomes a matter of detaching or dropping whole partitions instead of
+running large DELETEs.
+"""
+
+import logging
+import re
+from datetime import datetime, timezone as dt_timezone
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+PARTITION_SUFFIX = re.compile(r'_p(\d{4})_(\d{2})$')
+# Partitioned tables are all partitioned on this column.
+PARTITION_KEY = 'created_at'
+
+
+def month_start(value):
+    """
+    Return midnight UTC on the first day of the month containing value.
+    """
+    value = value.astimezone(dt_timezone.utc) if timezone.is_aware(value) else value
+    return datetime(value.year, value.month, 1, tzinfo=dt_timezone.utc)
+
+
+def add_months(month, count):
+    """
+    Return the first day of the month ``count`` months after ``month``.
+    """
+    index = month.year * 12 + month.month - 1 + count
+    return month.replace(year=index // 12, month=index % 12 + 1)
+
+
+def partition_name(table, month):
+    return f'{table}_p{month:%Y_%m}'
+
+
+def list_partitions(table, cursor=None):
+    """
+    Return a mapping of month to partition name for a partitioned table.
+    """
+    def query(cursor):
+        cursor.execute(
+            """
+            SELECT child.relname
+            FROM pg_inherits
+            JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+            JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+            WHERE parent.relname = %s
+            """,
+            [table],
+        )
+        partitions = {}
+        for (name,) in cursor.fetchall():
+            match = PARTITION_SUFFIX.search(name)
+            if match:
+                month = datetime(int(match.group(1)), int(match.group(2)), 1, tzinfo=dt_timezone.utc)
+                partitions[month] = name
+        return partitions
+
+    if cursor is not None:
+        return query(cursor)
+    with connection.cursor() as cursor:
+        return query(cursor)
+
+
+def default_partition_name(table):
+    return f'{table}_default'
+
+
+def create_partition(cursor, table, month):
+    """
+    Create the partition of ``table`` covering ``month`` if it is missing.
+
+    PostgreSQL refuses to create a partition for a range the default
+    partition holds rows for, so such rows are moved into the new partition
+    while the default partition is detached.
+    """
+    name = partition_name(table, month)
+    default = default_partition_name(table)
+    start, end = month.isoformat(), add_months(month, 1).isoformat()
+    bounds = f"FOR VALUES FROM ('{start}') TO ('{end}')"
+
+    cursor.execute('SELECT to_regclass(%s) IS NOT NULL, to_regclass(%s) IS NOT NULL', [f'"{name}"', f'"{default}"'])
+    exists, has_default = cursor.fetchone()
+    if exists:
+        return name
+    in_range = f'"{PARTITION_KEY}" >= %s AND "{PARTITION_KEY}" < %s'
+    stranded = False
+    if has_default:
+        cursor.execute(f'SELECT EXISTS (SELECT 1 FROM "{default}" WHERE {in_range})', [start, end])
+        (stranded,) = cursor.fetchone()
+    if not stranded:
+        cursor.execute(f'CREATE TABLE IF NOT EXISTS "{name}" PARTITION OF "{table}" {bounds}')
+        return name
+
+    with transaction.atomic(using=cursor.db.alias):
+        cursor.execute(f'ALTER TABLE "{table}" DETACH PARTITION "{default}"')
+        cursor.execute(f'CREATE TABLE "{name}" PARTITION OF "{table}" {bounds}')
+        cursor.execute(f'INSERT INTO "{name}" SELECT * FROM "{default}" WHERE {in_range}', [start, end])
+        moved = cursor.rowcount
+        cursor.execute(f'DELETE FROM "{default}" WHERE {in_range}', [start, end])
+        cursor.execute(f'ALTER TABLE "{table}" ATTACH PARTITION "{default}" DEFAULT')
+    logger.info('Moved default partition rows', extra={'table': table, 'partition': name, 'rows': moved})
+    return name
+
+
+def ensure_partitions(table, months_ahead, start=None, cursor=None):
+    """
+    Create monthly partitions from ``start`` (default: this month) through
+    ``months_ahead`` months from now.
+    """
+    first = month_start(start or timezone.now())
+    last = add_months(month_start(timezone.now()), months_ahead)
+
+    def create(cursor):
+        created = []
+        month = first
+        while month <= last:
+            created.append(create_partition(cursor, table, month))
+            month = add_months(month, 1)
+        return created
+
+    if cursor is not None:
+        return create(cursor)
+    with connection.cursor() as cursor:
+        return create(cursor)
+
+
+def prune_partitions(table, retention_months, detach_only=False):
+    """
+    Detach or drop partitions whose whole month lies outside the retention
+    period. Returns the names of the partitions removed.
+    """
+    if not retention_months:
+        return []
+    cutoff = add_months(month_start(timezone.now()), -retention_months)
+    removed = []
+    with connection.cursor() as cursor:
+        for month, name in sorted(list_partitions(table, cursor).items()):
+            if add_months(month, 1) > cutoff:
+                continue
+            cursor.execute(f'ALTER TABLE "{table}" DETACH PARTITION "{name}"')
+            if not detach_only:
+                cursor.execute(f'DROP TABLE "{name}"')
+            removed.append(name)
+            logger.info('Pruned partition', extra={'table': table, 'partition': name, 'dropped': not detach_only})
+    return removed
@@ -0,0 +1,224 @@
+"""
+Email template rendering.
+
+Email templates are compiled once per process: EmailTemplateLoader sits in
+front of the filesystem loader inside Django's cached loader, and
+precompile_email_templates() (called from CoreConfig.ready) loads every
+template under templates/email/ at startup so the first send does not pay
+for parsing.
+
+While loading, HTML email templates are prepared for mail clients that
+ignore <style> blocks: the rules in ``<style data-inline>`` blocks of
+email/base_email.html are inlined into matching tags of every email
+template, and indentation whitespace and comments are stripped. This runs
+once per template per process instead of on every render.
+"""
+
+import logging
+import re
+from pathlib import Path
+
+from django.template import Context, engines
+from django.template.loaders.filesystem import Loader as FilesystemLoader
+
+logger = logging.getLogger(__name__)
+
+EMAIL_TEMPLATE_PREFIX = 'email/'
+EMAIL_STYLESHEET_TEMPLATE = 'email/base_email.html'
+
+INLINE_STYLE_BLOCK = re.compile(r'<style[^>]*\bdata-inline\b[^>]*>(.*?)</style>\s*', re.S | re.I)
+CSS_RULE = re.compile(r'([^{}]+)\{([^{}]*)\}')
+CSS_COMMENT = re.compile(r'/\*.*?\*/', re.S)
+START_TAG = re.compile(r'<([a-zA-Z][a-zA-Z0-9]*)\b([^<>]*?)(/?)>')
+ATTRIBUTE = re.compile(r'\b(class|style)\s*=\s*"([^"]*)"', re.I)
+HTML_COMMENT = re.compile(r'<!--(?!\[if).*?-->', re.S)
+INDENTATION = re.compile(r'(>|%})\s*\n\s*(<|{%)')
+WHITESPACE = re.compile(r'\s+')
+
+
+def parse_stylesheet(css):
+    """
+    Parse simple CSS into ``[(tag, class, declarations)]``.
+
+    Only ``tag``, ``.class`` and ``tag.class`` selectors can be inlined;
+    anything else (pseudo-classes, descendants, @-rules) is skipped.
+    """
+    rules = []
+    for selectors, body in CSS_RULE.findall(CSS_COMMENT.sub('', css)):
+        declarations = minify_declarations(body)
+        for selector in selectors.split(','):
+            match = re.fullmatch(r'\s*([a-zA-Z0-9]*)(?:\.([\w-]+))?\s*', selector)
+            if match and any(match.groups()) and declarations:
+                rules.append((match.group(1).lower() or None, match.group(2), declarations))
+    return rules
+
+
+def parse_declarations(css):
+    """
+    Parse a declaration list into an ordered ``{property: value}`` dict;
+    later declarations of a property replace earlier ones.
+    """
+    declarations = {}
+    for declaration in css.split(';'):
+        prop, _, value = declaration.partition(':')
+        if prop.strip() and value.strip():
+            declarations[prop.strip().lower()] = WHITESPACE.sub(' ', value.strip())
+    return declarations
+
+
+def minify_declarations(css):
+    """
+    Collapse a declaration list to ``prop:value;prop:value``.
+    """
+    return ';'.join(f'{prop}:{value}' for prop, value in parse_declarations(css).items())
+
+
+def inline_styles(html, rules):
+    """
+    Prepend matching rule declarations to each start tag's style attribute,
+    so existing inline styles still win.
+    """
+    if not rules:
+        return html
+
+    def replace(match):
+        tag, attrs, closing = match.group(1).lower(), match.group(2), match.group(3)
+        found = dict((name.lower(), value) for name, value in ATTRIBUTE.findall(attrs))
+        classes = set(found.get('class', '').split())
+        inherited = [
+            declarations for rule_tag, rule_class, declarations in rules
+            if (rule_tag is None or rule_tag == tag) and (rule_class is None or rule_class in classes)
+        ]
+        if not inherited:
+            return match.group(0)
+        style = minify_declarations(';'.join(inherited + [found.get('style', '')]))
+        if 'style' in found:
+            attrs = re.sub(r'\bstyle\s*=\s*"[^"]*"', lambda _: f'style="{style}"', attrs, count=1, flags=re.I)
+        else:
+            attrs = f'{attrs} style="{style}"'
+        return f'<{match.group(1)}{attrs}{closing}>'
+
+    return START_TAG.sub(replace, html)
+
+
+def minify_html(html):
+    """
+    Strip comments and indentation between tags and tidy style attributes.
+    """
+    html = HTML_COMMENT.sub('', html)
+    html = INDENTATION.sub(r'\1\2', html)
+    html = re.sub(
+        r'\bstyle\s*=\s*"([^"]*)"',
+        lambda match: f'style="{minify_declarations(match.group(1))}"',
+        html,
+        flags=re.I,
+    )
+    return html.strip()
+
+
+def prepare_email_html(source, stylesheet=''):
+    """
+    Inline the ``data-inline`` CSS of ``source`` and ``stylesheet`` and
+    minify the result.
+    """
+    css = stylesheet + ''.join(INLINE_STYLE_BLOCK.findall(source))
+    source = INLINE_STYLE_BLOCK.sub('', source)
+    return minify_html(inline_styles(source, parse_stylesheet(css)))
+
+
+class EmailTemplateLoader(FilesystemLoader):
+    """
+    Filesystem loader for ``email/`` templates that inlines and minifies
+    the CSS of HTML templates as they are loaded. Wrap it in the cached
+    loader so this happens once per template per process.
+    """
+
+    def __init__(self, engine, dirs=None):
+        super().__init__(engine, dirs)
+        self._stylesheet = None
+
+    def get_template_sources(self, template_name):
+        if template_name.startswith(EMAIL_TEMPLATE_PREFIX):
+            yield from super().get_template_sources(template_name)
+
+    def get_contents(self, origin):
+        contents = super().get_contents(origin)
+        if not origin.template_name.endswith('.html'):
+            return contents
+        if origin.template_name == EMAIL_STYLESHEET_TEMPLATE:
+            return prepare_email_html(contents)
+        return prepare_email_html(contents, self.stylesheet())
+
+    def stylesheet(self):
+        """
+        Return the ``data-inline`` CSS of the base email template.
+        """
+        if self._stylesheet is None:
+            self._stylesheet = ''
+            for origin in super().get_template_sources(EMAIL_STYLESHEET_TEMPLATE):
+                try:
+                    source = super().get_contents(origin)
+                except Exception:
+                    continue
+                self._stylesheet = ''.join(INLINE_STYLE_BLOCK.findall(source))
+                break
+        return self._stylesheet
+
+
+def email_template_names():
+    """
+    List the templates under ``email/`` in the project template directories.
+    """
+    names = set()
+    for directory in map(Path, engines['django'].engine.dirs):
+        root = directory / EMAIL_TEMPLATE_PREFIX
+        if not root.is_dir():
+            continue
+        for path in root.rglob('*'):
+            if path.is_file() and path.suffix in ('.html', '.txt'):
+                names.add(path.relative_to(directory).as_posix())
+    return sorted(names)
+
+
+def precompile_email_templates():
+    """
+    Load and compile every email template into the cached loader.
+    """
+    engine = engines['django']
+    compiled = []
+    for name in email_template_names():
+        try:
+            engine.get_template(name)
+        except Exception:
+            logger.exception('Failed to precompile email template', extra={'template': name})
+        else:
+            compiled.append(name)
+    return compiled
+
+
+def render_many(template_name, contexts):
+    """
+    Render one template for many contexts (e.g. a fan-out send).
+
+    The template is looked up once and rendered against a single Context
+    whose per-item values are pushed and popped, which avoids building a
+    new context for each message.
+    """
+    template = engines['django'].get_template(template_name).template
+    context = Context(autoescape=template.engine.autoescape)
+    rendered = []
+    for values in contexts:
+        with context.push(values):
+            rendered.append(template.render(context))
+    return rendered
+
+
+def render_email(template_name, context):
+    """
+    Render the ``.txt`` and ``.html`` parts of an email template.
+
+    Returns ``(text, html)``; ``template_name`` omits the extension.
+    """
+    (text,) = render_many(f'{template_name}.txt', [context])
+    (html,) = render_many(f'{template_name}.html', [context])
+    return text, html
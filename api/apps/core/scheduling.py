@@ -0,0 +1,137 @@
+"""
+Per-destination-domain rate shaping for outgoing email.
+
+Every recipient domain gets a token bucket in Redis refilled at
+EMAIL_DOMAIN_RATE tokens per second (or the per-domain override in
+EMAIL_DOMAIN_RATES) up to EMAIL_DOMAIN_BURST tokens; one token is one
+recipient. The bucket lives in Redis so all workers share the same budget,
+and is updated by a Lua script using the Redis clock so a take is a single
+atomic round trip.
+
+Callers take as many tokens as they have recipients; what is not granted
+comes back with the delay until the bucket can cover it, so the caller can
+re-queue those recipients with an ETA instead of failing and retrying.
+"""
+
+import logging
+from collections import OrderedDict
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+BUCKET_KEY = 'email-domain-bucket:{}'
+
+# KEYS[1] bucket hash; ARGV rate (tokens/s), burst, requested, penalty (s).
+# Returns {granted, wait in ms until the rest (up to burst) is available}.
+TAKE_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local requested = tonumber(ARGV[3])
+local penalty = tonumber(ARGV[4])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) * 1000 + math.floor(tonumber(clock[2]) / 1000)
+
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1])
+local ts = tonumber(state[2])
+if tokens == nil then
+    tokens = burst
+    ts = now
+end
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate / 1000)
+if penalty > 0 then
+    tokens = math.min(tokens, 0) - penalty * rate
+end
+
+local granted = math.max(0, math.min(requested, math.floor(tokens)))
+tokens = tokens - granted
+
+local wait = 0
+local remaining = math.min(requested - granted, burst)
+if remaining > 0 then
+    wait = math.ceil((remaining - tokens) * 1000 / rate)
+end
+
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(burst * 1000 / rate) + wait + 1000)
+return {granted, wait}
+"""
+
+_take_script = None
+
+
+def _redis():
+    from django_redis import get_redis_connection
+
+    return get_redis_connection('default')
+
+
+def recipient_domain(address):
+    """
+    Return the lowercased domain of an email address.
+    """
+    return address.rpartition('@')[2].strip().lower()
+
+
+def group_by_domain(recipients):
+    """
+    Group recipient addresses by domain, keeping first-seen order.
+    """
+    groups = OrderedDict()
+    for address in recipients:
+        groups.setdefault(recipient_domain(address), []).append(address)
+    return groups
+
+
+def domain_rate(domain):
+    """
+    Return the ``(rate, burst)`` allowed for a domain.
+    """
+    rates = getattr(settings, 'EMAIL_DOMAIN_RATES', {})
+    return float(rates.get(domain, settings.EMAIL_DOMAIN_RATE)), settings.EMAIL_DOMAIN_BURST
+
+
+def take(domain, count, penalty=0):
+    """
+    Take up to ``count`` tokens from a domain's bucket.
+
+    ``penalty`` (seconds) empties the bucket and pushes its refill back, for
+    when the provider itself deferred us. Returns ``(granted, wait)`` where
+    ``wait`` is the number of seconds until the remainder can be sent. If
+    Redis is unavailable the send is let through rather than stalled.
+    """
+    global _take_script
+
+    rate, burst = domain_rate(domain)
+    if rate <= 0:
+        return count, 0.0
+    try:
+        client = _redis()
+        if _take_script is None:
+            _take_script = client.register_script(TAKE_SCRIPT)
+        granted, wait_ms = _take_script(
+            keys=[BUCKET_KEY.format(domain)], args=[rate, burst, count, penalty], client=client,
+        )
+    except Exception:
+        logger.warning('Email domain rate limiter unavailable', exc_info=True, extra={'domain': domain})
+        return count, 0.0
+    return int(granted), int(wait_ms) / 1000
+
+
+def schedule(recipients):
+    """
+    Split recipients into those that may be sent now and deferred batches.
+
+    Returns ``(ready, deferred)``: ``ready`` maps domain to the addresses
+    that fit its bucket now, ``deferred`` is a list of ``(delay, addresses)``
+    for the rest, one entry per domain.
+    """
+    ready, deferred = OrderedDict(), []
+    for domain, addresses in group_by_domain(recipients).items():
+        granted, wait = take(domain, len(addresses))
+        if granted:
+            ready[domain] = addresses[:granted]
+        if granted < len(addresses):
+            deferred.append((wait, addresses[granted:]))
+    return ready, deferred
@@ -0,0 +1,52 @@
+"""
+Full-text search helpers for the email archive.
+
+Email.search_vector covers the subject and addresses and is maintained by a
+database trigger. Bodies are stored compressed, so EmailBody.search_vector
+is computed in Python when a blob is first stored; content addressing means
+each distinct body is indexed only once.
+"""
+
+from django.contrib.postgres.search import SearchQuery
+from django.db import connection
+from django.utils.html import strip_tags
+
+
+# Text search configuration; must match the core_email trigger. 'simple'
+# keeps addresses and names intact instead of stemming them.
+SEARCH_CONFIG = 'simple'
+
+
+def search_query(term):
+    """
+    Build a web-search style query (quotes, OR, -exclusions) for a term.
+    """
+    return SearchQuery(term, search_type='websearch', config=SEARCH_CONFIG)
+
+
+def body_search_text(text):
+    """
+    Return the text to index for a body, without HTML markup.
+    """
+    return strip_tags(text) if '<' in text else text
+
+
+def update_body_search_vectors(pairs, using=None):
+    """
+    Set EmailBody.search_vector for ``(digest, text)`` pairs in one statement.
+    """
+    conn = connection if using is None else using
+    if conn.vendor != 'postgresql' or not pairs:
+        return
+    digests = [digest for digest, _ in pairs]
+    texts = [body_search_text(text) for _, text in pairs]
+    with conn.cursor() as cursor:
+        cursor.execute(
+            """
+            UPDATE core_emailbody AS body
+            SET search_vector = to_tsvector(%s::regconfig, source.text)
+            FROM unnest(%s::varchar[], %s::text[]) AS source(digest, text)
+            WHERE body.digest = source.digest
+            """,
+            [SEARCH_CONFIG, digests, texts],
+        )
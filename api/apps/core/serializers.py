@@ -0,0 +1,32 @@
+"""
+Serializers for the core app.
+"""
+
+from rest_framework import serializers
+
+from apps.core.models import Email
+
+
+class EmailSummarySerializer(serializers.ModelSerializer):
+    """
+    Serializer for archived emails in support search results (no bodies).
+    """
+    class Meta:
+        model = Email
+        fields = ('id', 'subject', 'from_email', 'to_emails', 'cc_emails', 'bcc_emails', 'created_at')
+        read_only_fields = fields
+
+
+class EmailRecipientLookupSerializer(serializers.Serializer):
+    """
+    Query parameters for looking up emails sent to one address.
+    """
+    address = serializers.EmailField()
+    since = serializers.DateTimeField(required=False)
+    until = serializers.DateTimeField(required=False)
+
+    def validate(self, attrs):
+        since, until = attrs.get('since'), attrs.get('until')
+        if since and until and since >= until:
+            raise serializers.ValidationError({'until': 'Must be later than since.'})
+        return attrs
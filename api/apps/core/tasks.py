@@ -0,0 +1,163 @@
+"""
+Celery tasks for the core app.
+"""
+
+import logging
+from datetime import timedelta
+
+from celery import shared_task
+from celery.signals import task_postrun, worker_process_shutdown
+from django.conf import settings
+from django.core.mail import get_connection
+from django.db import connection, transaction
+from django.utils import timezone
+
+from apps.core.archive import flush_email_archive, recover_spilled_emails
+from apps.core.mail import deliver_email
+from apps.core.models import EmailOutbox
+from apps.core.partitions import ensure_partitions, prune_partitions
+
+logger = logging.getLogger(__name__)
+
+
+@task_postrun.connect
+def flush_email_archive_after_task(**kwargs):
+    """
+    Write emails archived by a task once the task has finished.
+    """
+    flush_email_archive()
+
+
+@worker_process_shutdown.connect
+def flush_email_archive_on_shutdown(**kwargs):
+    flush_email_archive()
+
+
+@shared_task(queue='emails', ignore_result=True)
+def dispatch_email_outbox(batch_size=None):
+    """
+    Deliver pending outbox emails.
+
+    Rows are claimed in batches with SELECT ... FOR UPDATE SKIP LOCKED so
+    several workers can drain the outbox concurrently without sending the
+    same email twice. One backend connection is reused for the whole run.
+    """
+    batch_size = batch_size or settings.EMAIL_OUTBOX_BATCH_SIZE
+    delivered = 0
+
+    with get_connection() as mail_connection:
+        while True:
+            batch = _claim_outbox_batch(batch_size)
+            if not batch:
+                break
+
+            for item in batch:
+                if _deliver_outbox_item(item, mail_connection):
+                    delivered += 1
+                # Committed on its own right after the send, so nothing that
+                # fails later can roll back the record of a sent email.
+                item.save(update_fields=['status', 'attempts', 'last_error', 'available_at', 'sent_at'])
+
+    return delivered
+
+
+def _claim_outbox_batch(batch_size):
+    """
+    Lease a batch of due outbox rows to this worker.
+
+    The rows are locked only while their available_at is pushed
+    EMAIL_OUTBOX_LEASE seconds ahead, so emails are sent outside any
+    transaction; rows of a worker that dies mid-batch become due again when
+    the lease runs out.
+    """
+    with transaction.atomic():
+        batch = list(
+            EmailOutbox.objects
+            .select_for_update(skip_locked=True)
+            .filter(
+                status=EmailOutbox.STATUS_PENDING,
+                available_at__lte=timezone.now(),
+            )
+            .order_by('available_at')[:batch_size]
+        )
+        if batch:
+            EmailOutbox.objects.filter(pk__in=[item.pk for item in batch]).update(
+                available_at=timezone.now() + timedelta(seconds=settings.EMAIL_OUTBOX_LEASE),
+            )
+    return batch
+
+
+def _deliver_outbox_item(item, mail_connection):
+    """
+    Send a single outbox email and record the outcome on the row.
+    """
+    item.attempts += 1
+    try:
+        deliver_email(
+            subject=item.subject,
+            message=item.body,
+            to_emails=item.to_emails,
+            from_email=item.from_email,
+            html_message=item.html_body,
+            cc_emails=item.cc_emails,
+            bcc_emails=item.bcc_emails,
+            connection=mail_connection,
+        )
+    except Exception as exc:
+        item.last_error = str(exc)
+        if item.attempts >= settings.EMAIL_OUTBOX_MAX_ATTEMPTS:
+            item.status = EmailOutbox.STATUS_FAILED
+        else:
+            delay = settings.EMAIL_OUTBOX_RETRY_DELAY * 2 ** (item.attempts - 1)
+            item.available_at = timezone.now() + timedelta(seconds=delay)
+        logger.warning(
+            'Outbox email delivery failed',
+            extra={'outbox_id': item.pk, 'attempts': item.attempts, 'error': item.last_error},
+        )
+        return False
+
+    item.status = EmailOutbox.STATUS_SENT
+    item.sent_at = timezone.now()
+    item.last_error = ''
+    return True
+
+
+@shared_task(queue='default', ignore_result=True)
+def recover_email_archive_spill():
+    """
+    Archive emails spilled to Redis by worker processes that died before
+    flushing their buffer.
+    """
+    return recover_spilled_emails()
+
+
+@shared_task(queue='default', ignore_result=True)
+def maintain_email_partitions():
+    """
+    Premake upcoming monthly Email and EmailRecipient partitions and detach
+    or drop those older than EMAIL_RETENTION_MONTHS, then delete bodies no
+    email references.
+
+    Bodies are only deleted after dropping: detached partitions keep their
+    foreign keys to the bodies. A body unused for a day is never in the
+    middle of being reused (see EmailBodyManager.intern_many).
+    """
+    if connection.vendor != 'postgresql':
+        return []
+
+    detach_only = settings.EMAIL_PARTITION_PRUNE_MODE == 'detach'
+    removed = []
+    for table in ('core_email', 'core_emailrecipient'):
+        ensure_partitions(table, settings.EMAIL_PARTITION_PREMAKE_MONTHS)
+        removed += prune_partitions(table, settings.EMAIL_RETENTION_MONTHS, detach_only=detach_only)
+    if removed and not detach_only:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                """
+                DELETE FROM core_emailbody body
+                WHERE body.last_used_at < now() - interval '1 day'
+                  AND NOT EXISTS (SELECT 1 FROM core_email WHERE body_blob_id = body.digest)
+                  AND NOT EXISTS (SELECT 1 FROM core_email WHERE html_body_blob_id = body.digest)
+                """
+            )
+    return removed
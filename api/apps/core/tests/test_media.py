@@ -0,0 +1,101 @@
+"""
+Tests for signed private media URLs.
+"""
+
+import time
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+from apps.core import media
+
+NAME = 'avatars/1/abc/64.jpeg'
+NOW = 1_800_000_000
+
+
+@pytest.fixture
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    settings.MEDIA_ACCEL_REDIRECT_PREFIX = ''
+    path = tmp_path / NAME
+    path.parent.mkdir(parents=True)
+    path.write_bytes(b'avatar')
+    return tmp_path
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [float(NOW)]
+    monkeypatch.setattr(time, 'time', lambda: now[0])
+    return now
+
+
+def test_signed_url_serves_the_file(client, media_root):
+    response = client.get(media.media_url(NAME))
+
+    assert response.status_code == 200
+    assert b''.join(response.streaming_content) == b'avatar'
+    assert 'private' in response['Cache-Control']
+
+
+def test_signed_url_is_sent_by_nginx_with_a_prefix(client, settings, media_root):
+    settings.MEDIA_ACCEL_REDIRECT_PREFIX = '/protected-media/'
+
+    response = client.get(media.media_url(NAME))
+
+    assert response.status_code == 200
+    assert response['X-Accel-Redirect'] == f'/protected-media/{NAME}'
+    assert response['Content-Type'] == 'image/jpeg'
+    assert response.content == b''
+
+
+def test_expired_signature_is_forbidden(client, settings, media_root, clock):
+    url = media.media_url(NAME)
+    clock[0] += settings.MEDIA_URL_EXPIRY
+
+    assert client.get(url).status_code == 403
+
+
+@pytest.mark.parametrize('tamper', [
+    lambda path, query: (path, {**query, 'signature': 'x' + query['signature'][1:]}),
+    lambda path, query: (path, {**query, 'expires': str(int(query['expires']) + 1)}),
+    lambda path, query: (path.replace('64.jpeg', '128.jpeg'), query),
+    lambda path, query: (path, {'expires': query['expires']}),
+])
+def test_tampered_signature_is_forbidden(client, media_root, tamper):
+    (media_root / NAME).with_name('128.jpeg').write_bytes(b'other')
+    parts = urlsplit(media.media_url(NAME))
+    query = {key: values[0] for key, values in parse_qs(parts.query).items()}
+
+    path, query = tamper(parts.path, query)
+
+    assert client.get(path, query).status_code == 403
+
+
+@pytest.mark.parametrize('path', [
+    '/media/../project/settings/base.py',
+    '/media/avatars/../../project/settings/base.py',
+    '/media//etc/passwd',
+])
+def test_names_outside_media_are_not_found(client, media_root, path):
+    assert client.get(path, {'expires': NOW, 'signature': 'x'}).status_code == 404
+
+
+def test_signed_local_url_is_stable_within_a_window(settings, media_root, clock):
+    margin = settings.MEDIA_URL_REFRESH_MARGIN
+    first = media.signed_local_url(NAME)
+
+    clock[0] += margin - 1
+    assert media.signed_local_url(NAME) == first
+
+    clock[0] += 1
+    assert media.signed_local_url(NAME) != first
+
+
+def test_signed_local_url_outlives_its_window(settings, media_root, clock):
+    margin = settings.MEDIA_URL_REFRESH_MARGIN
+    clock[0] += margin - 1
+    query = parse_qs(urlsplit(media.signed_local_url(NAME)).query)
+
+    clock[0] += 1 + margin
+    assert media.check_signature(NAME, query['expires'][0], query['signature'][0])
@@ -0,0 +1,12 @@
+"""
+Email archive URLs for LaunchKit.
+"""
+
+from django.urls import path
+
+from apps.core.views import EmailRecipientLookupView, EmailSearchView
+
+urlpatterns = [
+    path('search/', EmailSearchView.as_view(), name='email_search'),
+    path('recipients/', EmailRecipientLookupView.as_view(), name='email_recipient_lookup'),
+]
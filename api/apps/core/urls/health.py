@@ -2,15 +2,20 @@
 Health check URLs for LaunchKit.
 """
 
+from django.conf import settings
 from django.urls import path
-from django.http import JsonResponse
+from django.http import HttpResponse, JsonResponse
+from django.utils.crypto import constant_time_compare
 from django.db import connections
 from django.db.utils import OperationalError
 from redis.exceptions import RedisError
 import redis
+import ipaddress
 import os
 import datetime
 
+from apps.core.metrics import collect, render_prometheus
+
 
 def health_check(request):
     """
@@ -48,6 +53,37 @@ def health_check(request):
     return JsonResponse(response_data, status=status_code)
 
 
+def is_internal_address(address):
+    try:
+        address = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return address.is_private or address.is_loopback
+
+
+def metrics_view(request):
+    """
+    Application metrics of all live processes in Prometheus text format.
+
+    Requires ``Authorization: Bearer <METRICS_TOKEN>``. Without a token
+    configured, only direct requests from private addresses are answered,
+    such as a scraper on the container network; anything that came through
+    nginx carries X-Forwarded-For and is refused.
+    """
+    token = settings.METRICS_TOKEN
+    if token:
+        if not constant_time_compare(request.headers.get('Authorization', ''), f'Bearer {token}'):
+            return HttpResponse(status=401)
+    elif 'HTTP_X_FORWARDED_FOR' in request.META or not is_internal_address(request.META.get('REMOTE_ADDR')):
+        return HttpResponse(status=403)
+    try:
+        body = render_prometheus(collect())
+    except RedisError:
+        return HttpResponse('metrics unavailable\n', status=503, content_type='text/plain')
+    return HttpResponse(body, content_type='text/plain; version=0.0.4')
+
+
 urlpatterns = [
     path('', health_check, name='health_check'),
+    path('metrics/', metrics_view, name='metrics'),
 ] 
\ No newline at end of file
@@ -0,0 +1,104 @@
+"""
+Views for the core app.
+"""
+
+import mimetypes
+import posixpath
+import time
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseForbidden
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import require_safe
+from rest_framework import generics
+from rest_framework.pagination import CursorPagination
+
+from apps.accounts.permissions import IsStaffClaim
+from apps.core import media
+from apps.core.models import Email
+from apps.core.serializers import EmailRecipientLookupSerializer, EmailSummarySerializer
+
+
+class EmailCursorPagination(CursorPagination):
+    """
+    Keyset pagination over the archive, newest first.
+    """
+    # id breaks ties between emails archived in the same microsecond.
+    ordering = ('-created_at', '-id')
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+
+
+class EmailSearchView(generics.ListAPIView):
+    """
+    Staff-only API endpoint for searching the email archive.
+
+    ``q`` is a web-search style full-text query over subject, addresses and
+    bodies; results are paginated with an opaque ``cursor``.
+    """
+    serializer_class = EmailSummarySerializer
+    permission_classes = [IsStaffClaim]
+    pagination_class = EmailCursorPagination
+    filter_backends = []
+
+    def get_queryset(self):
+        queryset = Email.objects.defer('search_vector')
+        term = self.request.query_params.get('q', '').strip()
+        if term:
+            queryset = queryset.search(term)
+        return queryset
+
+
+class EmailRecipientLookupView(generics.ListAPIView):
+    """
+    Staff-only API endpoint listing the emails sent to one address.
+
+    Takes ``address`` and optional ISO 8601 ``since``/``until`` bounds;
+    matches To, CC and BCC recipients case-insensitively.
+    """
+    serializer_class = EmailSummarySerializer
+    permission_classes = [IsStaffClaim]
+    pagination_class = EmailCursorPagination
+    filter_backends = []
+
+    def get_queryset(self):
+        params = EmailRecipientLookupSerializer(data=self.request.query_params)
+        params.is_valid(raise_exception=True)
+        return Email.objects.defer('search_vector').sent_to(
+            params.validated_data['address'],
+            since=params.validated_data.get('since'),
+            until=params.validated_data.get('until'),
+        )
+
+
+@require_safe
+def protected_media(request, name):
+    """
+    Serve a private media file to holders of a URL from apps.core.media.
+
+    Only for media kept on the filesystem: S3 storage, as in production,
+    hands out presigned URLs that never reach this view. Only the signature
+    is checked here; the bytes are sent by nginx through X-Accel-Redirect
+    when MEDIA_ACCEL_REDIRECT_PREFIX is set, and streamed otherwise.
+    """
+    name = posixpath.normpath(name)
+    if name.startswith(('.', '/')):
+        raise Http404
+    expires = request.GET.get('expires')
+    if not media.check_signature(name, expires, request.GET.get('signature')):
+        return HttpResponseForbidden()
+
+    prefix = settings.MEDIA_ACCEL_REDIRECT_PREFIX
+    if prefix:
+        response = HttpResponse(content_type=mimetypes.guess_type(name)[0] or 'application/octet-stream')
+        response['X-Accel-Redirect'] = prefix + quote(name)
+    else:
+        try:
+            response = FileResponse(default_storage.open(name, 'rb'))
+        except FileNotFoundError:
+            raise Http404
+    patch_cache_control(response, private=True, max_age=max(0, int(expires) - int(time.time())))
+    return response
@@ -0,0 +1,44 @@
+"""
+Test configuration shared by all apps.
+"""
+
+import pytest
+
+LOCMEM_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'tests',
+    },
+}
+
+
+@pytest.fixture(autouse=True)
+def isolated_cache(settings):
+    """
+    Keep every test off the Redis in settings, whose throttle windows,
+    modification stamps and cached serializations outlive a run and would
+    leak into the next one: the cache is a locmem one emptied around each
+    test, throttling is off, and the process-local user caches are cleared.
+    Helpers that need Redis itself fail open.
+    """
+    from django.core.cache import cache
+
+    from apps.accounts.authentication import local_users, verified_tokens
+
+    settings.CACHES = LOCMEM_CACHES
+    settings.REST_FRAMEWORK = {**settings.REST_FRAMEWORK, 'DEFAULT_THROTTLE_RATES': {}}
+    cache.clear()
+    local_users.clear()
+    verified_tokens.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def no_debug_toolbar(settings):
+    """
+    Drop the debug toolbar of the development settings: it is always shown
+    there, and fails to render into HTML responses such as 404 pages
+    because its URLs are only routed when DEBUG is on.
+    """
+    settings.MIDDLEWARE = [name for name in settings.MIDDLEWARE if not name.startswith('debug_toolbar.')]
@@ -25,6 +25,33 @@ app.conf.beat_schedule = {
         "task": "project.tasks.cleanup_expired_sessions",
         "schedule": 86400.0,  # once every 24 hours
     },
+    "dispatch_email_outbox": {
+        "task": "apps.core.tasks.dispatch_email_outbox",
+        "schedule": 60.0,  # safety net for dispatches missed at commit time
+        "options": {"queue": "emails"},
+    },
+    "recover_email_archive_spill": {
+        "task": "apps.core.tasks.recover_email_archive_spill",
+        "schedule": 300.0,
+    },
+    "ingest_login_attempts": {
+        "task": "apps.accounts.tasks.ingest_login_attempts",
+        "schedule": 5.0,
+        "options": {"expires": 5.0},
+    },
+    "roll_up_login_attempts": {
+        "task": "apps.accounts.tasks.roll_up_login_attempts",
+        "schedule": 60.0,
+        "options": {"expires": 60.0},
+    },
+    "cleanup_expired_tokens": {
+        "task": "apps.accounts.tasks.cleanup_expired_tokens",
+        "schedule": 86400.0,  # once every 24 hours
+    },
+    "maintain_email_partitions": {
+        "task": "apps.core.tasks.maintain_email_partitions",
+        "schedule": 86400.0,  # once every 24 hours
+    },
 }
 
 @app.task(bind=True, ignore_result=True)
@@ -31,6 +31,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     
     # Third-party apps
     "rest_framework",
@@ -59,6 +60,8 @@ MIDDLEWARE = [
     "axes.middleware.AxesMiddleware",
     "apps.core.middleware.RequestIDMiddleware",
     "apps.core.middleware.JSONLoggingMiddleware",
+    "apps.core.middleware.EmailArchiveMiddleware",
+    "apps.accounts.middleware.HashingSaturationMiddleware",
 ]
 
 ROOT_URLCONF = "project.urls"
@@ -67,8 +70,19 @@ TEMPLATES = [
     {
         "BACKEND": "django.template.backends.django.DjangoTemplates",
         "DIRS": [BASE_DIR / "templates"],
-        "APP_DIRS": True,
         "OPTIONS": {
+            # Email templates are CSS-inlined and minified once as they load
+            # (apps.core.rendering); everything else loads as usual.
+            "loaders": [
+                (
+                    "django.template.loaders.cached.Loader",
+                    [
+                        "apps.core.rendering.EmailTemplateLoader",
+                        "django.template.loaders.filesystem.Loader",
+                        "django.template.loaders.app_directories.Loader",
+                    ],
+                ),
+            ],
             "context_processors": [
                 "django.template.context_processors.debug",
                 "django.template.context_processors.request",
@@ -107,14 +121,40 @@ CACHES = {
     }
 }
 
+# Cached serializations for CachedRetrieveMixin views (apps.core.mixins); they
+# are keyed by modification stamp, so the timeout only bounds memory use
+RETRIEVE_CACHE_TIMEOUT = env.int("RETRIEVE_CACHE_TIMEOUT", default=3600)
+
 # Session
 SESSION_ENGINE = "django.contrib.sessions.backends.cache"
 SESSION_CACHE_ALIAS = "default"
 
 # Password validation
+# Password hashing runs on a bounded per-process pool (apps.accounts.hashing)
+# Argon2 is preferred; existing PBKDF2 hashes are upgraded in the background
+# on the next successful login (apps.accounts.backends).
+PASSWORD_HASHERS = [
+    "apps.accounts.hashers.BulkheadedArgon2PasswordHasher",
+    "apps.accounts.hashers.BulkheadedPBKDF2PasswordHasher",
+    "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+    "django.contrib.auth.hashers.BCryptSHA256PasswordHasher",
+    "django.contrib.auth.hashers.ScryptPasswordHasher",
+]
+# Argon2 cost; run `manage.py calibrate_password_hasher` to pick values for the host
+PASSWORD_ARGON2_TIME_COST = env.int("PASSWORD_ARGON2_TIME_COST", default=2)
+PASSWORD_ARGON2_MEMORY_COST = env.int("PASSWORD_ARGON2_MEMORY_COST", default=102400)  # KiB
+PASSWORD_ARGON2_PARALLELISM = env.int("PASSWORD_ARGON2_PARALLELISM", default=8)
+PASSWORD_HASHING_WORKERS = env.int("PASSWORD_HASHING_WORKERS", default=2)  # threads per process
+PASSWORD_HASHING_QUEUE = env.int("PASSWORD_HASHING_QUEUE", default=4)  # waiting calls per process
+PASSWORD_HASHING_ADMISSION_TIMEOUT = env.float("PASSWORD_HASHING_ADMISSION_TIMEOUT", default=0.5)  # seconds
+
+# Process metrics published to Redis for /api/health/metrics/ (apps.core.metrics)
+METRICS_PUBLISH_INTERVAL = env.int("METRICS_PUBLISH_INTERVAL", default=5)  # seconds
+METRICS_TOKEN = env("METRICS_TOKEN", default="")  # bearer token; unset allows only direct private-network scrapes
+
 AUTH_PASSWORD_VALIDATORS = [
     {
-        "NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator",
+        "NAME": "apps.accounts.validators.BoundedUserAttributeSimilarityValidator",
     },
     {
         "NAME": "django.contrib.auth.password_validation.MinimumLengthValidator",
@@ -123,13 +163,17 @@ AUTH_PASSWORD_VALIDATORS = [
         },
     },
     {
-        "NAME": "django.contrib.auth.password_validation.CommonPasswordValidator",
+        "NAME": "apps.accounts.validators.BreachedPasswordValidator",
     },
     {
         "NAME": "django.contrib.auth.password_validation.NumericPasswordValidator",
     },
 ]
 
+# Breached password bloom filter built by `manage.py build_breached_password_filter`;
+# without it BreachedPasswordValidator falls back to Django's common password list
+BREACHED_PASSWORD_FILTER = env("BREACHED_PASSWORD_FILTER", default="")
+
 # Internationalization
 LANGUAGE_CODE = "en-us"
 TIME_ZONE = "UTC"
@@ -145,13 +189,18 @@ STATICFILES_DIRS = []
 MEDIA_URL = "media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
+# Signed media URLs (apps.core.media)
+MEDIA_URL_EXPIRY = env.int("MEDIA_URL_EXPIRY", default=3600)  # seconds
+MEDIA_URL_REFRESH_MARGIN = env.int("MEDIA_URL_REFRESH_MARGIN", default=300)  # renewal window; under MEDIA_URL_EXPIRY / 2
+MEDIA_ACCEL_REDIRECT_PREFIX = env("MEDIA_ACCEL_REDIRECT_PREFIX", default="")  # nginx internal location
+
 # Default primary key field type
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 # REST Framework
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "apps.accounts.authentication.CachedJWTAuthentication",
         "rest_framework.authentication.SessionAuthentication",
     ),
     "DEFAULT_PERMISSION_CLASSES": [
@@ -166,10 +215,11 @@ REST_FRAMEWORK = {
         "rest_framework.filters.OrderingFilter",
     ],
     "DEFAULT_THROTTLE_CLASSES": [
-        "rest_framework.throttling.ScopedRateThrottle",
+        "apps.accounts.throttling.AuthRateThrottle",
     ],
     "DEFAULT_THROTTLE_RATES": {
-        "auth": env("THROTTLE_RATE_AUTH", default="5/min"),
+        "auth": env("THROTTLE_RATE_AUTH", default="5/min"),  # per client IP
+        "auth_username": env("THROTTLE_RATE_AUTH_USERNAME", default="5/min"),  # per username or email
     },
 }
 
@@ -184,8 +234,24 @@ SIMPLE_JWT = {
     "AUTH_HEADER_TYPES": ("Bearer",),
     "USER_ID_FIELD": "id",
     "USER_ID_CLAIM": "user_id",
+    # Rotation blacklists through Redis (apps.accounts.blacklist) instead of
+    # the token_blacklist app
+    "TOKEN_REFRESH_SERIALIZER": "apps.accounts.serializers.RotatingTokenRefreshSerializer",
 }
 
+# Refresh token blacklist: per-process bloom filter sizing
+JWT_BLACKLIST_BLOOM_CAPACITY = env.int("JWT_BLACKLIST_BLOOM_CAPACITY", default=1000000)
+JWT_BLACKLIST_BLOOM_ERROR_RATE = env.float("JWT_BLACKLIST_BLOOM_ERROR_RATE", default=0.01)
+# Concurrent refreshes of one token share the first rotation's pair
+JWT_REFRESH_COALESCE_WINDOW = env.int("JWT_REFRESH_COALESCE_WINDOW", default=10)  # seconds the pair is kept
+JWT_REFRESH_COALESCE_WAIT = env.float("JWT_REFRESH_COALESCE_WAIT", default=2.0)  # seconds to wait for it
+
+# JWT authentication caches (apps.accounts.authentication)
+JWT_VERIFIED_TOKEN_CACHE_SIZE = env.int("JWT_VERIFIED_TOKEN_CACHE_SIZE", default=10000)  # per process
+AUTH_USER_CACHE_SIZE = env.int("AUTH_USER_CACHE_SIZE", default=10000)  # per process
+AUTH_USER_CACHE_LOCAL_TTL = env.float("AUTH_USER_CACHE_LOCAL_TTL", default=5)  # seconds
+AUTH_USER_CACHE_TIMEOUT = env.int("AUTH_USER_CACHE_TIMEOUT", default=300)  # seconds in Redis
+
 # CORS settings
 CORS_ALLOW_ALL_ORIGINS = env.bool("CORS_ALLOW_ALL_ORIGINS", default=True)  # For development
 CORS_ALLOWED_ORIGINS = env.list("CSRF_TRUSTED_ORIGINS", default=[
@@ -213,7 +279,7 @@ CELERY_RESULT_SERIALIZER = "json"
 CELERY_TIMEZONE = TIME_ZONE
 
 # Email settings
-EMAIL_BACKEND = env("EMAIL_BACKEND", default="django.core.mail.backends.smtp.EmailBackend")
+EMAIL_BACKEND = env("EMAIL_BACKEND", default="apps.core.email.PooledSMTPEmailBackend")
 EMAIL_HOST = env("EMAIL_HOST", default="")
 EMAIL_PORT = env.int("EMAIL_PORT", default=587)
 EMAIL_USE_TLS = env.bool("EMAIL_USE_TLS", default=True)
@@ -221,6 +287,56 @@ EMAIL_HOST_USER = env("EMAIL_HOST_USER", default="")
 EMAIL_HOST_PASSWORD = env("EMAIL_HOST_PASSWORD", default="")
 DEFAULT_FROM_EMAIL = env("DEFAULT_FROM_EMAIL", default="no-reply@example.com")
 
+# Pooled SMTP delivery (apps.core.email.PooledSMTPEmailBackend)
+EMAIL_POOL_SIZE = env.int("EMAIL_POOL_SIZE", default=4)  # sessions per worker process
+EMAIL_POOL_MAX_MESSAGES = env.int("EMAIL_POOL_MAX_MESSAGES", default=100)  # per session
+EMAIL_POOL_HEALTHCHECK_AFTER = env.int("EMAIL_POOL_HEALTHCHECK_AFTER", default=30)  # seconds idle
+EMAIL_POOL_ACQUIRE_TIMEOUT = env.int("EMAIL_POOL_ACQUIRE_TIMEOUT", default=10)  # seconds
+EMAIL_POOL_CONCURRENCY = env.int("EMAIL_POOL_CONCURRENCY", default=1)
+
+# Buffered email archive (apps.core.archive)
+EMAIL_ARCHIVE_BUFFER_SIZE = env.int("EMAIL_ARCHIVE_BUFFER_SIZE", default=100)
+EMAIL_ARCHIVE_FLUSH_INTERVAL = env.int("EMAIL_ARCHIVE_FLUSH_INTERVAL", default=5)  # seconds
+EMAIL_ARCHIVE_SPILL_KEY = env("EMAIL_ARCHIVE_SPILL_KEY", default="")  # e.g. "email-archive:spill"; empty disables
+EMAIL_BODY_CODEC = env("EMAIL_BODY_CODEC", default="zstd")  # falls back to zlib without zstandard
+
+# Email archive retention (monthly PostgreSQL partitions on created_at)
+EMAIL_RETENTION_MONTHS = env.int("EMAIL_RETENTION_MONTHS", default=12)  # 0 keeps everything
+EMAIL_PARTITION_PREMAKE_MONTHS = env.int("EMAIL_PARTITION_PREMAKE_MONTHS", default=3)
+EMAIL_PARTITION_PRUNE_MODE = env("EMAIL_PARTITION_PRUNE_MODE", default="drop")  # or "detach"
+
+# Per-domain rate shaping for bulk notifications (apps.core.scheduling)
+EMAIL_DOMAIN_RATE = env.float("EMAIL_DOMAIN_RATE", default=5.0)  # recipients per second per domain
+EMAIL_DOMAIN_BURST = env.int("EMAIL_DOMAIN_BURST", default=20)
+EMAIL_DOMAIN_RATES = env.dict("EMAIL_DOMAIN_RATES", cast={"value": float}, default={})  # gmail.com=10,...
+EMAIL_DOMAIN_DEFER_DELAY = env.int("EMAIL_DOMAIN_DEFER_DELAY", default=60)  # seconds, doubles per deferral
+EMAIL_DOMAIN_MAX_DEFERRALS = env.int("EMAIL_DOMAIN_MAX_DEFERRALS", default=3)
+
+# Email outbox - queue emails in the database and deliver them from Celery
+EMAIL_OUTBOX_ENABLED = env.bool("EMAIL_OUTBOX_ENABLED", default=False)
+EMAIL_OUTBOX_BATCH_SIZE = env.int("EMAIL_OUTBOX_BATCH_SIZE", default=50)
+EMAIL_OUTBOX_MAX_ATTEMPTS = env.int("EMAIL_OUTBOX_MAX_ATTEMPTS", default=5)
+EMAIL_OUTBOX_RETRY_DELAY = env.int("EMAIL_OUTBOX_RETRY_DELAY", default=60)  # seconds
+EMAIL_OUTBOX_LEASE = env.int("EMAIL_OUTBOX_LEASE", default=300)  # seconds a claimed batch is reserved
+
+# Seconds an address that matched no account is answered from Redis by
+# the password reset endpoint (apps.accounts.lookup)
+PASSWORD_RESET_NEGATIVE_CACHE_TIMEOUT = env.int("PASSWORD_RESET_NEGATIVE_CACHE_TIMEOUT", default=3600)
+# Repeat reset requests for an account within this many seconds are
+# acknowledged without sending another email (apps.accounts.resets)
+PASSWORD_RESET_COALESCE_WINDOW = env.int("PASSWORD_RESET_COALESCE_WINDOW", default=300)
+
+# Avatar uploads (apps.accounts.avatars)
+AVATAR_MAX_UPLOAD_BYTES = env.int("AVATAR_MAX_UPLOAD_BYTES", default=10 * 1024 * 1024)
+AVATAR_MAX_PIXELS = env.int("AVATAR_MAX_PIXELS", default=40_000_000)  # rejected before decoding
+AVATAR_SIZES = env.list("AVATAR_SIZES", cast=int, default=[64, 128, 256])  # square, pixels
+AVATAR_UPLOAD_EXPIRY = env.int("AVATAR_UPLOAD_EXPIRY", default=600)  # seconds
+
+# Login attempt recording (apps.accounts.attempts)
+LOGIN_ATTEMPT_STREAM = env("LOGIN_ATTEMPT_STREAM", default="login-attempts")
+LOGIN_ATTEMPT_STREAM_MAXLEN = env.int("LOGIN_ATTEMPT_STREAM_MAXLEN", default=1_000_000)
+LOGIN_ATTEMPT_BATCH_SIZE = env.int("LOGIN_ATTEMPT_BATCH_SIZE", default=1000)
+
 # Django Axes settings
 AXES_FAILURE_LIMIT = env.int("AXES_FAILURE_LIMIT", default=10)
 AXES_COOLOFF_TIME = env.int("AXES_COOLOFF_TIME", default=1)  # hours
@@ -234,8 +350,8 @@ AXES_HANDLER = "axes.handlers.cache.AxesCacheHandler"
 AUTHENTICATION_BACKENDS = [
     # AxesStandaloneBackend should be the first backend
     'axes.backends.AxesStandaloneBackend',
-    # Django's default backend
-    'django.contrib.auth.backends.ModelBackend',
+    # Django's ModelBackend, with outdated password hashes upgraded off the request path
+    'apps.accounts.backends.DeferredRehashModelBackend',
 ]
 
 # API Documentation
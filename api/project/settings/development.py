@@ -22,6 +22,7 @@ MIDDLEWARE = [
     "apps.core.middleware.RequestIDMiddleware",
     "apps.core.middleware.JSONLoggingMiddleware",
     "apps.core.middleware.ExceptionLoggingMiddleware",
+    "apps.core.middleware.EmailArchiveMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -31,6 +32,7 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "axes.middleware.AxesMiddleware",
+    "apps.accounts.middleware.HashingSaturationMiddleware",
 ]
 
 # Debug toolbar settings
@@ -29,6 +29,10 @@ MIDDLEWARE = [
 # Static files
 STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
 
+# Local media is sent by nginx (see infra/nginx/nginx.conf). Unused with the
+# S3 storage below, whose presigned URLs bypass the API and nginx.
+MEDIA_ACCEL_REDIRECT_PREFIX = env("MEDIA_ACCEL_REDIRECT_PREFIX", default="/protected-media/")
+
 # Media files - use S3 in production
 DEFAULT_FILE_STORAGE = "storages.backends.s3boto3.S3Boto3Storage"
 AWS_ACCESS_KEY_ID = env("AWS_ACCESS_KEY_ID")
@@ -36,6 +40,7 @@ AWS_SECRET_ACCESS_KEY = env("AWS_SECRET_ACCESS_KEY")
 AWS_STORAGE_BUCKET_NAME = env("AWS_STORAGE_BUCKET_NAME")
 AWS_S3_REGION_NAME = env("AWS_S3_REGION_NAME", default="us-east-1")
 AWS_DEFAULT_ACL = "private"
+AWS_QUERYSTRING_EXPIRE = MEDIA_URL_EXPIRY
 AWS_S3_CUSTOM_DOMAIN = env("AWS_S3_CUSTOM_DOMAIN", default=None)
 AWS_S3_OBJECT_PARAMETERS = {
     "CacheControl": "max-age=86400",
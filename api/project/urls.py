@@ -13,6 +13,8 @@ from drf_spectacular.views import (
 )
 from django.http import JsonResponse
 
+from apps.core.views import protected_media
+
 def health_check(request):
     return JsonResponse({"status": "healthy"})
 
@@ -30,13 +32,15 @@ urlpatterns = [
     
     # API endpoints
     path("api/auth/", include("apps.accounts.urls")),
+    path("api/emails/", include("apps.core.urls.emails")),
+
+    # Private media, behind signed URLs (see apps.core.media)
+    path(f"{settings.MEDIA_URL.lstrip('/')}<path:name>", protected_media, name="protected_media"),
 ]
 
 # Add debug toolbar URLs in development
 if settings.DEBUG:
     import debug_toolbar
     urlpatterns += [path("__debug__/", include(debug_toolbar.urls))]
-    
-    # Serve media files in development
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+
     urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT) 
\ No newline at end of file